@@ -0,0 +1,74 @@
+'''
+RAET Tutorial Examples for RoadStack driven by an asyncio event loop
+Requires python 3.5 or later
+'''
+import asyncio
+
+from ioflo.base.consoling import getConsole
+
+import raet
+from raet import asyncing
+from raet.raeting import AutoMode
+
+console = getConsole()
+console.reinit(verbosity=console.Wordage.concise)
+
+async def settle(stacks, timeout=5.0):
+    '''
+    Wait until stacks have no transactions in progress
+    '''
+    loop = asyncio.get_event_loop()
+    end = loop.time() + timeout
+    while any([stack.transactions for stack in stacks]) and loop.time() < end:
+        await asyncio.sleep(0.01)
+
+async def example1():
+    alpha = raet.road.stacking.RoadStack(name='alpha',
+                                         ha=('0.0.0.0', 7531),
+                                         auto=AutoMode.always.value)
+
+    beta = raet.road.stacking.RoadStack(name='beta',
+                                        ha=('0.0.0.0', 7532),
+                                        main=True,
+                                        auto=AutoMode.always.value)
+
+    # drivers service the stacks from the loop on socket readiness and timers
+    alphaAsync = asyncing.AsyncStack(alpha)
+    betaAsync = asyncing.AsyncStack(beta)
+    alphaAsync.start()
+    betaAsync.start()
+
+    remote = raet.road.estating.RemoteEstate(stack=alpha,
+                                             ha=beta.ha)
+    alpha.addRemote(remote)
+    alpha.join(uid=remote.uid, cascade=True)
+    alphaAsync.service()  # send join now rather than on next readiness
+
+    stacks = [alpha, beta]
+    await settle(stacks)
+    print("Finished Handshake\n")
+
+    msg = {'subject': 'Example message alpha to beta',
+           'content': 'Delivered as soon as the socket is readable.',}
+    await alphaAsync.send(msg, remote.uid)
+    rx = await betaAsync.receive()
+    print("{0}\n".format(rx))
+
+    msg = {'subject': 'Example message beta to alpha',
+           'content': 'No polling loop required.',}
+    await betaAsync.send(msg, beta.remotes.values()[0].uid)
+    rx = await alphaAsync.receive()
+    print("{0}\n".format(rx))
+
+    await settle(stacks)  # let acks complete
+    for driver in [alphaAsync, betaAsync]:
+        driver.stop()
+    for stack in stacks:
+        stack.server.close()  # close the UDP socket
+        stack.keep.clearAllDir()  # clear persisted data
+
+    print("Finished\n")
+
+
+if __name__ == "__main__":
+    asyncio.get_event_loop().run_until_complete(example1())
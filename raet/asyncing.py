@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+'''
+asyncing.py raet protocol asyncio integration
+
+Python 3 only so not imported by the raet package itself. Use
+    from raet import asyncing
+'''
+# pylint: skip-file
+
+# Import python libs
+import asyncio
+from collections import deque
+
+# Import raet libs
+from . import raeting
+
+from ioflo.base.consoling import getConsole
+console = getConsole()
+
+
+class AsyncStack(object):
+    '''
+    asyncio driver of a RAET stack, either RoadStack or LaneStack.
+    Services the stack from the event loop when its server socket is readable,
+    when blocked transmits become writable, and when the next transaction timer
+    deadline is due instead of polling .serviceAll.
+
+    The stack's .store stamp is kept in step with the loop clock so nothing
+    else should advance the store while driven.
+    Presence keep alive is not driven, call .stack.manage from a task if needed.
+
+    Attributes:
+        .stack is the driven stack
+        .loop is the asyncio event loop
+        .offset is store stamp minus loop time
+        .deadline is store stamp of the scheduled timer or None
+        .timer is loop TimerHandle of the scheduled timer or None
+        .receivers is deque of futures awaiting received messages
+        .drainers is list of futures awaiting drain of blocked transmits
+        .writing is True while waiting for the socket to be writable
+    '''
+
+    def __init__(self, stack, loop=None):
+        '''
+        Setup instance
+
+        stack is the RoadStack or LaneStack to drive
+        loop is the asyncio event loop, defaults to the current event loop
+        '''
+        self.stack = stack
+        self.loop = loop if loop is not None else asyncio.get_event_loop()
+        self.offset = None
+        self.deadline = None
+        self.timer = None
+        self.receivers = deque()
+        self.drainers = []
+        self.writing = False
+        self.ss = None
+
+    @property
+    def started(self):
+        '''
+        Property is True if driving the stack
+        '''
+        return self.ss is not None
+
+    def start(self):
+        '''
+        Start driving the stack from the loop
+        '''
+        if self.started:
+            return
+        ss = getattr(self.stack.server, 'ss', None) if self.stack.server else None
+        if ss is None:
+            emsg = "Stack '{0}'. No server socket to drive".format(self.stack.name)
+            raise raeting.StackError(emsg)
+        self.ss = ss
+        self.offset = self.stack.store.stamp - self.loop.time()
+        self.loop.add_reader(self.ss, self.readable)
+        self.service()
+
+    def stop(self):
+        '''
+        Stop driving the stack. Cancel pending receives and drains
+        Does not close the stack's server
+        '''
+        if not self.started:
+            return
+        self.loop.remove_reader(self.ss)
+        if self.writing:
+            self.loop.remove_writer(self.ss)
+            self.writing = False
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = None
+        self.deadline = None
+        while self.receivers:
+            self.receivers.popleft().cancel()
+        for drainer in self.drainers:
+            drainer.cancel()
+        self.drainers = []
+        self.ss = None
+
+    def sync(self, least=None):
+        '''
+        Advance the store stamp to the loop clock but at least to least
+        '''
+        stamp = self.loop.time() + self.offset
+        if least is not None and stamp < least:
+            stamp = least
+        if stamp > self.stack.store.stamp:
+            self.stack.store.changeStamp(stamp)
+
+    def readable(self):
+        '''
+        Loop reader callback when server socket has received data
+        '''
+        self.sync()
+        self.stack.serviceReceives()
+        self.stack.serviceRxes()
+        self.service()
+
+    def writable(self):
+        '''
+        Loop writer callback when server socket can take blocked transmits
+        '''
+        self.sync()
+        self.stack.serviceTxes()
+        self.service()
+
+    def expire(self):
+        '''
+        Loop timer callback when the scheduled deadline is due
+        '''
+        deadline = self.deadline
+        self.timer = None
+        self.deadline = None
+        self.sync(least=deadline)
+        self.stack.process()
+        self.service()
+
+    def service(self):
+        '''
+        Transmit what is pending, deliver received messages to awaiting
+        receivers and schedule the next timer deadline
+        '''
+        stack = self.stack
+        stack.serviceAllTx()
+        if stack.txes:  # socket buffer full so wait until writable
+            if not self.writing:
+                self.loop.add_writer(self.ss, self.writable)
+                self.writing = True
+        else:
+            if self.writing:
+                self.loop.remove_writer(self.ss)
+                self.writing = False
+            drainers, self.drainers = self.drainers, []
+            for drainer in drainers:
+                if not drainer.done():
+                    drainer.set_result(None)
+
+        while stack.rxMsgs and self.receivers:
+            receiver = self.receivers.popleft()
+            if not receiver.done():  # not cancelled
+                receiver.set_result(stack.rxMsgs.popleft())
+
+        self.schedule()
+
+    def schedule(self):
+        '''
+        Schedule loop timer at next deadline of the stack's timers
+        '''
+        deadline = self.stack.nextDeadline(after=self.stack.store.stamp)
+        if deadline == self.deadline:
+            return
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = None
+        self.deadline = deadline
+        if deadline is not None:
+            self.timer = self.loop.call_at(deadline - self.offset, self.expire)
+
+    async def send(self, msg, uid=None):
+        '''
+        Transmit msg to remote at uid as with .stack.transmit
+        Returns once the resulting packets have been handed to the socket
+        '''
+        self.start()
+        self.sync()
+        self.stack.transmit(msg, uid=uid)
+        self.service()
+        if self.stack.txes:
+            drainer = self.loop.create_future()
+            self.drainers.append(drainer)
+            await drainer
+
+    async def receive(self):
+        '''
+        Returns next received duple (msg, name) from .stack.rxMsgs waiting
+        until one arrives
+        '''
+        self.start()
+        if self.stack.rxMsgs and not self.receivers:
+            return self.stack.rxMsgs.popleft()
+        receiver = self.loop.create_future()
+        self.receivers.append(receiver)
+        return await receiver
@@ -210,7 +210,7 @@ class RaetRoadStackSetup(deeding.Deed):
 
 class RaetRoadStackCloser(deeding.Deed):
     '''
-    Closes road stack server socket connection
+    Closes road stack server socket connection and crypto pool
     FloScript:
 
     do raet road stack closer at exit
@@ -222,10 +222,10 @@ class RaetRoadStackCloser(deeding.Deed):
 
     def action(self, **kwa):
         '''
-        Close udp socket
+        Close udp socket and shutdown crypto pool
         '''
         if self.stack.value and isinstance(self.stack.value, RoadStack):
-            self.stack.value.server.close()
+            self.stack.value.close()
 
 class RaetRoadStackRxServicer(deeding.Deed):
     '''
@@ -265,7 +265,8 @@ class RaetRoadStackTxServicer(deeding.Deed):
 
 class RaetRoadStackJoiner(deeding.Deed):
     '''
-    Initiates join transaction with zeroth remote estate (main)
+    Initiates join transaction with remote estate (main) at master host address
+    or else zeroth remote estate
     FloScript:
 
     do raet road stack joiner at enter
@@ -297,12 +298,15 @@ class RaetRoadStackJoiner(deeding.Deed):
         port = self.local.data.masterport
         ha = (host, port)
         if stack and isinstance(stack, RoadStack):
-            if not stack.remotes:
-                stack.addRemote(estating.RemoteEstate(stack=stack,
-                                                      fuid=0, # vacuous join
-                                                      sid=0, # always 0 for join
-                                                      ha=ha))
-            stack.join(uid=stack.remotes.values()[0].uid)
+            remote = stack.fetchRemoteByHa(ha)  # main by host address index
+            if not remote:
+                if not stack.remotes:
+                    stack.addRemote(estating.RemoteEstate(stack=stack,
+                                                          fuid=0, # vacuous join
+                                                          sid=0, # always 0 for join
+                                                          ha=ha))
+                remote = stack.remotes.values()[0]
+            stack.join(uid=remote.uid)
 
 class RaetRoadStackJoined(deeding.Deed):
     '''
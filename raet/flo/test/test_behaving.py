@@ -17,7 +17,8 @@ console = getConsole()
 
 # Import raet libs
 from raet.abiding import *  # import globals
-from raet.road import stacking
+from raet import raeting
+from raet.road import estating, stacking
 from raet.flo import behaving
 
 def setUpModule():
@@ -79,6 +80,38 @@ class BasicTestCase(testing.FrameIofloTestCase):
         self.assertIs(len(act.actor.txmsgs.value), 0)
         act.actor.stack.value.server.close()
 
+    def testRaetRoadStackJoiner(self):
+        """
+        Test RaetRoadStackJoiner Behavior joins remote at master host address
+        """
+        console.terse("{0}\n".format(self.testRaetRoadStackJoiner.__doc__))
+        stackAct = self.addEnterDeed("RaetRoadStack")
+        joinAct = self.addEnterDeed("RaetRoadStackJoiner")
+        self.resolve()  # resolve House, Framer, Frame, Acts, Actors
+
+        stackAct()
+        stack = stackAct.actor.stack.value
+        self.assertIsInstance(stack, stacking.RoadStack)
+        stack.store.changeStamp(0.0)  # framer not running so stamp not set
+        try:
+            stack.addRemote(estating.RemoteEstate(stack=stack,
+                                                  fuid=0,
+                                                  sid=0,
+                                                  ha=('127.0.0.1', 7544)))
+            main = estating.RemoteEstate(stack=stack,
+                                         fuid=0,
+                                         sid=0,
+                                         ha=('127.0.0.1', raeting.RAET_PORT))
+            stack.addRemote(main)
+            self.assertIsNot(stack.remotes.values()[0], main)
+
+            joinAct()
+            self.assertEqual(len(main.transactions), 1)  # not zeroth remote
+            self.assertEqual(len(stack.remotes.values()[0].transactions), 0)
+        finally:
+            stack.close()
+            stack.clearAllKeeps()
+
 
 def runOne(test):
     '''
@@ -92,7 +125,7 @@ def runOne(test):
 def runSome():
     """ Unittest runner """
     tests = []
-    names = ['testRaetRoadStack', ]
+    names = ['testRaetRoadStack', 'testRaetRoadStackJoiner', ]
     tests.extend(map(BasicTestCase, names))  # pylint: disable=bad-builtin
     suite = unittest.TestSuite(tests)
     unittest.TextTestRunner(verbosity=2).run(suite)
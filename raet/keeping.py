@@ -20,6 +20,8 @@ except ImportError:
     msgpack = None
 
 import shutil
+import sqlite3
+from contextlib import contextmanager
 
 # Import ioflo libs
 from ioflo.aid.odicting import odict
@@ -96,6 +98,8 @@ class Keep(object):
 
         self.prefix = prefix
         self.ext = ext or self.Ext
+        self.depth = 0  # nesting depth of .batch
+        self.unsynced = []  # filepaths dumped in .batch but not yet synced
         if self.ext == 'msgpack' and not msgpack:
             self.ext = 'json'
 
@@ -103,9 +107,10 @@ class Keep(object):
                 "{0}.{1}".format(self.prefix, self.ext))
 
     @staticmethod
-    def dump(data, filepath):
+    def dump(data, filepath, sync=True):
         '''
         Write data as as type self.ext to filepath. json or msgpack
+        If not sync then leave flushing the file to disk to the caller
         '''
         if ' ' in filepath:
             raise raeting.KeepError("Invalid filepath '{0}' "
@@ -121,7 +126,8 @@ class Keep(object):
             with ocfn(filepath, "w+") as f:
                 json.dump(data, f, indent=2)
                 f.flush()
-                os.fsync(f.fileno())
+                if sync:
+                    os.fsync(f.fileno())
         elif ext == '.msgpack':
             if not msgpack:
                 raise raeting.KeepError("Invalid filepath ext '{0}' "
@@ -129,7 +135,8 @@ class Keep(object):
             with ocfn(filepath, "w+b", binary=True) as f:
                 msgpack.dump(data, f, encoding='utf-8')
                 f.flush()
-                os.fsync(f.fileno())
+                if sync:
+                    os.fsync(f.fileno())
         else:
             raise raeting.KeepError("Invalid filepath ext '{0}' "
                         "not '.json' or '.msgpack'".format(filepath))
@@ -163,6 +170,59 @@ class Keep(object):
             return None
         return it
 
+    @contextmanager
+    def batch(self):
+        '''
+        Context within which dumps are synced to disk together.
+        Files are written immediately but synced when the outermost batch
+        exits normally instead of each when dumped. Files of a batch that
+        raised are synced by the next batch that exits normally
+        '''
+        self.depth += 1
+        try:
+            yield self
+        finally:
+            self.depth -= 1
+        if not self.depth:
+            self.sync()
+
+    def save(self, data, filepath):
+        '''
+        Dump data to filepath deferring the sync to the end of .batch if any
+        '''
+        if self.depth:
+            self.dump(data, filepath, sync=False)
+            self.unsynced.append(filepath)
+        else:
+            self.dump(data, filepath)
+
+    def sync(self):
+        '''
+        Sync to disk files saved by .batch since last sync then their
+        directories so entries of newly created files are synced too
+        Only fsyncs these files not every filesystem as os.sync would
+        '''
+        if not self.unsynced:
+            return
+        dirpaths = set()
+        for filepath in set(self.unsynced):
+            if os.path.exists(filepath):
+                with open(filepath, 'r+b') as f:
+                    os.fsync(f.fileno())
+                dirpaths.add(os.path.dirname(filepath))
+        for dirpath in dirpaths:
+            try:
+                fd = os.open(dirpath, os.O_RDONLY)
+            except OSError:  # directories cannot be opened on windows
+                continue
+            try:
+                os.fsync(fd)
+            except OSError:  # directory fsync not supported
+                pass
+            finally:
+                os.close(fd)
+        self.unsynced = []
+
     def clearAllDir(self):
         '''
         Clear all the directories
@@ -204,7 +264,7 @@ class Keep(object):
         '''
         Dump the local data to file
         '''
-        self.dump(data, self.localfilepath)
+        self.save(data, self.localfilepath)
 
     def loadLocalData(self):
         '''
@@ -242,7 +302,7 @@ class Keep(object):
         filepath = os.path.join(self.remotedirpath,
                 "{0}.{1}.{2}".format(self.prefix, name, self.ext))
 
-        self.dump(data, filepath)
+        self.save(data, filepath)
 
     def dumpAllRemoteData(self, datadict):
         '''
@@ -266,7 +326,7 @@ class Keep(object):
         Load and Return the datadict from the all the remote data files
         indexed by name in filenames
         '''
-        keeps = odict()
+        keeps = raeting.Roster()
         for filename in os.listdir(self.remotedirpath):
             root, ext = os.path.splitext(filename)
             if ext not in ['.json', '.msgpack']:
@@ -349,6 +409,189 @@ class Keep(object):
         '''
         self.clearRemoteData(remote.name)
 
+class SqliteKeep(Keep):
+    '''
+    RAET protocol base class for data persistence in a single sqlite database
+    file in WAL mode instead of one file per lot. Same api as Keep.
+    Each table has rows of key and json serialized data
+        keep/
+            stackname/
+                keep.sqlite3
+
+    Dumps and clears within .batch() are committed in one transaction
+    '''
+    Filename = 'keep.sqlite3'
+    Tables = ['local', 'remote']
+    Synchronous = 'FULL'  # sqlite synchronous pragma, FULL syncs every commit
+
+    def __init__(self, **kwa):
+        '''
+        Setup SqliteKeep instance
+        '''
+        super(SqliteKeep, self).__init__(**kwa)
+        self.dbpath = os.path.join(self.dirpath, self.Filename)
+        self.db = None
+        self.open()
+
+    def open(self):
+        '''
+        Open database connection creating tables if needed
+        '''
+        if self.db is None:
+            # autocommit unless in .batch, stacks may be serviced by other thread
+            self.db = sqlite3.connect(self.dbpath,
+                                      isolation_level=None,
+                                      check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous={0}".format(self.Synchronous))
+            for table in self.Tables:
+                self.db.execute("CREATE TABLE IF NOT EXISTS {0} "
+                                "(key TEXT PRIMARY KEY, data TEXT NOT NULL)".format(table))
+
+    def close(self):
+        '''
+        Close database connection
+        '''
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+            self.depth = 0
+
+    @contextmanager
+    def batch(self):
+        '''
+        Context within which dumps and clears are committed in one transaction
+        Nested batches commit with the outermost
+        '''
+        if not self.depth:
+            self.db.execute("BEGIN")
+        self.depth += 1
+        try:
+            yield self
+        except:
+            self.depth -= 1
+            if not self.depth:
+                self.db.execute("ROLLBACK")
+            raise
+        self.depth -= 1
+        if not self.depth:
+            self.db.execute("COMMIT")
+
+    @staticmethod
+    def pack(data):
+        '''
+        Return json serialization of data
+        '''
+        if hasattr(data, 'get'):
+            for key, val in data.items():  # as Keep.dump
+                if isinstance(val, (bytes, bytearray)):
+                    data[key] = val.decode('utf-8')
+        return json.dumps(data)
+
+    @staticmethod
+    def unpack(text):
+        '''
+        Return data deserialized from json text
+        '''
+        return json.loads(text, object_pairs_hook=odict)
+
+    def dumpRow(self, table, key, data):
+        '''
+        Insert or replace data of key in table
+        '''
+        self.db.execute("INSERT OR REPLACE INTO {0} (key, data) "
+                        "VALUES (?, ?)".format(table), (key, self.pack(data)))
+
+    def loadRow(self, table, key):
+        '''
+        Return data of key in table or None if none
+        '''
+        row = self.db.execute("SELECT data FROM {0} WHERE key = ?".format(table),
+                              (key, )).fetchone()
+        return self.unpack(row[0]) if row else None
+
+    def loadRows(self, table):
+        '''
+        Return Roster odict of the data of every key in table in one query
+        '''
+        rows = self.db.execute("SELECT key, data FROM {0} ORDER BY rowid".format(table))
+        return raeting.Roster([(key, self.unpack(data)) for key, data in rows])
+
+    def clearRow(self, table, key):
+        '''
+        Delete key from table
+        '''
+        self.db.execute("DELETE FROM {0} WHERE key = ?".format(table), (key, ))
+
+    def clearRows(self, table):
+        '''
+        Delete every key from table
+        '''
+        self.db.execute("DELETE FROM {0}".format(table))
+
+    def clearAllDir(self):
+        '''
+        Close database and clear all the directories
+        '''
+        self.close()
+        super(SqliteKeep, self).clearAllDir()
+
+    def dumpLocalData(self, data):
+        '''
+        Dump the local data
+        '''
+        self.dumpRow('local', 'local', data)
+
+    def loadLocalData(self):
+        '''
+        Load and Return the local data
+        '''
+        return self.loadRow('local', 'local')
+
+    def clearLocalData(self):
+        '''
+        Clear the local data
+        '''
+        self.clearRow('local', 'local')
+
+    def dumpRemoteData(self, data, name):
+        '''
+        Dump the remote data
+        '''
+        self.dumpRow('remote', name, data)
+
+    def dumpAllRemoteData(self, datadict):
+        '''
+        Dump the data in the datadict keyed by name in one transaction
+        '''
+        with self.batch():
+            for name, data in datadict.items():
+                self.dumpRemoteData(data, name)
+
+    def loadRemoteData(self, name):
+        '''
+        Load and Return the remote data of name
+        '''
+        return self.loadRow('remote', name)
+
+    def loadAllRemoteData(self):
+        '''
+        Load and Return the datadict of the data of all remotes keyed by name
+        '''
+        return self.loadRows('remote')
+
+    def clearRemoteData(self, name):
+        '''
+        Clear the remote data of name
+        '''
+        self.clearRow('remote', name)
+
+    def clearAllRemoteData(self):
+        '''
+        Clear the data of all remotes
+        '''
+        self.clearRows('remote')
+
 class LotKeep(Keep):
     '''
     RAET protocol endpoint lot persistence
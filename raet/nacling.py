@@ -4,9 +4,14 @@ nacling.py raet protocol nacl (crypto) management classes
 '''
 
 # Import python libs
+import os
 import sys
 import time
+import struct
 import binascii
+import threading
+import ctypes
+from collections import deque
 import six
 import libnacl
 
@@ -20,6 +25,20 @@ from .abiding import *  # import globals
 from . import encoding
 
 
+def cbuffer(data):
+    '''
+    Returns data in a form libnacl can take without copying it.
+    bytes as is. Writable buffers such as bytearray or a memoryview of one as
+    a ctypes char array over the same memory. Read only buffers are copied
+    '''
+    if isinstance(data, bytes):
+        return data
+    try:
+        return (ctypes.c_char * len(data)).from_buffer(data)
+    except TypeError:  # read only such as memoryview of bytes
+        return bytes(data)
+
+
 class CryptoError(Exception):
     """
     Base exception for all nacl related errors
@@ -324,6 +343,18 @@ class VerifyKey(encoding.Encodable, StringFixer, object):
 
         return libnacl.crypto_sign_open(smessage, self._key)
 
+    def verifyDetached(self, signature, message):
+        """
+        Returns True if signature is valid for message False otherwise
+        Verifies in place without combining signature and message so message
+        may be any buffer, see cbuffer
+        """
+        try:
+            libnacl.crypto_sign_verify_detached(signature, cbuffer(message), self._key)
+        except ValueError:
+            return False
+        return True
+
 
 class SigningKey(encoding.Encodable, StringFixer, object):
     """
@@ -392,6 +423,13 @@ class SigningKey(encoding.Encodable, StringFixer, object):
 
         return SignedMessage._from_parts(signature, message, signed)
 
+    def signDetached(self, message):
+        """
+        Returns only the signature of message without copying message into
+        a signed message so message may be any buffer, see cbuffer
+        """
+        return libnacl.crypto_sign_detached(cbuffer(message), self._signing_key)
+
 
 class Signer(object):
     '''
@@ -421,37 +459,50 @@ class Signer(object):
     def signature(self, msg):
         '''
         Return only the signature string resulting from signing the message
+        msg may be bytes or a buffer such as bytearray or memoryview
         '''
-        return self.key.sign(msg).signature
+        return self.key.signDetached(msg)
 
 
 class Verifier(object):
     '''
     Used to verify messages with nacl digital signature
+        .key is the VerifyKey built from .keyraw on first use
     '''
     def __init__(self, key=None):
+        self._key = None
+        self.keyhex = ''
+        self.keyraw = ''
         if key:
-            if not isinstance(key, VerifyKey):
-                if len(key) == 32:
-                    key = VerifyKey(key, encoding.RawEncoder)
-                else:
-                    key = VerifyKey(key, encoding.HexEncoder)
-        self.key = key
-        if isinstance(self.key, VerifyKey):
-            self.keyhex = self.key.encode(encoding.HexEncoder)
-            self.keyraw = self.key.encode(encoding.RawEncoder)
-        else:
-            self.keyhex = ''
-            self.keyraw = ''
+            if isinstance(key, VerifyKey):
+                self._key = key
+                key = key.encode(encoding.RawEncoder)
+            elif len(key) != 32:
+                key = encoding.HexEncoder.decode(key)
+            if len(key) != libnacl.crypto_sign_PUBLICKEYBYTES:
+                raise ValueError("The key must be exactly {0} bytes "
+                                 "long".format(libnacl.crypto_sign_PUBLICKEYBYTES))
+            self.keyraw = key
+            self.keyhex = encoding.HexEncoder.encode(key)
+
+    @property
+    def key(self):
+        '''
+        property that returns VerifyKey or None if no key
+        '''
+        if self._key is None and self.keyraw:
+            self._key = VerifyKey(self.keyraw, encoding.RawEncoder)
+        return self._key
 
     def verify(self, signature, msg):
         '''
-        Verify the message
+        Verify the message against detached signature without copying them
+        msg may be bytes or a buffer such as bytearray or memoryview
         '''
-        if not self.key:
+        if not self.keyraw or len(signature) != libnacl.crypto_sign_BYTES:
             return False
         try:
-            self.key.verify(signature + msg)
+            libnacl.crypto_sign_verify_detached(signature, cbuffer(msg), self.keyraw)
         except ValueError:
             return False
         return True
@@ -461,30 +512,259 @@ class Publican(object):
     '''
     Container to manage remote nacl public key
         .key is the public key
-    Intelligently converts hex encoded to object
+    Intelligently converts hex encoded to object on first use of .key
     '''
     def __init__(self, key=None):
+        self._key = None
+        self.keyhex = ''
+        self.keyraw = ''
         if key:
-            if not isinstance(key, PublicKey):
-                if len(key) == 32:
-                    key = PublicKey(key, encoding.RawEncoder)
-                else:
-                    key = PublicKey(key, encoding.HexEncoder)
-        self.key = key
-        if isinstance(self.key, PublicKey):
-            self.keyhex = self.key.encode(encoding.HexEncoder)
-            self.keyraw = self.key.encode(encoding.RawEncoder)
+            if isinstance(key, PublicKey):
+                self._key = key
+                key = key.encode(encoding.RawEncoder)
+            elif len(key) != 32:
+                key = encoding.HexEncoder.decode(key)
+            if len(key) != PublicKey.SIZE:
+                raise ValueError("The public key must be exactly {0} bytes "
+                                 "long".format(PublicKey.SIZE))
+            self.keyraw = key
+            self.keyhex = encoding.HexEncoder.encode(key)
+
+    @property
+    def key(self):
+        '''
+        property that returns PublicKey or None if no key
+        '''
+        if self._key is None and self.keyraw:
+            self._key = PublicKey(self.keyraw, encoding.RawEncoder)
+        return self._key
+
+
+forks = [0]  # count of os.fork into this process, bumped in child
+if hasattr(os, 'register_at_fork'):
+    def _forked():
+        forks[0] += 1
+    os.register_at_fork(after_in_child=_forked)
+
+    def forkId():
+        '''
+        Returns id that changes in the child of every os.fork
+        '''
+        return forks[0]
+else:
+    forkId = os.getpid
+
+
+class KeyPool(object):
+    '''
+    Pool of pre-generated Curve25519 PrivateKeys so new key pairs are drawn
+    instead of generated on the critical path of allow handshakes
+        .low is the watermark below which the pool wants refill
+        .high is the watermark to which refill generates keys
+        .hits and .misses count draws served from the pool or generated
+    Refill either by calling .refill such as from idle service cycles or by
+    a background thread started with .start
+    Pooled keys are discarded after os.fork so parent and child never share
+    keys and a started refill thread is restarted in the child
+    Only for short term keys since any pooled key sat in memory before use
+    '''
+    Low = 16
+    High = 128
+
+    def __init__(self, low=None, high=None):
+        self.low = low if low is not None else self.Low
+        self.high = high if high is not None else self.High
+        self.keys = deque()  # append and popleft are thread safe
+        self.hits = 0
+        self.misses = 0
+        self.thread = None
+        self.event = threading.Event()
+        self.fork = forkId()
+
+    def __len__(self):
+        self.reforked()
+        return len(self.keys)
+
+    def reforked(self):
+        '''
+        Discard pooled keys and restart refill thread if any when in child of
+        os.fork since pool was created or last checked
+        Returns True if reforked
+        '''
+        if self.fork == forkId():
+            return False
+        self.fork = forkId()
+        self.keys.clear()
+        started = self.thread is not None  # thread did not survive fork
+        self.thread = None
+        self.event = threading.Event()
+        if started:
+            self.start()
+        return True
+
+    def draw(self):
+        '''
+        Returns duple (key, hit) of PrivateKey from pool and True
+        or newly generated PrivateKey and False when pool is empty
+        '''
+        self.reforked()
+        try:
+            key = self.keys.popleft()
+        except IndexError:
+            self.misses += 1
+            key, hit = PrivateKey.generate(), False
         else:
-            self.keyhex = ''
-            self.keyraw = ''
+            self.hits += 1
+            hit = True
+        if self.thread is not None and self.wanting():
+            self.event.set()
+        return (key, hit)
+
+    def wanting(self):
+        '''
+        Returns True if pool is below low watermark
+        '''
+        return len(self) < self.low
+
+    def refill(self, limit=None):
+        '''
+        Generate keys until pool is at high watermark or limit keys generated
+        Returns number of keys generated
+        '''
+        self.reforked()
+        count = 0
+        while len(self.keys) < self.high and (limit is None or count < limit):
+            self.keys.append(PrivateKey.generate())
+            count += 1
+        return count
+
+    def start(self):
+        '''
+        Start daemon thread that refills pool when draws take it below .low
+        '''
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="KeyPool")
+            self.thread.daemon = True
+            self.thread.start()
+            self.event.set()  # initial fill
+
+    def stop(self):
+        '''
+        Stop refill thread if any
+        '''
+        thread, self.thread = self.thread, None
+        if thread is not None:
+            self.event.set()
+            thread.join()
+
+    def run(self):
+        '''
+        Refill thread body
+        '''
+        while self.thread is threading.current_thread():
+            self.event.wait()
+            self.event.clear()
+            if self.thread is threading.current_thread():
+                self.refill()
+
+keyPool = KeyPool()  # default pool of remote short term keys
+
+
+class Noncer(object):
+    '''
+    Source of nonces for crypto_box encryption
+    Safe default that reads a fresh random nonce for every call
+    '''
+    def spawn(self):
+        '''
+        Returns nonce source for a new Privateer. Stateless so shared
+        '''
+        return self
+
+    def nonce(self):
+        '''
+        Returns random nonce
+        '''
+        return libnacl.randombytes(Box.NONCE_SIZE)
+
+
+class BulkNoncer(Noncer):
+    '''
+    Source of random nonces sliced from a buffer of .block nonces read with
+    one randombytes call instead of one call per nonce
+    Buffer is discarded after os.fork so parent and child never share nonces
+    '''
+    Block = 1024  # nonces read per randombytes call
+
+    def __init__(self, block=None):
+        self.block = block if block is not None else self.Block
+        self.buf = b''
+        self.index = 0
+        self.fork = None
+        self.lock = threading.Lock()
+
+    def nonce(self):
+        '''
+        Returns next random nonce from buffer refilling buffer when used up
+        '''
+        with self.lock:
+            if self.index >= len(self.buf) or self.fork != forkId():
+                self.buf = libnacl.randombytes(Box.NONCE_SIZE * self.block)
+                self.index = 0
+                self.fork = forkId()
+            nonce = self.buf[self.index:self.index + Box.NONCE_SIZE]
+            self.index += Box.NONCE_SIZE
+        return nonce
+
+
+class CounterNoncer(Noncer):
+    '''
+    Source of nonces made of a random .PrefixSize byte prefix and an 8 byte
+    big endian counter so needs no random bytes per nonce
+    Nonces from one source never repeat since the counter never repeats for
+    a prefix and the prefix is regenerated on counter wrap and after os.fork.
+    spawn gives each Privateer its own source so nonces are unique per shared
+    key. The other end of a shared key uses a different random prefix except
+    with probability 2**-128
+    '''
+    PrefixSize = 16  # bytes of random prefix, the other 8 are the counter
+
+    def __init__(self):
+        self.prefix = b''
+        self.counter = 0
+        self.fork = None
+        self.lock = threading.Lock()
+
+    def spawn(self):
+        '''
+        Returns new nonce source with its own prefix and counter
+        '''
+        return self.__class__()
+
+    def nonce(self):
+        '''
+        Returns prefix plus next counter
+        '''
+        with self.lock:
+            if self.fork != forkId() or self.counter >= 0xffffffffffffffff:
+                self.prefix = libnacl.randombytes(self.PrefixSize)
+                self.counter = 0
+                self.fork = forkId()
+            self.counter += 1
+            return self.prefix + struct.pack('>Q', self.counter)
+
+defaultNoncer = Noncer()  # nonce source spawned for each Privateer by default
 
 
 class Privateer(object):
     '''
     Container for local nacl key pair
         .key is the private key
+        .noncer is the nonce source for encrypt
+    New key pair is generated when key is not provided
+    Nonce source is spawned from defaultNoncer when noncer is not provided
     '''
-    def __init__(self, key=None):
+    def __init__(self, key=None, noncer=None):
         if key:
             if not isinstance(key, PrivateKey):
                 if len(key) == 32:
@@ -498,13 +778,14 @@ class Privateer(object):
         self.keyraw = self.key.encode(encoding.RawEncoder)
         self.pubhex = self.key.public_key.encode(encoding.HexEncoder)
         self.pubraw = self.key.public_key.encode(encoding.RawEncoder)
+        self.noncer = noncer if noncer is not None else defaultNoncer.spawn()
 
     def nonce(self):
         '''
         Generate a safe nonce value (safe assuming only this method is used to
         create nonce values)
         '''
-        return libnacl.randombytes(Box.NONCE_SIZE)
+        return self.noncer.nonce()
 
     def encrypt(self, msg, pubkey, enhex=False):
         '''
@@ -554,6 +835,49 @@ class Privateer(object):
         return box.decrypt(cipher, nonce, decoder)
 
 
+class Boxer(object):
+    '''
+    Caches the precomputed crypto_box shared key between a local Privateer
+    and a remote public key so that each encrypt/decrypt only runs
+    crypto_box_afternm/crypto_box_open_afternm instead of the Curve25519
+    scalar multiplication in crypto_box_beforenm.
+        .privateer is the local Privateer instance
+        .key is the remote PublicKey
+        .box is the Box holding the shared key
+    '''
+    def __init__(self, privateer, pubkey):
+        if not isinstance(pubkey, PublicKey):
+            if len(pubkey) == 32:
+                pubkey = PublicKey(pubkey, encoding.RawEncoder)
+            else:
+                pubkey = PublicKey(pubkey, encoding.HexEncoder)
+        self.privateer = privateer
+        self.key = pubkey
+        self.box = Box(privateer.key, pubkey)
+
+    def encrypt(self, msg, enhex=False):
+        '''
+        Return duple of (cyphertext, nonce) resulting from encrypting the message
+        using the cached shared key
+        If enhex is True then use HexEncoder otherwise use RawEncoder
+        '''
+        nonce = self.privateer.nonce()
+        encoder = encoding.HexEncoder if enhex else encoding.RawEncoder
+        encrypted = self.box.encrypt(msg, nonce, encoder)
+        return (encrypted.ciphertext, encrypted.nonce)
+
+    def decrypt(self, cipher, nonce, dehex=False):
+        '''
+        Return decrypted msg contained in cypher using nonce and the cached
+        shared key
+        If dehex is True then use HexEncoder otherwise use RawEncoder
+        '''
+        decoder = encoding.HexEncoder if dehex else encoding.RawEncoder
+        if dehex and len(nonce) != self.box.NONCE_SIZE:
+            nonce = decoder.decode(nonce)
+        return self.box.decrypt(cipher, nonce, decoder)
+
+
 def uuid(size=16):
     '''
     Generate universally unique id hex string with size characters
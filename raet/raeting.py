@@ -32,6 +32,16 @@ Header encoding.
         Lengths are encoded as hex strings
         The flags are encoded as a double char hex string in field 'fg'
 
+    When the head kind is binary = 2, then the header is a fixed layout of
+    big endian struct fields given by BINARY_HEAD_PACKER
+        ri vn pk hk hl pl se de si ti tk bk ck fk fl fg xg
+        The flags are packed into the single byte field 'fg'
+        The extension flags byte 'xg' has a bit per optional extension
+        that follows the fixed layout in bit order
+            BINARY_HEAD_SEGMENT sn sc ml when sc != 1
+            BINARY_HEAD_STAMP dt when dt != 0
+            BINARY_HEAD_ORDER oi when oi != 0
+
 header data =
 {
     ri: raet id Default 'RAET'
@@ -123,6 +133,9 @@ MAX_SEGMENT_COUNT = (2 ** 16) - 1  # 65535
 MAX_MESSAGE_SIZE = min(67107840, UDP_MAX_PACKET_SIZE * MAX_SEGMENT_COUNT)
 MAX_HEAD_SIZE = 255
 MAX_MISSEDS_RESEND = min((UDP_MAX_PACKET_SIZE - MAX_HEAD_SIZE - 110) // 6, 64)
+MAX_MISSEDS_COMPAT = 16  # leading misseds also listed in selective ack resend
+# max serialized size of selective ack of missed segments in resend body
+MAX_SACK_SIZE = UDP_MAX_PACKET_SIZE - MAX_HEAD_SIZE - 110 - 6 * MAX_MISSEDS_COMPAT - 32
 
 JSON_END = b'\r\n\r\n'
 HEAD_END = b'\n\n'
@@ -137,6 +150,17 @@ COOKIE_PACKER = struct.Struct('!80s24s')
 INITIATESTUFF_PACKER = struct.Struct('!32s48s24s128s')
 INITIATE_PACKER = struct.Struct('!32s24s248s24s')
 
+# binary head kind, see HeadKind.binary above
+BINARY_HEAD_ID = b'RAET'
+# ri vn pk hk hl pl se de si ti tk bk ck fk fl fg xg
+BINARY_HEAD_PACKER = struct.Struct('!4sBBBBIIIIIBBBBBBB')
+BINARY_SEGMENT_PACKER = struct.Struct('!III')  # sn sc ml
+BINARY_STAMP_PACKER = struct.Struct('!d')  # dt
+BINARY_ORDER_PACKER = struct.Struct('!I')  # oi
+BINARY_HEAD_SEGMENT = 0x01  # xg bit for segment extension
+BINARY_HEAD_STAMP = 0x02  # xg bit for datetime stamp extension
+BINARY_HEAD_ORDER = 0x04  # xg bit for order index extension
+
 
 def get_exception_error(ex):
     '''
@@ -151,6 +175,21 @@ def get_exception_error(ex):
         raise TypeError(emsg)
 
 
+class Roster(odict):
+    '''
+    odict whose item assignment checks for an existing key in the dict rather
+    than by scanning the key list so adding n keys is O(n) not O(n^2)
+    Used for remote indexes and keep tables that may hold many thousands of keys
+    '''
+    __slots__ = []
+
+    def __setitem__(self, key, val):
+        ''' x[key]=val'''
+        if not dict.__contains__(self, key):
+            self._keys.append(key)
+        dict.__setitem__(self, key, val)
+
+
 @enum.unique
 class HeadKind(enum.IntEnum):
     '''
@@ -257,6 +296,15 @@ class PcktKind(enum.IntEnum):
     unknown = 255
 
 
+# precomputed enum value sets for fast membership tests on pack and parse
+HEAD_KIND_VALUES = frozenset(kind.value for kind in HeadKind)
+BODY_KIND_VALUES = frozenset(kind.value for kind in BodyKind)
+FOOT_KIND_VALUES = frozenset(kind.value for kind in FootKind)
+COAT_KIND_VALUES = frozenset(kind.value for kind in CoatKind)
+TRNS_KIND_VALUES = frozenset(kind.value for kind in TrnsKind)
+PCKT_KIND_VALUES = frozenset(kind.value for kind in PcktKind)
+
+
 @enum.unique
 class Acceptance(enum.IntEnum):
     '''
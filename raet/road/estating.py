@@ -7,6 +7,7 @@ estating.py raet protocol estate classes
 
 import socket
 import uuid
+import random
 from collections import deque
 import sys
 if sys.version_info > (3,):
@@ -158,6 +159,7 @@ class Estate(lotting.Lot):
             raise raeting.EstateError(emsg)
         self.transactions[index] = transaction
         transaction.remote = self
+        self.stack.processes.schedule(transaction, transaction.nextDeadline())
         console.verbose( "Added transaction to {0} at '{1}'\n".format(self.name, index))
 
     def removeTransaction(self, index, transaction=None):
@@ -167,6 +169,7 @@ class Estate(lotting.Lot):
         '''
         if index in self.transactions: # fast way
             if not transaction or transaction is self.transactions[index]:
+                self.stack.processes.cancel(self.transactions[index])
                 del self.transactions[index]
                 console.verbose( "Removed transaction from {0} at"
                                  " '{1}'\n".format(self.name, index))
@@ -175,12 +178,14 @@ class Estate(lotting.Lot):
         if transaction: # find transaction slow way
             for i, trans in self.transactions.items():
                 if trans is transaction:
+                    self.stack.processes.cancel(trans)
                     del self.transactions[i]
                     console.concise( "Removed transaction from '{0}' at '{1}',"
                             " instead of at '{2}'\n".format(self.name, i, index))
 
     def addDoneTransaction(self, index):
         self.doneTransactions[index] = StoreTimer(self.stack.store, duration=self.stack.MsgStaleTimeout)
+        self.stack.cleanups.schedule(self, self.doneTransactions[index].stop)
 
     def cleanupDoneTransactions(self):
         for index, timer in self.doneTransactions.iteritems():
@@ -203,6 +208,17 @@ class Estate(lotting.Lot):
             transaction.process()
         self.cleanupDoneTransactions()
 
+    def nextDoneDeadline(self, after=None):
+        '''
+        Returns store stamp when the oldest done transaction expires if later
+        than after or None if none
+        '''
+        for timer in self.doneTransactions.values():  # oldest expires first
+            if after is None or timer.stop > after:
+                return timer.stop
+            break
+        return None
+
     @staticmethod
     def nameGuid(prefix='estate'):
         '''
@@ -244,7 +260,24 @@ class RemoteEstate(Estate):
     .alive = False, dead, recently have not received valid signed packets from remote
 
     .fuid is the far uid of the remote as owned by the farside stack
+
+    .srtt and .rttvar are the smoothed round trip time and its variation
+    estimated from unambiguous ack round trips (RFC 6298) from which .rto
+    the retransmission timeout used by transaction redo timers is derived
+
+    .burst is the adaptive number of message segments to send per burst.
+    Doubles on clean acks up to .burstThreshold then grows by one
+    and halves when more than BurstLossTolerance of a burst is reported
+    missed (AIMD)
     '''
+    RttAlpha = 0.125  # gain of smoothed round trip time
+    RttBeta = 0.25  # gain of round trip time variation
+    RtoMin = 0.05  # lower bound on retransmission timeout
+    RtoMax = 4.0  # upper bound on retransmission timeout
+    BurstMin = 1  # lower bound on adaptive burst size
+    BurstInit = 8  # initial adaptive burst size
+    BurstMax = 256  # upper bound on adaptive burst size
+    BurstLossTolerance = 0.125  # fraction of burst missed before decrease
 
     def __init__(self,
                  stack,
@@ -284,17 +317,27 @@ class RemoteEstate(Estate):
         self.main = main
         self.kind = kind
         self.joined = joined
-        self.allowed = None
-        self.alived = None
-        self.reaped = None
+        self._allowed = None
+        self._alived = None
+        self._reaped = None
         self.acceptance = acceptance
-        self.privee = nacling.Privateer() # short term key manager
-        self.publee = nacling.Publican() # correspondent short term key  manager
+        self._boxer = None # cached shared key box for privee and publee
+        self._privee = None # short term key manager generated on first allow
+        self._publee = None # correspondent short term key manager
         self.verfer = nacling.Verifier(verkey) # correspondent verify key manager
         self.pubber = nacling.Publican(pubkey) # correspondent long term key manager
 
         self.rsid = rsid # last sid received from remote when RmtFlag is True
 
+        self.srtt = None  # smoothed round trip time None until first sample
+        self.rttvar = None  # round trip time variation
+        self.rto = None  # retransmission timeout None until first sample
+        self.burst = self.BurstInit  # adaptive segments per message burst
+        self.burstThreshold = self.BurstMax  # end of doubling (slow start)
+
+        self.rxStamp = None  # store stamp of last valid packet received from remote
+        self.slotted = False  # keep alive deferred to reserved rate slot
+
         # persistence keep alive heartbeat timer. Initial duration has offset so
         # not synced with other side persistence heatbeet
         # by default do not use offset on main
@@ -309,6 +352,108 @@ class RemoteEstate(Estate):
                                            duration=self.stack.interim)
         self.messages = deque() # deque of saved stale message body data to remote.uid
 
+    @property
+    def allowed(self):
+        '''
+        property that returns allowed status of remote
+        '''
+        return self._allowed
+
+    @allowed.setter
+    def allowed(self, value):
+        if value != self._allowed:
+            self._allowed = value
+            self.updateAvailability()
+
+    @property
+    def alived(self):
+        '''
+        property that returns alived status of remote
+        '''
+        return self._alived
+
+    @alived.setter
+    def alived(self, value):
+        if value != self._alived:
+            self._alived = value
+            self.updateAvailability()
+
+    @property
+    def reaped(self):
+        '''
+        property that returns reaped status of remote
+        '''
+        return self._reaped
+
+    @reaped.setter
+    def reaped(self, value):
+        if value != self._reaped:
+            self._reaped = value
+            self.updateAvailability()
+
+    def updateAvailability(self):
+        '''
+        Update stack availability for changed status if remote is in stack
+        '''
+        if self.stack.remotes.get(self.uid) is self:
+            self.stack.updateAvailability(self)
+
+    @property
+    def ha(self):
+        '''
+        property that returns host address duple (host, port) of remote
+        '''
+        return self._ha
+
+    @ha.setter
+    def ha(self, value):
+        self.reindex('_ha', value)
+
+    @property
+    def role(self):
+        '''
+        property that returns role of remote
+        '''
+        return self._role
+
+    @role.setter
+    def role(self, value):
+        self.reindex('_role', value)
+
+    @property
+    def verfer(self):
+        '''
+        property that returns verfer, correspondent verify key manager
+        '''
+        return self._verfer
+
+    @verfer.setter
+    def verfer(self, value):
+        self.reindex('_verfer', value)
+
+    @property
+    def pubber(self):
+        '''
+        property that returns pubber, correspondent long term key manager
+        '''
+        return self._pubber
+
+    @pubber.setter
+    def pubber(self, value):
+        self.reindex('_pubber', value)
+
+    def reindex(self, attr, value):
+        '''
+        Set keyed attribute attr to value keeping stack secondary indexes of
+        remote consistent if remote is in stack
+        '''
+        indexed = self.stack.remotes.get(self.uid) is self
+        if indexed:
+            self.stack.unindexRemote(self)
+        setattr(self, attr, value)
+        if indexed:
+            self.stack.indexRemote(self)
+
     @property
     def nuid(self):
         '''
@@ -340,13 +485,64 @@ class RemoteEstate(Estate):
         '''
         self.nuid, self.fuid = value
 
+    @property
+    def privee(self):
+        '''
+        property that returns privee, local short term key manager
+        Draws short term key pair from stack key pool on first use since
+        .rekey on allow
+        '''
+        if self._privee is None:
+            key, hit = self.stack.keyPool.draw()
+            self.stack.incStat('keypool_hit' if hit else 'keypool_miss')
+            self._privee = nacling.Privateer(key=key)
+        return self._privee
+
+    @privee.setter
+    def privee(self, value):
+        '''
+        setter for privee property, invalidates cached shared key box
+        '''
+        self._privee = value
+        self._boxer = None
+
+    @property
+    def publee(self):
+        '''
+        property that returns publee, correspondent short term key manager
+        '''
+        if self._publee is None:
+            self._publee = nacling.Publican()
+        return self._publee
+
+    @publee.setter
+    def publee(self, value):
+        '''
+        setter for publee property, invalidates cached shared key box
+        '''
+        self._publee = value
+        self._boxer = None
+
+    @property
+    def boxer(self):
+        '''
+        property that returns boxer, the nacling.Boxer holding the precomputed
+        shared key from .privee and .publee so crypto_box_beforenm is only run
+        once per short term key pair instead of once per packet
+        Returns None if correspondent short term key is not yet known
+        '''
+        if self._boxer is None and self.publee.key:
+            self._boxer = nacling.Boxer(self.privee, self.publee.key)
+        return self._boxer
+
     def rekey(self):
         '''
         Regenerate short term keys
+        New key pair is generated lazily by first use of .privee
         '''
         self.allowed = None
-        self.privee = nacling.Privateer() # short term key
-        self.publee = nacling.Publican() # correspondent short term key  manager
+        self.privee = None # short term key
+        self.publee = None # correspondent short term key  manager
 
     def validRsid(self, rsid):
         '''
@@ -358,6 +554,44 @@ class RemoteEstate(Estate):
         '''
         return self.validateSid(new=rsid, old=self.rsid)
 
+    def updateRtt(self, rtt):
+        '''
+        Update round trip time estimates .srtt .rttvar and the derived
+        retransmission timeout .rto with sample round trip time rtt
+        '''
+        rtt = max(0.0, rtt)
+        if self.srtt is None:  # first sample
+            self.srtt = rtt
+            self.rttvar = rtt / 2.0
+        else:
+            self.rttvar = ((1.0 - self.RttBeta) * self.rttvar +
+                           self.RttBeta * abs(self.srtt - rtt))
+            self.srtt = (1.0 - self.RttAlpha) * self.srtt + self.RttAlpha * rtt
+        self.rto = min(max(self.srtt + 4.0 * self.rttvar, self.RtoMin), self.RtoMax)
+        self.stack.updateStat("{0}_rtt".format(self.name), self.srtt)
+
+    def increaseBurst(self):
+        '''
+        Increase adaptive burst size after a clean ack of a burst
+        Doubles below .burstThreshold otherwise adds one
+        Returns new burst size
+        '''
+        if self.burst < self.burstThreshold:
+            self.burst = min(self.burst * 2, self.burstThreshold)
+        else:
+            self.burst += 1
+        self.burst = min(self.burst, self.BurstMax)
+        return self.burst
+
+    def decreaseBurst(self):
+        '''
+        Halve adaptive burst size when segments are reported missed
+        Returns new burst size
+        '''
+        self.burstThreshold = max(self.burst // 2, self.BurstMin)
+        self.burst = self.burstThreshold
+        return self.burst
+
     def refresh(self, alived=True):
         '''
         Restart presence heartbeat timer and conditionally reapTimer
@@ -365,7 +599,9 @@ class RemoteEstate(Estate):
         If alived is True then set .alived to True and handle implications
         If alived is False the set .alived to False and handle implications
         '''
-        self.timer.restart(duration=self.stack.period)
+        self.timer.restart(duration=self.jittered(self.stack.period))
+        self.slotted = False
+        self.stack.manages.schedule(self, self.nextManageDeadline())
         if alived is None:
             return
 
@@ -376,17 +612,73 @@ class RemoteEstate(Estate):
         #otherwise let timer run both before and after are still dead
         self.alived = alived
 
+    def spread(self):
+        '''
+        Restart keep alive timer to fall due at random point within its initial
+        duration so remotes restored together do not all fall due together
+        '''
+        self.timer.restart(duration=self.timer.duration * random.random())
+
+    def jittered(self, duration):
+        '''
+        Returns duration randomly jittered by up to .stack.AliveJitter fraction
+        so keep alives of remotes refreshed together drift apart
+        '''
+        jitter = self.stack.AliveJitter
+        return duration * (1.0 + jitter * random.uniform(-1.0, 1.0))
+
+    def heard(self):
+        '''
+        Returns True if remote known alive has sent a valid packet since keep
+        alive timer was restarted so keep alive is redundant
+        '''
+        return (self.alived is True and self.allowed and
+                self.rxStamp is not None and self.rxStamp > self.timer.start)
+
+    def nextManageDeadline(self):
+        '''
+        Returns earliest store stamp at which .manage has timer based work
+        to do, the sooner of the keep alive and reap timer stops,
+        or None if none
+        An expired keep alive timer stays due until an alive restarts it
+        '''
+        if self.reaped:  # reaped remotes are not managed
+            return None
+        if self.stack.main and self.stack.interim > 0.0:  # only main reaps
+            return min(self.timer.stop, self.reapTimer.stop)
+        return self.timer.stop
+
     def manage(self, cascade=False, immediate=False):
         '''
         Perform time based processing of keep alive heatbeat
         '''
         if not self.reaped: # only manage alives if not already reaped
             if immediate or self.timer.expired:
-                # alive transaction restarts self.timer
-                self.stack.alive(uid=self.uid, cascade=cascade)
+                self.keepAlive(cascade=cascade, immediate=immediate)
             if self.stack.interim >  0.0 and self.reapTimer.expired:
                 self.reap()
 
+    def keepAlive(self, cascade=False, immediate=False):
+        '''
+        Start alive transaction which restarts self.timer unless remote has
+        been heard from since last refresh or stack keep alive rate budget is
+        spent in which case defer until reserved slot
+        '''
+        if not immediate and not self.slotted and self.heard():
+            self.stack.incStat('alive_skip')
+            self.refresh(alived=None)
+            return
+        if not self.slotted:
+            delay = self.stack.reserveAlive()
+            if delay > 0.0:
+                self.slotted = True
+                self.timer.restart(duration=delay)
+                self.stack.incStat('alive_defer')
+                return
+        self.slotted = False
+        self.stack.alive(uid=self.uid, cascade=cascade)
+        self.stack.countAlive()
+
     def reap(self):
         '''
         Remote is dead, reap it if main estate.
@@ -406,6 +698,7 @@ class RemoteEstate(Estate):
                     self.stack.name, self.name, self.stack.store.stamp))
             self.stack.incStat("remote_unreap")
             self.reaped = False
+            self.stack.manages.schedule(self, self.nextManageDeadline())
 
     def removeStaleCorrespondents(self):
         '''
@@ -109,6 +109,11 @@ class RoadKeep(keeping.Keep):
         self.localrolepath = os.path.join(self.localroledirpath,
                 "{0}.{1}".format('role', self.ext))
 
+        # in memory remote role table so joins do not read role files
+        self.roles = None  # cached remote role data keyed by role, None until loaded
+        self.roleMarks = dict()  # mark of persisted role data as cached keyed by role
+        self.dirtyRoles = set()  # roles changed in .roles but not yet dumped
+
     def clearAllDir(self):
         '''
         Clear all keep directories
@@ -127,7 +132,7 @@ class RoadKeep(keeping.Keep):
         '''
         Dump the local role data to file
         '''
-        self.dump(data, self.localrolepath)
+        self.save(data, self.localrolepath)
 
     def loadLocalRoleData(self):
         '''
@@ -153,41 +158,48 @@ class RoadKeep(keeping.Keep):
         if os.path.exists(self.localroledirpath):
             os.rmdir(self.localroledirpath)
 
-    def dumpRemoteRoleData(self, data, role):
+    def remoteRolePath(self, role):
         '''
-        Dump the role data to file
+        Returns filepath of the role data file for role
         '''
-        filepath = os.path.join(self.remoteroledirpath,
+        return os.path.join(self.remoteroledirpath,
                 "{0}.{1}.{2}".format('role', role, self.ext))
 
-        self.dump(data, filepath)
+    @staticmethod
+    def markFile(filepath):
+        '''
+        Returns duple (mtime, size) of file at filepath or None if no file
+        used to detect changes to the file by others
+        '''
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+        return (stat.st_mtime, stat.st_size)
 
-    def dumpAllRemoteRoleData(self, roles):
+    def markRemoteRole(self, role):
         '''
-        Dump the data in the roles keyed by role to role data files
+        Returns mark of persisted data of role that changes when changed by
+        others used to detect stale role table entries
         '''
-        for role, data in roles.items():
-            self.dumpRemoteRoleData(data, role)
+        return self.markFile(self.remoteRolePath(role))
 
-    def loadRemoteRoleData(self, role):
+    def readRemoteRole(self, role):
         '''
-        Load and Return the data from the role file
+        Return persisted data of role from role file or None if none
         '''
-        data = odict([(key, None) for key in self.RemoteRoleFields])
-        filepath = os.path.join(self.remoteroledirpath,
-                "{0}.{1}.{2}".format('role', role, self.ext))
+        filepath = self.remoteRolePath(role)
         if not os.path.exists(filepath):
-            data.update(role=role)
-            return data
-        data.update(self.load(filepath))
-        return data
+            return None
+        return self.load(filepath)
 
-    def loadAllRemoteRoleData(self):
+    def readAllRemoteRoles(self):
         '''
-        Load and Return the roles dict from the all the role data files
-        indexed by role in filenames
+        Return duple (roles, marks) of the persisted data and mark of every
+        role keyed by role from all the role data files
         '''
-        roles = odict()
+        roles = raeting.Roster()
+        marks = dict()
         for filename in os.listdir(self.remoteroledirpath):
             root, ext = os.path.splitext(filename)
             if ext not in ['.json', '.msgpack']:
@@ -196,19 +208,25 @@ class RoadKeep(keeping.Keep):
             if not role or prefix != 'role':
                 continue
             filepath = os.path.join(self.remoteroledirpath, filename)
+            marks[role] = self.markFile(filepath)
             roles[role] = self.load(filepath)
-        return roles
+        return (roles, marks)
 
-    def clearRemoteRoleData(self, role):
+    def writeRemoteRole(self, data, role):
         '''
-        Clear data from the role data file
+        Persist data of role to role file
         '''
-        filepath = os.path.join(self.remoteroledirpath,
-                "{0}.{1}.{2}".format('role', role, self.ext))
+        self.save(data, self.remoteRolePath(role))
+
+    def eraseRemoteRole(self, role):
+        '''
+        Remove role file of role
+        '''
+        filepath = self.remoteRolePath(role)
         if os.path.exists(filepath):
             os.remove(filepath)
 
-    def clearAllRemoteRoleData(self):
+    def eraseAllRemoteRoles(self):
         '''
         Remove all the role data files
         '''
@@ -223,6 +241,109 @@ class RoadKeep(keeping.Keep):
             if os.path.exists(filepath):
                 os.remove(filepath)
 
+    def dumpRemoteRoleData(self, data, role):
+        '''
+        Dump the role data
+        '''
+        self.writeRemoteRole(data, role)
+        if self.roles is not None:
+            self.roles[role] = odict(data)
+            self.roleMarks[role] = self.markRemoteRole(role)
+        self.dirtyRoles.discard(role)
+
+    def stageRemoteRoleData(self, data, role):
+        '''
+        Update role data in the role table and defer dumping until
+        .flushRemoteRoleData so repeated changes are coalesced
+        '''
+        if self.roles is None:
+            self.loadAllRemoteRoleData()
+        self.roles[role] = odict(data)
+        self.dirtyRoles.add(role)
+
+    def flushRemoteRoleData(self):
+        '''
+        Dump role data of roles changed since last flush together
+        Returns number of roles dumped
+        '''
+        count = len(self.dirtyRoles)
+        with self.batch():
+            for role in list(self.dirtyRoles):
+                self.dumpRemoteRoleData(self.roles[role], role)
+        return count
+
+    def fetchRemoteRoleData(self, role):
+        '''
+        Return the cached data of role from the role table or None if none
+        Reloads the role if changed by others since cached
+        '''
+        if self.roles is None:
+            self.loadAllRemoteRoleData()
+        if role not in self.dirtyRoles:
+            mark = self.markRemoteRole(role)
+            if mark != self.roleMarks.get(role):  # changed by others
+                data = self.readRemoteRole(role)
+                if data:
+                    self.roles[role] = data
+                else:
+                    self.roles.pop(role, None)
+                self.roleMarks[role] = mark
+        return self.roles.get(role)
+
+    def dumpAllRemoteRoleData(self, roles):
+        '''
+        Dump the data in the roles keyed by role
+        '''
+        with self.batch():
+            for role, data in roles.items():
+                self.dumpRemoteRoleData(data, role)
+
+    def loadRemoteRoleData(self, role):
+        '''
+        Load and Return the data of role
+        '''
+        data = odict([(key, None) for key in self.RemoteRoleFields])
+        roleData = self.fetchRemoteRoleData(role)
+        if roleData is None:
+            data.update(role=role)
+            return data
+        data.update(roleData)
+        return data
+
+    def loadAllRemoteRoleData(self):
+        '''
+        Load and Return the roles dict of the data of all roles keyed by role
+        Also reloads the role table except for roles not yet dumped
+        '''
+        roles, marks = self.readAllRemoteRoles()
+        table = dict([(role, odict(data)) for role, data in roles.items() if data])
+        for role in self.dirtyRoles:
+            roles[role] = odict(self.roles[role])
+            table[role] = self.roles[role]
+            marks.pop(role, None)
+        self.roles = table
+        self.roleMarks = marks
+        return roles
+
+    def clearRemoteRoleData(self, role):
+        '''
+        Clear data of role
+        '''
+        self.eraseRemoteRole(role)
+        if self.roles is not None:
+            self.roles.pop(role, None)
+        self.roleMarks.pop(role, None)
+        self.dirtyRoles.discard(role)
+
+    def clearAllRemoteRoleData(self):
+        '''
+        Clear data of all roles
+        '''
+        self.eraseAllRemoteRoles()
+        self.roles = None
+        self.roleMarks = dict()
+        self.dirtyRoles = set()
+
     def clearRemoteRoleDir(self):
         '''
         Clear the Remote Role directory
@@ -360,6 +481,8 @@ class RoadKeep(keeping.Keep):
                                  verhex=str(remote.verfer.keyhex.decode('ISO-8859-1')),
                                  pubhex=str(remote.pubber.keyhex.decode('ISO-8859-1')),
                                  dump=dump, )
+        if dump:
+            self.flushRemoteRoleData()
 
         remote.acceptance = status
 
@@ -374,6 +497,8 @@ class RoadKeep(keeping.Keep):
 
         If dump  when appropriate
         Then persist key data differentially based on status
+        Persisting is deferred until .flushRemoteRoleData so that a join storm
+        of remotes sharing roles coalesces into one dump per role
 
         In many cases a status of rejected is returned because the provided keys are
         different but this does not change the acceptance status for
@@ -454,7 +579,7 @@ class RoadKeep(keeping.Keep):
 
             if dirty and self.verifyRemoteData(data,
                                                remoteFields=self.RemoteRoleFields):
-                self.dumpRemoteRoleData(data, role)
+                self.stageRemoteRoleData(data, role)
 
         return status
 
@@ -479,6 +604,115 @@ class RoadKeep(keeping.Keep):
         remote.acceptance = Acceptance.accepted.value
         self.dumpRemoteRole(remote)
 
+class SqliteRoadKeep(RoadKeep, keeping.SqliteKeep):
+    '''
+    RAET protocol estate on road data persistence in a single sqlite database
+    file instead of one file per remote and role. Same api as RoadKeep.
+    Loads of all remotes or roles are one query each and dumps within
+    .batch(), such as role flushes, are one transaction
+
+    keep/
+        stackname/
+            keep.sqlite3
+
+    Role data is kept in the database not in the role directory. Role data
+    changed by other connections to the database is detected by sqlite
+    data_version
+    '''
+    Tables = ['local', 'remote', 'role']
+
+    def dumpLocalRoleData(self, data):
+        '''
+        Dump the local role data
+        '''
+        self.dumpRow('local', 'role', data)
+
+    def loadLocalRoleData(self):
+        '''
+        Load and Return the local role data
+        '''
+        data = odict([(key, None) for key in self.LocalRoleFields])
+        roleData = self.loadRow('local', 'role')
+        if roleData:
+            data.update(roleData)
+        return data
+
+    def clearLocalRoleData(self):
+        '''
+        Clear the local role data
+        '''
+        self.clearRow('local', 'role')
+
+    def markRemoteRole(self, role):
+        '''
+        Returns sqlite data_version which changes when any other connection
+        commits so cached roles are reloaded after changes by others
+        '''
+        return self.db.execute("PRAGMA data_version").fetchone()[0]
+
+    def readRemoteRole(self, role):
+        '''
+        Return persisted data of role or None if none
+        '''
+        return self.loadRow('role', role)
+
+    def readAllRemoteRoles(self):
+        '''
+        Return duple (roles, marks) of the persisted data and mark of every
+        role keyed by role in one query
+        '''
+        mark = self.markRemoteRole(None)
+        roles = self.loadRows('role')
+        return (roles, dict((role, mark) for role in roles))
+
+    def writeRemoteRole(self, data, role):
+        '''
+        Persist data of role
+        '''
+        self.dumpRow('role', role, data)
+
+    def eraseRemoteRole(self, role):
+        '''
+        Remove persisted data of role
+        '''
+        self.clearRow('role', role)
+
+    def eraseAllRemoteRoles(self):
+        '''
+        Remove persisted data of all roles
+        '''
+        self.clearRows('role')
+
+def migrateKeep(dirpath, roledirpath='', ext='', clear=False):
+    '''
+    Convenience function to migrate road keep data in the directory of files
+    layout at dirpath, with role data at roledirpath if given, into a
+    SqliteRoadKeep database at dirpath in one transaction.
+    If clear then remove the migrated files
+    Returns the SqliteRoadKeep
+    '''
+    road = RoadKeep(dirpath=dirpath, roledirpath=roledirpath, ext=ext)
+    base = SqliteRoadKeep(dirpath=dirpath, roledirpath=roledirpath, ext=ext)
+    with base.batch():
+        data = keeping.Keep.loadLocalData(road)
+        if data:
+            base.dumpLocalData(data)
+        if os.path.exists(road.localrolepath):
+            base.dumpLocalRoleData(road.load(road.localrolepath))
+        for name, data in keeping.Keep.loadAllRemoteData(road).items():
+            if data:
+                base.dumpRemoteData(data, name)
+        roles, marks = road.readAllRemoteRoles()
+        for role, data in roles.items():
+            if data:
+                base.dumpRemoteRoleData(data, role)
+    if clear:
+        road.clearLocalData()
+        road.clearLocalRoleData()
+        road.clearAllRemoteData()
+        road.clearAllRemoteRoleData()
+    return base
+
 def clearAllKeep(dirpath):
     '''
     Convenience function to clear all road keep data in dirpath
@@ -6,7 +6,15 @@ packeting module provides classes for Raet packets
 '''
 
 # Import python libs
+import struct
+import binascii
+import threading
 from collections import Mapping, deque
+try:
+    from concurrent import futures
+except ImportError:
+    futures = None
+
 try:
     import simplejson as json
 except ImportError:
@@ -19,7 +27,6 @@ except ImportError:
 
 # Import ioflo libs
 from ioflo.aid.odicting import odict
-from ioflo.aid.aiding import packByte, unpackByte
 
 from ioflo.base.consoling import getConsole
 console = getConsole()
@@ -30,11 +37,111 @@ from .. import raeting
 from ..raeting import (PcktKind, TailSize, CoatKind, FootSize, FootKind,
                        BodyKind, HeadKind, TrnsKind)
 
+# plain dict copy of raeting.PACKET_DEFAULTS. Packet .data is copied from this
+# since copying an odict field by field dominated packet creation cost
+PACKET_DEFAULTS = dict(raeting.PACKET_DEFAULTS)
+
+# (field, default) duples of non flag head fields in header order
+HEAD_KIT_DEFAULTS = tuple((k, v) for k, v in raeting.PACKET_DEFAULTS.items()
+                          if (k in raeting.PACKET_HEAD_FIELDS and
+                              k not in raeting.PACKET_FLAGS))
+
+# (bit mask, field) duples of flag fields packed msb first into flags byte
+FLAG_MASKS = tuple((0x80 >> i, field) for i, field in enumerate(raeting.PACKET_FLAG_FIELDS))
+
+def tobytes(packed):
+    '''
+    Returns packed as bytes. Only copies if packed is a memoryview
+    such as a view into a reassembled segmented message buffer
+    '''
+    return packed.tobytes() if isinstance(packed, memoryview) else packed
+
+def sackify(misseds):
+    '''
+    Returns selective ack odict of the ascending segment numbers in misseds
+    as base segment number plus either runs, alternating lengths of missed
+    and received runs of segments from base, or bitmap, hex of bits msb first
+    with a set bit for each missed segment from base, whichever is smaller
+    '''
+    base = misseds[0]
+    span = misseds[-1] - base + 1
+    runs = []
+    start = end = base  # current run of missed [start, end)
+    for sn in misseds:
+        if sn != end:  # gap of received
+            runs.extend([end - start, sn - end])
+            start = sn
+        end = sn + 1
+    runs.append(end - start)
+
+    bitmap = bytearray((span + 7) // 8)
+    for sn in misseds:
+        i = sn - base
+        bitmap[i // 8] |= 0x80 >> (i % 8)
+    bitmap = binascii.hexlify(bytes(bitmap)).decode('ascii')
+    if len(json.dumps(runs, separators=(',', ':'))) <= len(bitmap):
+        return odict(base=base, runs=runs)
+    return odict(base=base, bitmap=bitmap)
+
+def unsackify(sack, end):
+    '''
+    Returns list of missed segment numbers from selective ack odict sack
+    Raises PacketError if sack is malformed or describes segment numbers
+    not less than end
+    '''
+    try:
+        base = sack['base']
+        runs = sack.get('runs')
+        if not isinstance(base, int) or base < 0:
+            raise ValueError("Invalid base '{0}'".format(base))
+        misseds = []
+        if runs is not None:
+            if sum(runs) + base > end or any(run < 0 for run in runs):
+                raise ValueError("Invalid runs '{0}'".format(runs))
+            sn = base
+            for i, run in enumerate(runs):
+                if not i % 2:  # missed run
+                    misseds.extend(range(sn, sn + run))
+                sn += run
+        else:
+            bitmap = bytearray(binascii.unhexlify(sack['bitmap']))
+            if base + len(bitmap) * 8 > end + 7:
+                raise ValueError("Invalid bitmap length '{0}'".format(len(bitmap)))
+            for i, byte in enumerate(bitmap):
+                if byte:
+                    for j in range(8):
+                        if byte & (0x80 >> j):
+                            misseds.append(base + i * 8 + j)
+            if misseds and misseds[-1] >= end:
+                raise ValueError("Invalid bitmap '{0}'".format(sack['bitmap']))
+    except (KeyError, TypeError, ValueError, binascii.Error) as ex:
+        emsg = "Invalid selective ack '{0}'. {1}".format(sack, ex)
+        raise raeting.PacketError(emsg)
+    return misseds
+
+def packMisseds(misseds, size=raeting.MAX_SACK_SIZE):
+    '''
+    Returns duple (body, remainders) where body is resend body odict with a
+    selective ack of as many of the ascending segment numbers in misseds as
+    fit in size and remainders is list of the rest. The leading misseds are
+    also listed for senders without selective ack support
+    '''
+    count = len(misseds)
+    while True:
+        sack = sackify(misseds[:count])
+        if count == 1 or len(json.dumps(sack, separators=(',', ':'))) <= size:
+            break
+        count = (count + 1) // 2
+    body = odict(misseds=list(misseds[:min(count, raeting.MAX_MISSEDS_COMPAT)]),
+                 sack=sack)
+    return (body, misseds[count:])
+
 class Part(object):
     '''
     Base class for parts of a RAET packet
     Should be subclassed
     '''
+    __slots__ = ('packet', 'packed')
 
     def __init__(self, packet=None, **kwa):
         '''
@@ -61,6 +168,8 @@ class Head(Part):
     RAET protocol packet header class
     Manages the header portion of a packet
     '''
+    __slots__ = ()
+
     def __init__(self, **kwa):
         '''
         Setup Head instance
@@ -71,6 +180,8 @@ class TxHead(Head):
     '''
     RAET protocol transmit packet header class
     '''
+    __slots__ = ()
+
     def pack(self):
         '''
         Composes .packed, which is the packed form of this part
@@ -78,14 +189,17 @@ class TxHead(Head):
         self.packed = b''
         data = self.packet.data  # for speed
         data['fl'] = self.packet.foot.size
-        data['fg'] = "{0:02x}".format(self.packFlags())
+        flags = self.packFlags()
+        data['fg'] = "{0:02x}".format(flags)
+
+        if data['hk'] == HeadKind.binary:
+            self.packBinary(flags)
+            return
 
         # kit always includes raet id, packet length, header kind and flag fields
         kit = odict([('ri', 'RAET'), ('pl', 0), ('hl', 0), ('fg', '00')])
-        for k, v in raeting.PACKET_DEFAULTS.items():  # include if not equal to default
-            if ((k in raeting.PACKET_HEAD_FIELDS) and
-                (k not in raeting.PACKET_FLAGS) and
-                (data[k] != v)):
+        for k, v in HEAD_KIT_DEFAULTS:  # include if not equal to default
+            if data[k] != v:
                 kit[k] = data[k]
 
         if data['hk'] == HeadKind.raet:
@@ -150,19 +264,77 @@ class TxHead(Head):
                                          ns2b('"hl":"{0}"'.format("{0:02x}".format(hl)[-2:])),
                                          1)  # JSON needs double quotes on strings
 
+    def packBinary(self, flags):
+        '''
+        Composes .packed for binary head kind from the fixed struct layout
+        followed by any needed extensions
+        '''
+        data = self.packet.data  # for speed
+        xg = 0
+        exts = []
+        try:
+            if data['sc'] != 1 or data['sn'] != 0 or data['ml'] != 0:
+                xg |= raeting.BINARY_HEAD_SEGMENT
+                exts.append(raeting.BINARY_SEGMENT_PACKER.pack(data['sn'],
+                                                               data['sc'],
+                                                               data['ml']))
+            if data['dt']:
+                xg |= raeting.BINARY_HEAD_STAMP
+                exts.append(raeting.BINARY_STAMP_PACKER.pack(data['dt']))
+            if data['oi']:
+                xg |= raeting.BINARY_HEAD_ORDER
+                exts.append(raeting.BINARY_ORDER_PACKER.pack(data['oi']))
+
+            hl = raeting.BINARY_HEAD_PACKER.size + sum(len(ext) for ext in exts)
+            data['hl'] = hl
+
+            if self.packet.coat.size > raeting.MAX_MESSAGE_SIZE:
+                emsg = "Packed message length of {0}, exceeds max of {1}".format(
+                         self.packet.coat.size, raeting.MAX_MESSAGE_SIZE)
+                raise raeting.PacketError(emsg)
+            pl = hl + self.packet.coat.size + data['fl']
+            data['pl'] = pl
+
+            head = raeting.BINARY_HEAD_PACKER.pack(raeting.BINARY_HEAD_ID,
+                                                   data['vn'],
+                                                   data['pk'],
+                                                   data['hk'],
+                                                   hl,
+                                                   pl,
+                                                   data['se'],
+                                                   data['de'],
+                                                   data['si'],
+                                                   data['ti'],
+                                                   data['tk'],
+                                                   data['bk'],
+                                                   data['ck'],
+                                                   data['fk'],
+                                                   data['fl'],
+                                                   flags,
+                                                   xg)
+        except struct.error as ex:
+            emsg = "Invalid binary head field value. {0}".format(ex)
+            raise raeting.PacketError(emsg)
+
+        self.packed = b''.join([head] + exts)
+
     def packFlags(self):
         '''
-        Packs all the flag fields into a single two char hex string
+        Packs all the flag fields into a single byte value
         '''
-        values = []
-        for field in raeting.PACKET_FLAG_FIELDS:
-            values.append(1 if self.packet.data.get(field, 0) else 0)
-        return packByte(fmt=b'11111111', fields=values)
+        data = self.packet.data  # for speed
+        flags = 0
+        for mask, field in FLAG_MASKS:
+            if data.get(field, 0):
+                flags |= mask
+        return flags
 
 class RxHead(Head):
     '''
     RAET protocol receive packet header class
     '''
+    __slots__ = ()
+
     def parse(self):
         '''
         From .packed.packed, Detects head kind. Unpacks head. Parses head and updates
@@ -173,7 +345,10 @@ class RxHead(Head):
         data = self.packet.data  # for speed
         packed = self.packet.packed  # for speed
 
-        if packed.startswith(b'ri RAET\n') and raeting.HEAD_END in packed: # raet head
+        if packed.startswith(raeting.BINARY_HEAD_ID):  # binary head
+            self.parseBinary()
+
+        elif packed.startswith(b'ri RAET\n') and raeting.HEAD_END in packed: # raet head
             hk = HeadKind.raet.value
             front, sep, back = packed.partition(raeting.HEAD_END)
             self.packed = front + sep
@@ -241,20 +416,76 @@ class RxHead(Head):
             emsg = "Unrecognizable packet head."
             raise raeting.PacketError(emsg)
 
+    def parseBinary(self):
+        '''
+        Unpacks and parses binary head kind from .packet.packed
+        and updates .packet.data
+        Raises PacketError if failure occurs
+        '''
+        data = self.packet.data  # for speed
+        packed = self.packet.packed  # for speed
+        try:
+            (ri, vn, pk, hk, hl, pl, se, de, si, ti, tk,
+                bk, ck, fk, fl, fg, xg) = raeting.BINARY_HEAD_PACKER.unpack_from(packed)
+            size = raeting.BINARY_HEAD_PACKER.size
+
+            if xg & ~(raeting.BINARY_HEAD_SEGMENT |
+                      raeting.BINARY_HEAD_STAMP |
+                      raeting.BINARY_HEAD_ORDER):
+                emsg = "Unknown binary head extension '{0:02x}'".format(xg)
+                raise raeting.PacketError(emsg)
+            if xg & raeting.BINARY_HEAD_SEGMENT:
+                (data['sn'], data['sc'],
+                    data['ml']) = raeting.BINARY_SEGMENT_PACKER.unpack_from(packed, size)
+                size += raeting.BINARY_SEGMENT_PACKER.size
+            if xg & raeting.BINARY_HEAD_STAMP:
+                data['dt'], = raeting.BINARY_STAMP_PACKER.unpack_from(packed, size)
+                size += raeting.BINARY_STAMP_PACKER.size
+            if xg & raeting.BINARY_HEAD_ORDER:
+                data['oi'], = raeting.BINARY_ORDER_PACKER.unpack_from(packed, size)
+                size += raeting.BINARY_ORDER_PACKER.size
+        except struct.error as ex:
+            emsg = "Unpackable binary head. {0}".format(ex)
+            raise raeting.PacketError(emsg)
+
+        if hk != HeadKind.binary:
+            emsg = 'Recognized head kind does not match head field value.'
+            raise raeting.PacketError(emsg)
+
+        if hl != size:
+            emsg = 'Actual head length = {0} not match head field = {1}'.format(
+                    size, hl)
+            raise raeting.PacketError(emsg)
+
+        if pl != self.packet.size:
+            emsg = 'Actual packet length = {0} not match head field = {1}'.format(
+                self.packet.size, pl)
+            raise raeting.PacketError(emsg)
+
+        self.packed = packed[:hl]
+        data.update(ri='RAET', vn=vn, pk=pk, pl=pl, hk=hk, hl=hl,
+                    se=se, de=de, si=si, ti=ti, tk=tk,
+                    bk=bk, ck=ck, fk=fk, fl=fl, fg="{0:02x}".format(fg))
+        for mask, field in FLAG_MASKS:
+            data[field] = True if fg & mask else False
+
     def unpackFlags(self, flags):
         '''
         Unpacks all the flag fields from a single two char hex string
         '''
-        values = unpackByte(fmt=b'11111111', byte=int(flags, 16), boolean=True)
-        for i, field in enumerate(raeting.PACKET_FLAG_FIELDS):
-            if field in self.packet.data:
-                self.packet.data[field] = values[i]
+        data = self.packet.data  # for speed
+        flags = int(flags, 16)
+        for mask, field in FLAG_MASKS:
+            if field in data:
+                data[field] = True if flags & mask else False
 
 class Body(Part):
     '''
     RAET protocol packet body class
     Manages the message portion of the packet
     '''
+    __slots__ = ('data',)
+
     def __init__(self, data=None, **kwa):
         '''
         Setup Body instance
@@ -268,6 +499,8 @@ class TxBody(Body):
     '''
     RAET protocol tx packet body class
     '''
+    __slots__ = ()
+
     def pack(self):
         '''
         Composes .packed, which is the packed form of this part
@@ -292,6 +525,8 @@ class RxBody(Body):
     '''
     RAET protocol rx packet body class
     '''
+    __slots__ = ()
+
     def parse(self):
         '''
         Parses body. Assumes already unpacked.
@@ -299,7 +534,7 @@ class RxBody(Body):
         '''
         bk = self.packet.data['bk']
 
-        if bk not in list(BodyKind):
+        if bk not in raeting.BODY_KIND_VALUES:
             self.packet.data['bk']= BodyKind.unknown.value
             emsg = "Unrecognizable packet body."
             raise raeting.PacketError(emsg)
@@ -308,7 +543,7 @@ class RxBody(Body):
 
         if bk == BodyKind.json:
             if self.packed:
-                kit = json.loads(self.packed.decode(encoding='utf-8'),
+                kit = json.loads(tobytes(self.packed).decode(encoding='utf-8'),
                                  object_pairs_hook=odict,
                                  encoding='utf-8')
                 if not isinstance(kit, Mapping):
@@ -328,7 +563,7 @@ class RxBody(Body):
                     raise raeting.PacketError(emsg)
                 self.data = kit
         elif bk == BodyKind.raw:
-            self.data = self.packed # return as bytes
+            self.data = tobytes(self.packed) # return as bytes
         elif bk == BodyKind.nada:
             pass
 
@@ -337,6 +572,8 @@ class Coat(Part):
     RAET protocol packet coat class
     Supports encapsulated encrypt/decrypt of body portion of packet
     '''
+    __slots__ = ()
+
     def __init__(self, **kwa):
         ''' Setup Coat instance'''
         super(Coat, self).__init__(**kwa)
@@ -345,6 +582,8 @@ class TxCoat(Coat):
     '''
     RAET protocol tx packet coat class
     '''
+    __slots__ = ()
+
     def pack(self):
         '''
         Composes .packed, which is the packed form of this part
@@ -365,13 +604,15 @@ class RxCoat(Coat):
     '''
     RAET protocol rx packet coat class
     '''
+    __slots__ = ()
+
     def parse(self):
         '''
         Parses coat. Assumes already unpacked.
         '''
         ck = self.packet.data['ck']
 
-        if ck not in list(CoatKind):
+        if ck not in raeting.COAT_KIND_VALUES:
             self.packet.data['ck'] = CoatKind.unknown.value
             emsg = "Unrecognizable packet coat."
             raise raeting.PacketError(emsg)
@@ -379,8 +620,8 @@ class RxCoat(Coat):
         if ck == CoatKind.nacl:
             if self.packed:
                 tl = TailSize.nacl.value # nonce length
-                cipher = self.packed[:-tl]
-                nonce = self.packed[-tl:]
+                cipher = self.packed[:-tl]  # no copy if memoryview
+                nonce = tobytes(self.packed[-tl:])
                 msg = self.packet.decrypt(cipher, nonce)
                 self.packet.body.packed = msg
             else:
@@ -395,6 +636,8 @@ class Foot(Part):
     RAET protocol packet foot class
     Manages the signing or authentication of the packet
     '''
+    __slots__ = ()
+
     def __init__(self, **kwa):
         '''
         Setup Foot instance
@@ -405,6 +648,7 @@ class TxFoot(Foot):
     '''
     RAET protocol transmit packet foot class
     '''
+    __slots__ = ()
 
     def pack(self):
         '''
@@ -413,7 +657,7 @@ class TxFoot(Foot):
         self.packed = b''
         fk = self.packet.data['fk']
 
-        if fk not in list(FootKind):
+        if fk not in raeting.FOOT_KIND_VALUES:
             self.packet.data['fk'] = FootKind.unknown.value
             emsg = "Unrecognizable packet foot."
             raise raeting.PacketError(emsg)
@@ -429,7 +673,7 @@ class TxFoot(Foot):
         Compute signature on packet.packed and update packet.packet with signature
         '''
         fk = self.packet.data['fk']
-        if fk not in list(FootKind):
+        if fk not in raeting.FOOT_KIND_VALUES:
             self.packet.data['fk'] = FootKind.unknown.value
             emsg = "Unrecognizable packet foot."
             raise raeting.PacketError(emsg)
@@ -444,6 +688,8 @@ class RxFoot(Foot):
     '''
     RAET protocol receive packet foot class
     '''
+    __slots__ = ()
+
     def parse(self):
         '''
         Parses foot. Assumes foot already unpacked
@@ -453,7 +699,7 @@ class RxFoot(Foot):
         tk = self.packet.data['tk']
         self.packed = b''
 
-        if fk not in list(FootKind):
+        if fk not in raeting.FOOT_KIND_VALUES:
             self.packet.data['fk'] = FootKind.unknown.value
             emsg = "Unrecognizable packet foot."
             raise raeting.PacketError(emsg)
@@ -475,18 +721,15 @@ class RxFoot(Foot):
                     "kind size '{1}'".format(self.size, FootSize.nacl.value))
                 raise raeting.PacketError(emsg)
 
-            signature = self.packed
+            signature = tobytes(self.packed)
             blank = b''.rjust(FootSize.nacl.value, b'\x00')
 
-            front = self.packet.packed[:self.packet.size - fl]
-
-            msg = front + blank
+            # signed with blank foot so one copy of packet with foot blanked
+            # in place verified without further copy via nacling.cbuffer
+            msg = bytearray(self.packet.packed)
+            msg[self.packet.size - fl:] = blank
             if not self.packet.verify(signature, msg):
-                if self.packet.data['de'] not in self.packet.stack.remotes:
-                    reason =  "nuid not in remotes"
-                else:
-                    reason = "key invalid"
-                emsg = "Failed verification: {0}".format(reason)
+                emsg = "Failed verification: {0}".format("key invalid")
                 raise raeting.PacketError(emsg)
 
         if fk == FootKind.nada:
@@ -496,15 +739,17 @@ class Packet(object):
     '''
     RAET protocol packet object
     '''
+    __slots__ = ('stack', 'packed', 'data', 'head', 'body', 'coat', 'foot')
+
     def __init__(self, stack=None, data=None, kind=None):
         ''' Setup Packet instance. Meta data for a packet. '''
         self.stack = stack
         self.packed = b''  # packed string
-        self.data = odict(raeting.PACKET_DEFAULTS)
+        self.data = PACKET_DEFAULTS.copy()
         if data:
             self.data.update(data)
         if kind:
-            if kind not in list(PcktKind):
+            if kind not in raeting.PCKT_KIND_VALUES:
                 self.data['pk'] = PcktKind.unknown.value
                 emsg = "Unrecognizable packet kind."
                 raise raeting.PacketError(emsg)
@@ -529,7 +774,7 @@ class Packet(object):
         '''
         Refresh .data to defaults and update if data
         '''
-        self.data = odict(raeting.PACKET_DEFAULTS)
+        self.data = PACKET_DEFAULTS.copy()
         if data:
             self.data.update(data)
         return self  # so can method chain
@@ -538,6 +783,8 @@ class TxPacket(Packet):
     '''
     RAET Protocol Transmit Packet object
     '''
+    __slots__ = ()
+
     def __init__(self, embody=None, **kwa):
         '''
         Setup TxPacket instance
@@ -580,10 +827,13 @@ class TxPacket(Packet):
     def encrypt(self, msg):
         '''
         Return (cipher, nonce) duple resulting from encrypting message
-        with short term keys
+        with short term keys using the remote's cached shared key
         '''
         remote = self.stack.remotes[self.data['se']]
-        return (remote.privee.encrypt(msg, remote.publee.key))
+        boxer = remote.boxer
+        if boxer is None:
+            return (remote.privee.encrypt(msg, remote.publee.key))
+        return (boxer.encrypt(msg))
 
     def prepack(self):
         '''
@@ -629,6 +879,8 @@ class RxPacket(Packet):
     '''
     RAET Protocol Receive Packet object
     '''
+    __slots__ = ('opened', )
+
     def __init__(self, packed=None, **kwa):
         '''
         Setup RxPacket instance
@@ -639,6 +891,7 @@ class RxPacket(Packet):
         self.coat = RxCoat(packet=self)
         self.foot = RxFoot(packet=self)
         self.packed = packed or ''
+        self.opened = None  # duple (boxer, msg) decrypted by .parseCrypto
 
     @property
     def index(self):
@@ -657,19 +910,35 @@ class RxPacket(Packet):
     def verify(self, signature, msg):
         '''
         Return result of verifying msg with signature
+        Looks up remote once since may run in crypto pool worker while
+        remotes change
+        Raises PacketError exception If remote not in remotes
         '''
-        nuid = self.data['de']
-        if not nuid in self.stack.remotes:
-            return False
-        return (self.stack.remotes[nuid].verfer.verify(signature, msg))
+        remote = self.stack.remotes.get(self.data['de'], None)
+        if remote is None:
+            emsg = "Failed verification: {0}".format("nuid not in remotes")
+            raise raeting.PacketError(emsg)
+        return (remote.verfer.verify(signature, msg))
 
     def decrypt(self, cipher, nonce):
         '''
         Return msg resulting from decrypting cipher and nonce
-        with short term keys
+        with short term keys using the remote's cached shared key
+        Raises PacketError exception If remote not in remotes
         '''
-        remote = self.stack.remotes[self.data['de']]
-        return (remote.privee.decrypt(cipher, nonce, remote.publee.key))
+        remote = self.stack.remotes.get(self.data['de'], None)
+        if remote is None:
+            emsg = "Failed decryption: {0}".format("nuid not in remotes")
+            raise raeting.PacketError(emsg)
+        boxer = remote.boxer
+        if self.opened is not None:
+            opener, msg = self.opened
+            self.opened = None
+            if opener is boxer:  # not rekeyed since decrypted ahead
+                return msg
+        if boxer is None:
+            return (remote.privee.decrypt(cipher, nonce, remote.publee.key))
+        return (boxer.decrypt(cipher, nonce))
 
     def parse(self, packed=None):
         '''
@@ -690,6 +959,18 @@ class RxPacket(Packet):
         Result is .data
         Raises PacketError exception If failure
         '''
+        self.parseHead(packed=packed)
+        self.parseFoot()
+
+    def parseHead(self, packed=None):
+        '''
+        Parses raw packet head from packed if provided or .packed otherwise
+        Deserializes head and checks version
+        Does not verify signature so header only admission checks may be
+        performed before the more expensive .parseFoot
+        Result is .data
+        Raises PacketError exception If failure
+        '''
         if packed:
             self.packed = packed
         if not self.packed:
@@ -703,8 +984,37 @@ class RxPacket(Packet):
                     "version '{1}'".format(self.data['vn']))
             raise raeting.PacketError(emsg)
 
+    def parseFoot(self):
+        '''
+        Parses foot (signature) if given and verifies signature
+        Assumes head already parsed by .parseHead
+        Raises PacketError exception If failure
+        '''
         self.foot.parse() #foot unpacks itself
 
+    def parseCrypto(self, boxer=None):
+        '''
+        Parses foot and verifies signature as .parseFoot then if boxer
+        decrypts coat ahead of .parseInner saving duple (boxer, msg) in
+        .opened for .decrypt to use. Safe to run in a worker thread since
+        it only reads the stack. A coat that fails to decrypt is left for
+        .parseInner to raise
+        Raises PacketError exception If failure
+        '''
+        self.foot.parse()
+        if boxer is None:
+            return
+        self.unpackInner()
+        packed = self.coat.packed
+        tl = TailSize.nacl.value # nonce length
+        if len(packed) <= tl:
+            return
+        try:
+            msg = boxer.decrypt(packed[:-tl], tobytes(packed[-tl:]))
+        except ValueError:
+            return
+        self.opened = (boxer, msg)
+
     def unpackInner(self, packed=None):
         '''
         Unpacks the body, and coat parts of .packed
@@ -740,7 +1050,7 @@ class Tray(object):
         '''
         self.stack = stack
         self.packed = packed or ''
-        self.data = odict(raeting.PACKET_DEFAULTS)
+        self.data = PACKET_DEFAULTS.copy()
         if data:
             self.data.update(data)
         self.body = body #body data of message
@@ -755,19 +1065,45 @@ class Tray(object):
 class TxTray(Tray):
     '''
     Manages an outgoing message and ites associated packet(s)
+    Segments are generated and signed lazily on demand by .segment so only
+    the segments in flight are held in .segments. Acknowledged segments are
+    dropped with .release and are regenerated if requested again.
+    Each segment is signed once per combination of again and wait flags
+    requested so retransmissions reuse the signed packet instead of repacking
+    A burst of segments may instead be signed in shards on a thread pool by
+    .sign and collected by .collect once done
     '''
+    Shard = 16  # max segments signed by each pool job
+
     def __init__(self, **kwa):
         '''
         Setup instance
         '''
         super(TxTray, self).__init__(**kwa)
-        self.packets = []
+        self.pending = None  # (packets, unsigneds, jobs) of burst signing on pool
+        self.segments = dict()  # keyed by sn of dicts of packets keyed by (af, wf)
+        self.count = 0  # number of segments in message, zero until packed
+        self.segsize = 0  # size of all but last segment, zero if unsegmented
+        self.flags = dict()  # keyed by sn of (af, wf) of last packet served
+        self.signed = 0  # number of segment signatures computed
+        self.saved = 0  # number of signatures a repack on each flag change would add
         self.current = 0 # next  packet to send
         self.last = 0 # last packet sent
 
+    @property
+    def packets(self):
+        '''
+        Property is list of all the segment packets of the message generating
+        any not yet generated. Holds every segment so meant for small messages
+        and testing. Transactions should use .segment
+        '''
+        return [self.segment(sn) for sn in range(self.count)]
+
     def pack(self, data=None, body=None):
         '''
-        Convert message in .body into one or more packets
+        Convert message in .body into one or more segments
+        Segments including an unsegmented message's only packet are signed
+        by .segment once the flags to send it with are known
         '''
         if data:
             self.data.update(data)
@@ -775,63 +1111,202 @@ class TxTray(Tray):
             self.body = body
 
         self.current = 0
-        self.packets = []
+        self.count = 0
+        self.segsize = 0
+        self.segments = dict()
+        self.flags = dict()
         packet = TxPacket(stack=self.stack,
                           kind=PcktKind.message.value,
                           embody=self.body,
                           data=self.data)
 
         packet.prepack()
+        self.packed = packet.coat.packed
         if packet.size <= raeting.UDP_MAX_PACKET_SIZE:
-            packet.sign()
-            self.packets.append(packet)
+            self.count = 1
         else:
-            self.packed = packet.coat.packed
             self.packetize(headsize=packet.head.size, footsize=packet.foot.size)
 
     def packetize(self, headsize, footsize):
         '''
-        Create packeted segments from .packed using headsize footsize
+        Compute segment size and count for .packed using headsize footsize
         '''
         extrasize = 0
         if self.data['hk'] == HeadKind.raet:
             extrasize = 27 # extra header size as a result of segmentation
         elif self.data['hk'] == HeadKind.json:
             extrasize = 36 # extra header size as a result of segmentation
+        elif self.data['hk'] == HeadKind.binary:
+            extrasize = raeting.BINARY_SEGMENT_PACKER.size # segment extension
 
         hotelsize = headsize + extrasize + footsize
-        segsize = raeting.UDP_MAX_PACKET_SIZE - hotelsize
+        self.segsize = raeting.UDP_MAX_PACKET_SIZE - hotelsize
+        self.count = (self.size // self.segsize) + (1 if self.size % self.segsize else 0)
 
-        segcount = (self.size // segsize) + (1 if self.size % segsize else 0)
-        for i in range(segcount):
-            if i == segcount - 1: #last segment
-                segment = self.packed[i * segsize:]
-            else:
-                segment = self.packed[i * segsize: (i+1) * segsize]
-
-            packet = TxPacket( stack=self.stack,
-                                data=self.data)
-            packet.data.update(sn=i, sc=segcount, ml=self.size, sf=True)
-            packet.coat.packed = packet.body.packed = segment
-            packet.foot.pack()
-            packet.head.pack()
-            packet.packed = b''.join([packet.head.packed,
-                                     packet.coat.packed,
-                                     packet.foot.packed])
+    def segment(self, sn, af=False, wf=False):
+        '''
+        Return signed packet for segment number sn with again flag af and
+        wait flag wf generating it if not in .segments
+        '''
+        flags = (True if af else False, True if wf else False)
+        packet = self.cached(sn, flags)
+        if packet is None:
+            self.check(sn)
+            packet = self.prepare(sn, flags)
             packet.sign()
-            self.packets.append(packet)
+            self.keep(sn, flags, packet)
+        return packet
+
+    def check(self, sn):
+        '''
+        Raises PacketError if sn is not a segment number of the message
+        '''
+        if not (0 <= sn < self.count):
+            emsg = "Invalid segment number '{0}' of count '{1}'".format(sn, self.count)
+            raise raeting.PacketError(emsg)
+
+    def cached(self, sn, flags):
+        '''
+        Return already signed packet for segment number sn with flags duple
+        (af, wf) from .segments or None if not generated
+        '''
+        variants = self.segments.get(sn)
+        if variants is not None:
+            packet = variants.get(flags)
+            if packet is not None:
+                if self.flags[sn] != flags:  # flag change without resigning
+                    self.saved += 1
+                    self.flags[sn] = flags
+                return packet
+        return None
+
+    def prepare(self, sn, flags):
+        '''
+        Return unsigned packet for segment number sn with flags duple (af, wf)
+        '''
+        packet = TxPacket( stack=self.stack,
+                            data=self.data)
+        if self.segsize:
+            segment = self.packed[sn * self.segsize: (sn + 1) * self.segsize]
+            packet.data.update(sn=sn, sc=self.count, ml=self.size, sf=True)
+        else:
+            segment = self.packed
+        packet.data.update(af=flags[0], wf=flags[1])
+        packet.coat.packed = packet.body.packed = segment
+        packet.foot.pack()
+        packet.head.pack()
+        packet.packed = b''.join([packet.head.packed,
+                                 packet.coat.packed,
+                                 packet.foot.packed])
+        return packet
+
+    def keep(self, sn, flags, packet):
+        '''
+        Keep signed packet for segment number sn with flags duple (af, wf)
+        in .segments to be reused until released
+        '''
+        self.signed += 1
+        if sn not in self.flags and flags != (False, False):
+            self.saved += 1  # flags chosen before signing instead of after
+        self.flags[sn] = flags
+        self.segments.setdefault(sn, dict())[flags] = packet
+
+    def sign(self, specs, pool):
+        '''
+        Start generating and signing the segments for specs, a list of triples
+        (sn, af, wf), not already in .segments on pool, a concurrent.futures
+        executor, in shards of at most .Shard segments per job. libnacl
+        releases the GIL while signing so shards sign in parallel with the stack
+        Returns Future that is done when every shard is done after which
+        .collect returns the packets
+        Raises PacketError if a segment number is invalid
+        '''
+        packets = []
+        unsigneds = []
+        for sn, af, wf in specs:
+            flags = (True if af else False, True if wf else False)
+            packet = self.cached(sn, flags)
+            if packet is None:
+                self.check(sn)
+                unsigneds.append((len(packets), sn, flags))
+            packets.append(packet)
+
+        shards = [unsigneds[i:i + self.Shard]
+                  for i in range(0, len(unsigneds), self.Shard)]
+        jobs = [pool.submit(self.signShard, shard) for shard in shards]
+        self.pending = (packets, shards, jobs)
+
+        done = futures.Future()
+        if not jobs:
+            done.set_result(None)
+            return done
+        lock = threading.Lock()
+        remaining = [len(jobs)]
+
+        def finish(job):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            done.set_result(None)
+
+        for job in jobs:
+            job.add_done_callback(finish)
+        return done
+
+    def signShard(self, shard):
+        '''
+        Return list of signed packets for shard, a list of triples
+        (index, sn, flags). Run by .sign in pool workers so only reads tray
+        '''
+        packets = []
+        for index, sn, flags in shard:
+            packet = self.prepare(sn, flags)
+            packet.sign()
+            packets.append(packet)
+        return packets
+
+    def collect(self):
+        '''
+        Return list of signed packets of burst started by .sign once its
+        Future is done keeping the newly signed segments as .segment does
+        Raises the exception of any shard that failed
+        '''
+        packets, shards, jobs = self.pending
+        self.pending = None
+        for shard, job in zip(shards, jobs):
+            for (index, sn, flags), packet in zip(shard, job.result()):
+                packets[index] = packet
+                self.keep(sn, flags, packet)
+        return packets
+
+    def release(self, end):
+        '''
+        Drop generated segments with segment number less than end since
+        acknowledged by the receiver
+        '''
+        for sn in [sn for sn in self.segments if sn < end]:
+            del self.segments[sn]
+            del self.flags[sn]
 
 
 class RxTray(Tray):
     '''
     Manages segmentated messages and the associated packets
+    Segments are written at their offsets into a buffer preallocated from the
+    message length ml so reassembly is O(1) per segment and completion is
+    tracked by a received count with a mark per segment
     '''
-    def __init__(self, segments=None, **kwa):
+    def __init__(self, **kwa):
         '''
         Setup instance
         '''
         super(RxTray, self).__init__(**kwa)
-        self.segments = segments if segments is not None else []
+        self.buffer = None  # bytearray of message payload preallocated from ml
+        self.marks = None  # bytearray with nonzero mark for each received segment
+        self.count = 0  # number of distinct segments received
+        self.first = 0  # lowest segment number not yet received
+        self.segsize = None  # size of all but last segment
         self.complete = False
         self.highest = 0  # highest segment number received
 
@@ -839,64 +1314,115 @@ class RxTray(Tray):
         '''
         Process a given packet assumes parseOuter done already
         '''
-        sc = packet.data['sc']
-        sn = packet.data['sn']
+        data = packet.data  # for speed
+        sc = data['sc']
+        sn = data['sn']
         if sn > self.highest:
             self.highest = sn
         console.verbose("segment count={0} number={1} tid={2}\n".format(
-            sc, sn, packet.data['ti']))
+            sc, sn, data['ti']))
 
         if sc == 1:  # this is only segment to complete now
-            self.data.update(packet.data)
+            self.data.update(data)
             packet.parseInner()
             self.body = packet.body.data
             self.complete = True
             return self.body
 
-        if not self.segments: #get data from first packet received
-            self.data.update(packet.data)
-            self.segments = [None] * sc
+        if self.complete:  # duplicate of already reassembled message
+            return self.body
+
+        hl = data['hl']
+        size = len(packet.packed) - hl - data['fl']
+        buffer = self.buffer
+        marks = self.marks
 
-        hl = packet.data['hl']
-        fl = packet.data['fl']
-        segment = packet.packed[hl:packet.size - fl]
+        if buffer is None: # get data from first packet received
+            ml = data['ml']
+            if ml > raeting.MAX_MESSAGE_SIZE:
+                emsg = "Message length '{0}' exceeds max of {1}".format(
+                        ml, raeting.MAX_MESSAGE_SIZE)
+                raise raeting.PacketError(emsg)
+            self.data.update(data)
+            buffer = self.buffer = bytearray(ml)
+            marks = self.marks = bytearray(sc)
+
+        ml = len(buffer)
+        if sc != len(marks) or sn >= sc or data['ml'] != ml:
+            emsg = ("Segment number '{0}' count '{1}' or message length '{2}' "
+                    "inconsistent with prior segments".format(sn, sc, data['ml']))
+            raise raeting.PacketError(emsg)
+
+        if self.segsize is None:  # all segments but last are the same size
+            if sn < sc - 1:
+                self.segsize = size
+            elif (ml - size) % (sc - 1) == 0:
+                self.segsize = (ml - size) // (sc - 1)
+            if not self.segsize or self.segsize < 0:
+                self.segsize = None
+                emsg = "Segment size '{0}' inconsistent with message length '{1}'".format(
+                        size, ml)
+                raise raeting.PacketError(emsg)
+
+        offset = sn * self.segsize
+        if size != (self.segsize if sn < sc - 1 else ml - offset):
+            emsg = ("Segment '{0}' size '{1}' inconsistent with message length "
+                    "'{2}'".format(sn, size, ml))
+            raise raeting.PacketError(emsg)
 
-        self.segments[sn] = segment
-        if None in self.segments:  # don't have all segments yet
+        if not marks[sn]:
+            buffer[offset:offset + size] = memoryview(packet.packed)[hl:hl + size]
+            marks[sn] = 1
+            self.count += 1
+            if sn == self.first:  # advance to next not yet received
+                first = marks.find(b'\x00', sn + 1)
+                self.first = first if first >= 0 else sc
+
+        if self.count < sc:  # don't have all segments yet
             return None
         self.body = self.desegmentize()
         return self.body
 
+    def received(self, sn):
+        '''
+        Returns True if segment number sn has already been received
+        '''
+        if self.complete:
+            return True
+        return (self.marks is not None and sn < len(self.marks) and
+                self.marks[sn] != 0)
+
     def missing(self, begin=None, end=None):
         '''
         return list of missing packet numbers between begin (incl) and end (excl)
+        Starts from the lowest segment not yet received
         '''
         if begin is None:
             begin = 0
         if end is None:
             end = self.highest  # don't return trailing empty numbers
-        return [i for i in xrange(begin, end) if self.segments[i] is None]
+        if self.marks is None:
+            return []
+        misseds = []
+        find = self.marks.find
+        sn = find(b'\x00', max(begin, self.first), end)
+        while sn >= 0:
+            misseds.append(sn)
+            sn = find(b'\x00', sn + 1, end)
+        return misseds
 
     def desegmentize(self):
         '''
         Process message packet assumes already parsed outer so verified signature
         and processed header data
+        Decrypts and parses body from a memoryview of the reassembled buffer
         '''
-        sc = self.data['sc']
-        self.packed = b''.join(self.segments)
-        ml = self.data['ml']
-        if sc > 1 and self.size != ml:
-            emsg = ("Full message payload length '{0}' does not equal head field"
-                                          " '{1}'".format(self.size, ml))
-            raise raeting.PacketError(emsg)
-
         packet = RxPacket(stack = self.stack, data=self.data)
-        packet.coat.packed = self.packed
+        packet.coat.packed = memoryview(self.buffer)
 
         packet.coat.parse()
         packet.body.parse()
         self.complete = True
+        self.buffer = None  # release reassembly buffer
 
         return packet.body.data
-
-
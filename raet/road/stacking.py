@@ -10,12 +10,17 @@ import socket
 import os
 import errno
 
-from collections import deque,  Mapping
+from collections import deque,  Mapping, OrderedDict
 try:
     import simplejson as json
 except ImportError:
     import json
 
+try:
+    from concurrent import futures
+except ImportError:
+    futures = None
+
 try:
     import msgpack
 except ImportError:
@@ -31,6 +36,7 @@ from .. import raeting
 from ..raeting import PcktKind, TrnsKind, CoatKind, FootKind, BodyKind, HeadKind
 from .. import nacling
 from .. import stacking
+from .. import scheduling
 from . import keeping
 from . import packeting
 from . import estating
@@ -80,6 +86,14 @@ class RoadStack(stacking.KeepStack):
         The default timeout to reap a dead remote
     role
         The local estate role identifier for key management
+    keyPool
+        The nacling.KeyPool that remote short term key pairs are drawn from.
+        Defaults to nacling.keyPool. Refilled during idle service cycles
+    cryptoWorkers
+        The number of worker threads that verify signatures and decrypt coats
+        of each batch of received packets and sign the segments of large
+        message bursts in shards. Defaults to 0 which verifies, decrypts and
+        signs inline one packet at a time. The pool is shutdown by .close
     '''
     Count = 0 # count of Stack instances to give unique stack names
     Hk = HeadKind.raet.value # stack default
@@ -88,9 +102,16 @@ class RoadStack(stacking.KeepStack):
     Ck = CoatKind.nacl.value # stack default
     Bf = False # stack default for bcstflag
     BurstSize = 0  # stack default for max segments in each burst, 0 = no limit
+    BurstAdaptive = False  # stack default adapt segments per burst to congestion
     Period = 1.0 # stack default for keep alive
     Offset = 0.5 # stack default for keep alive
     Interim = 3600 # stack default for reap timeout
+    AliveJitter = 0.1  # stack default fraction of period keep alives are jittered
+    AliveRate = 1000.0  # stack default max keep alives started per second, 0 = no limit
+    AliveBurst = 100  # stack default keep alives that may start at once within rate
+    KeyRefill = 8  # stack default max pool keys generated per idle service cycle
+    CryptoWorkers = 0  # stack default rx verify and decrypt threads, 0 = inline
+    SignPoll = 0.001  # stack default secs between checks for pool signed bursts
     JoinerTimeout = 5.0 # stack default for joiner transaction timeout
     JoinentTimeout = 5.0 # stack default for joinent transaction timeout
     MsgStaleTimeout = 600.0  # stale messages waiting timeout
@@ -117,6 +138,8 @@ class RoadStack(stacking.KeepStack):
                  offset=None,
                  interim=None,
                  veritive=True,
+                 keyPool=None,
+                 cryptoWorkers=None,
                  **kwa
                  ):
         '''
@@ -126,6 +149,8 @@ class RoadStack(stacking.KeepStack):
         if getattr(self, 'puid', None) is None:
             self.puid = puid if puid is not None else self.Uid
 
+        self.keyPool = keyPool if keyPool is not None else nacling.keyPool
+
         keep = keep or keeping.RoadKeep(dirpath=dirpath,
                                         basedirpath=basedirpath,
                                         stackname=name,
@@ -149,6 +174,26 @@ class RoadStack(stacking.KeepStack):
         self.period = period if period is not None else self.Period
         self.offset = offset if offset is not None else self.Offset
         self.interim = interim if interim is not None else self.Interim
+        self.aliveTat = 0.0  # theoretical arrival stamp of next keep alive slot
+        # deadline schedulers so each service only touches what is due
+        self.processes = scheduling.Scheduler()  # transactions for .process
+        self.cleanups = scheduling.Scheduler()  # remotes for done transaction cleanup
+        self.manages = scheduling.Scheduler()  # remotes for .manage keep alive and reap
+        # availability kept current as remote status changes so restored remotes
+        # added during super init are tracked. OrderedDict not odict since
+        # odict insert and pop scan its key list
+        self.alloweds = OrderedDict() # allowed remotes keyed by name
+        self.aliveds =  OrderedDict() # alived remotes keyed by name
+        self.reapeds =  OrderedDict() # reaped remotes keyed by name
+        self.availables = set() # set of available remote names
+        self.changeds = odict(plus=set(), minus=set())  # availability changes as of last manage
+        self.changings = odict(plus=set(), minus=set())  # availability changes since last manage
+        self.availabilityCallback = None  # callable(name, plus) on availability change
+        # secondary indexes of remotes, each maps key to set of remotes with key
+        self.verRemotes = dict()  # keyed by verify key hex
+        self.pubRemotes = dict()  # keyed by public key hex
+        self.haRemotes = dict()  # keyed by host address
+        self.roleRemotes = dict()  # keyed by role
 
         super(RoadStack, self).__init__(puid=puid,
                                         keep=keep,
@@ -161,10 +206,18 @@ class RoadStack(stacking.KeepStack):
         self.mutable = mutable # road data mutability
         self.veritive = True if veritive else False  # rx message trans must be verified
         self.joinees = odict() # remotes for vacuous joins, keyed by ha
-        self.alloweds = odict() # allowed remotes keyed by name
-        self.aliveds =  odict() # alived remotes keyed by name
-        self.reapeds =  odict() # reaped remotes keyed by name
-        self.availables = set() # set of available remote names
+        self.cryptoWorkers = (cryptoWorkers if cryptoWorkers is not None
+                              else self.CryptoWorkers)
+        self.cryptoPool = None  # executor for rx verify and decrypt jobs
+        self.signings = set()  # messengers with a burst signing on .cryptoPool
+        self.signeds = deque()  # messengers whose burst signing is done
+        if self.cryptoWorkers:
+            if futures is None:
+                console.terse("Stack '{0}'. No concurrent.futures so rx crypto"
+                              " is inline\n".format(self.name))
+            else:
+                self.cryptoPool = futures.ThreadPoolExecutor(
+                                        max_workers=self.cryptoWorkers)
 
     @property
     def ha(self):
@@ -195,6 +248,17 @@ class RoadStack(stacking.KeepStack):
                                          bufsize=raeting.UDP_MAX_PACKET_SIZE * self.bufcnt)
         return server
 
+    def close(self):
+        '''
+        Shutdown .cryptoPool if any waiting for its workers to finish then
+        close server. Crypto is inline if serviced after close
+        '''
+        if self.cryptoPool is not None:
+            self.cryptoPool.shutdown()
+            self.cryptoPool = None
+        if self.server:
+            self.server.close()
+
     def addRemote(self, remote, dump=False):
         '''
         Add a remote  to .remotes
@@ -203,6 +267,12 @@ class RoadStack(stacking.KeepStack):
         if remote.timer.store is not self.store:
             raise raeting.StackError("Store reference mismatch between remote"
                                      " '{0}' and stack '{1}'".format(remote.name, stack.name))
+        for transaction in remote.transactions.values():  # such as from joinees
+            self.processes.schedule(transaction, transaction.nextDeadline())
+        self.cleanups.schedule(remote, remote.nextDoneDeadline())
+        self.manages.schedule(remote, remote.nextManageDeadline())
+        self.updateAvailability(remote)
+        self.indexRemote(remote)
         return remote
 
     def removeRemote(self, remote, clear=True):
@@ -213,18 +283,141 @@ class RoadStack(stacking.KeepStack):
         super(RoadStack, self).removeRemote(remote=remote, clear=clear)
         for transaction in remote.transactions.values():
             transaction.nack()
+        for transaction in remote.transactions.values():  # any not removed by nack
+            self.processes.cancel(transaction)
+        self.cleanups.cancel(remote)
+        self.manages.cancel(remote)
+        self.dropAvailability(remote)
+        self.unindexRemote(remote)
+
+    def renameRemote(self, remote, new, clear=True, dump=False):
+        '''
+        Rename remote with old remote.name to new name but keep same index
+        Availability is rekeyed to new name
+        '''
+        old = remote.name
+        super(RoadStack, self).renameRemote(remote=remote, new=new, clear=clear, dump=dump)
+        if remote.name != old:
+            self.dropAvailability(remote, name=old)
+            self.updateAvailability(remote)
+
+    def updateAvailability(self, remote):
+        '''
+        Update .alloweds .aliveds .reapeds and .availables to current status of
+        remote and record any availability change
+        Called by remote whenever its .allowed .alived or .reaped changes
+        '''
+        name = remote.name
+        for remotes, status in ((self.alloweds, remote.allowed),
+                                (self.aliveds, remote.alived),
+                                (self.reapeds, remote.reaped)):
+            if status:
+                if name not in remotes:
+                    remotes[name] = remote
+            elif name in remotes:
+                del remotes[name]
+        if remote.alived:
+            if name not in self.availables:
+                self.availables.add(name)
+                self.changeAvailability(name, plus=True)
+        elif name in self.availables:
+            self.availables.discard(name)
+            self.changeAvailability(name, plus=False)
+
+    def dropAvailability(self, remote, name=None):
+        '''
+        Remove remote at name, default remote.name, from availability
+        '''
+        name = name if name is not None else remote.name
+        for remotes in (self.alloweds, self.aliveds, self.reapeds):
+            remotes.pop(name, None)
+        if name in self.availables:
+            self.availables.discard(name)
+            self.changeAvailability(name, plus=False)
+
+    def changeAvailability(self, name, plus):
+        '''
+        Record availability change of remote name as plus (True) or minus (False)
+        in .changings, net of any opposite change since last manage,
+        and call .availabilityCallback if any
+        '''
+        if plus:
+            adds, subs = self.changings['plus'], self.changings['minus']
+        else:
+            adds, subs = self.changings['minus'], self.changings['plus']
+        if name in subs:
+            subs.discard(name)
+        else:
+            adds.add(name)
+        if self.availabilityCallback is not None:
+            self.availabilityCallback(name, plus)
 
-    def fetchRemoteByKeys(self, sighex, prihex):
+    def remoteIndexes(self, remote):
         '''
-        Search for remote with matching (name, sighex, prihex)
+        Returns list of duples (index, key) of secondary indexes of remote
+        '''
+        return [(self.verRemotes, remote.verfer.keyhex),
+                (self.pubRemotes, remote.pubber.keyhex),
+                (self.haRemotes, remote.ha),
+                (self.roleRemotes, remote.role)]
+
+    def indexRemote(self, remote):
+        '''
+        Add remote to secondary indexes at its current keys
+        '''
+        for index, key in self.remoteIndexes(remote):
+            if key not in index:
+                index[key] = set()
+            index[key].add(remote)
+
+    def unindexRemote(self, remote):
+        '''
+        Remove remote from secondary indexes at its current keys
+        Called before a keyed attribute of remote changes
+        '''
+        for index, key in self.remoteIndexes(remote):
+            remotes = index.get(key)
+            if remotes is not None:
+                remotes.discard(remote)
+                if not remotes:
+                    del index[key]
+
+    def fetchRemoteByKeys(self, verhex, pubhex):
+        '''
+        Search for remote with matching verify key hex verhex or
+        public key hex pubhex
         Return remote if found Otherwise return None
         '''
-        for remote in self.remotes.values():
-            if (remote.signer.keyhex == sighex or
-                remote.priver.keyhex == prihex):
-                return remote
+        verhex = verhex if isinstance(verhex, bytes) else ns2b(verhex)
+        pubhex = pubhex if isinstance(pubhex, bytes) else ns2b(pubhex)
+        remotes = self.verRemotes.get(verhex) or self.pubRemotes.get(pubhex)
+        return next(iter(remotes)) if remotes else None
 
-        return None
+    def fetchRemoteByHa(self, ha):
+        '''
+        Search for remote with matching host address ha
+        Return remote if found Otherwise return None
+        '''
+        remotes = self.haRemotes.get(ha)
+        return next(iter(remotes)) if remotes else None
+
+    def fetchRemotesByRole(self, role):
+        '''
+        Return list of remotes with matching role
+        '''
+        return list(self.roleRemotes.get(role, ()))
+
+    def acceptRemotesByRole(self, role, verhex, pubhex, status):
+        '''
+        Set acceptance of every remote with role and keys verhex and pubhex
+        to status since acceptance is persisted per role and keys. Remotes
+        whose keys differ keep theirs until they next join
+        '''
+        verhex = verhex if isinstance(verhex, bytes) else ns2b(verhex)
+        pubhex = pubhex if isinstance(pubhex, bytes) else ns2b(pubhex)
+        for remote in self.roleRemotes.get(role, ()):
+            if remote.verfer.keyhex == verhex and remote.pubber.keyhex == pubhex:
+                remote.acceptance = status
 
     def retrieveRemote(self, uid=None):
         '''
@@ -383,6 +576,7 @@ class RoadStack(stacking.KeepStack):
                                             pubkey=keepData['pubhex'],
                                             role=keepData['role'])
                     if remote:
+                        remote.spread()
                         self.addRemote(remote)
                 else:
                     self.keep.clearRemoteData(name)
@@ -408,54 +602,189 @@ class RoadStack(stacking.KeepStack):
 
         immediate indicates to run first attempt immediately and not wait for timer
 
-        availables = dict of remotes that are both alive and allowed
+        availables = set of names of alived remotes
+        changeds = availability changes since prior manage
+
+        Availability is updated as remote status changes, not rebuilt here
         '''
-        alloweds = odict()
-        aliveds = odict()
-        reapeds = odict()
-        for remote in self.remotes.values(): # should not start anything
+        remotes = self.remotes.values() if immediate else self.manages.pop(self.store.stamp)
+        for remote in remotes:  # only those with due keep alive or reap timers
+            if self.remotes.get(remote.uid) is not remote:  # removed or not yet added
+                continue
             remote.manage(cascade=cascade, immediate=immediate)
-            if remote.allowed:
-                alloweds[remote.name] = remote
-            if remote.alived:
-                aliveds[remote.name] = remote
-            if remote.reaped:
-                reapeds[remote.name] = remote
-
-        old = set(self.aliveds.keys())
-        current = set(aliveds.keys())
-        plus = current.difference(old)
-        minus = old.difference(current)
-        self.availables = current
-        self.changeds = odict(plus=plus, minus=minus)
-        self.alloweds = alloweds
-        self.aliveds = aliveds
-        self.reapeds = reapeds
+            self.manages.schedule(remote, remote.nextManageDeadline())
+
+        self.changeds = self.changings
+        self.changings = odict(plus=set(), minus=set())
 
     def _handleOneRx(self):
         '''
         Handle on message from .rxes deque
         Assumes that there is a message on the .rxes deque
         '''
-        raw, sa = self.rxes.popleft()
+        packet = self.receiveRx(*self.rxes.popleft())
+        if not packet:
+            return
+
+        try:
+            packet.parseFoot()
+        except raeting.PacketError as ex:
+            console.terse(str(ex) + '\n')
+            self.incStat('parsing_outer_error')
+            return
+
+        self.processRx(packet)
+
+    def receiveRx(self, raw, sa):
+        '''
+        Returns RxPacket from raw received from sa with its head parsed
+        if it passes .admitRx Otherwise returns None
+        Signature is not yet verified
+        '''
         console.verbose("{0} received packet\n{1}\n".format(self.name, raw))
 
         packet = packeting.RxPacket(stack=self, packed=raw)
         try:
-            packet.parseOuter()
+            packet.parseHead()
         except raeting.PacketError as ex:
             console.terse(str(ex) + '\n')
             self.incStat('parsing_outer_error')
-            return
+            return None
 
         sh, sp = sa
         packet.data.update(sh=sh, sp=sp)
-        self.processRx(packet)
+
+        if not self.admitRx(packet):  # drop before expensive verify
+            return None
+        return packet
+
+    def serviceRxBatch(self):
+        '''
+        Process all messages in .rxes deque in batches using .cryptoPool
+        Admits each packet then dispatches to the pool its signature verify
+        and, when unsegmented and its remote already has a boxer, its coat
+        decrypt. Processes each packet in received order once its own job is
+        done so later jobs run meanwhile. This only overlaps when the crypto
+        releases the GIL as libnacl does.
+        A join or allow packet ends its batch since processing it may add
+        remotes or change their keys. The packets after it are admitted and
+        dispatched once it is processed, as inline, and workers never read
+        remotes that a transaction is changing
+        '''
+        while self.rxes:
+            jobs = deque()
+            while self.rxes:
+                packet = self.receiveRx(*self.rxes.popleft())
+                if not packet:
+                    continue
+                boxer = None  # segment coats only decrypt once reassembled
+                if packet.data['ck'] == CoatKind.nacl and packet.data['sc'] == 1:
+                    remote = self.remotes.get(packet.data['de'], None)
+                    if remote:  # boxer built here not in worker
+                        boxer = remote.boxer
+                jobs.append((packet,
+                             self.cryptoPool.submit(packet.parseCrypto, boxer)))
+                if packet.data['tk'] in (TrnsKind.join, TrnsKind.allow):
+                    break  # admit rest against remotes as changed by packet
+
+            if not jobs:
+                continue
+            self.incStat('crypto_batch')
+
+            while jobs:
+                packet, job = jobs.popleft()
+                try:
+                    job.result()
+                except raeting.PacketError as ex:
+                    console.terse(str(ex) + '\n')
+                    self.incStat('parsing_outer_error')
+                    continue
+                except Exception as ex:  # worker failure drops only packet
+                    console.terse("Stack '{0}'. Crypto job failed '{1}'. "
+                                  "Dropping...\n".format(self.name, ex))
+                    self.incStat('crypto_job_error')
+                    continue
+                self.processRx(packet)
+
+    def admitRx(self, packet):
+        '''
+        Perform cheap header only admission checks on packet whose head has
+        been parsed but whose signature has not yet been verified.
+        Returns True if packet should be verified and processed
+        Otherwise increments per reason 'predrop_' stat and returns False
+
+        Only checks that neither reply nor change state are performed here
+        since the packet is not yet authenticated. Checks such as stale sid
+        that reply are left to .processRx after verification.
+        '''
+        data = packet.data
+        sha = (data['sh'], data['sp'])
+
+        if data['bf']:  # broadcast transaction not yet supported
+            self.incStat('predrop_broadcast')
+            return False
+
+        tk = data['tk']
+        rsid = data['si']
+
+        if tk == TrnsKind.join:
+            if rsid != 0: # join  must use sid == 0
+                emsg = ("Stack '{0}'. Nonzero join sid '{1}' in packet from {2}."
+                        " Dropping...\n".format(self.name, rsid, sha))
+                console.terse(emsg)
+                self.incStat('predrop_join_invalid_sid')
+                return False
+            return True  # join remote matching needs processRx
+
+        if rsid == 0: # cannot use sid == 0 on nonjoin transaction
+            emsg = ("Stack '{0}'. Invalid Zero sid '{1}' for transaction {2} packet"
+                    " {3}. Dropping...\n".format(self.name, rsid, tk, data['pk']))
+            console.terse(emsg)
+            self.incStat('predrop_invalid_sid')
+            return False
+
+        de = data['de']
+        se = data['se']
+        if de == 0 or se == 0:
+            emsg = ("Stack '{0}'. Invalid nonjoin from remote '{1}'."
+                    " Zero nuid {2} or fuid {3}. Dropping...\n".format(
+                        self.name, sha, de, se))
+            console.terse(emsg)
+            self.incStat('predrop_invalid_uid')
+            return False
+
+        remote = self.remotes.get(de, None)
+        if not remote:  # cannot verify signature without remote anyway
+            emsg = ("Stack '{0}'. Unknown remote destination '{1}'. "
+                    "Dropping...\n".format(self.name, de))
+            console.terse(emsg)
+            self.incStat('predrop_unknown_destination_uid')
+            return False
+
+        trans = remote.transactions.get(packet.index, None)
+        if trans:
+            if trans.duplicate(packet):
+                self.incStat('predrop_duplicate')
+                return False
+            return True
+
+        # resent segment of message transaction already completed and removed
+        # only resends flagged af or wf need a stale reply after verification
+        if (tk == TrnsKind.message and
+                data['pk'] == PcktKind.message and
+                not data['cf'] and
+                not (data['af'] or data['wf']) and
+                data['ti'] in remote.doneTransactions):
+            self.incStat('predrop_done_transaction')
+            return False
+
+        return True
 
     def processRx(self, packet):
         '''
         Process packet via associated transaction or
         reply with new correspondent transaction
+        Assumes packet already passed .admitRx and signature verified
         '''
         console.profuse("{0} received packet data\n{1}\n".format(self.name, packet.data))
         console.verbose("{0} received packet index: (rf={1[0]}, le={1[1]}, re={1[2]},"
@@ -471,10 +800,6 @@ class RoadStack(stacking.KeepStack):
         console.verbose("{0} received trans kind = '{1}' packet kind = '{2}'"
                         "\n".format(self.name, tkname, pkname))
 
-        bf = packet.data['bf']
-        if bf:
-            return  # broadcast transaction not yet supported
-
         de = packet.data['de']  # remote nuid
         se = packet.data['se']  # remote fuid
         tk = packet.data['tk']
@@ -486,13 +811,6 @@ class RoadStack(stacking.KeepStack):
 
         if tk in [TrnsKind.join]: # join transaction
             sha = (packet.data['sh'],  packet.data['sp'])
-            if rsid != 0: # join  must use sid == 0
-                emsg = ("Stack '{0}'. Nonzero join sid '{1}' in packet from {2}."
-                        " Dropping...\n".format(self.name, rsid, sha))
-                console.terse(emsg)
-                self.incStat('join_invalid_sid')
-                return
-
             if cf: # cf = not rf, packet source is joinent, destination (self) is joiner
                 if de == 0: # invalid since joiner rxed packet de (nuid) == 0
                     emsg = ("Stack '{0}'. Invalid join correspondence from '{1}',"
@@ -564,21 +882,6 @@ class RoadStack(stacking.KeepStack):
                         return
 
         else: # not join transaction
-            if rsid == 0: # cannot use sid == 0 on nonjoin transaction
-                emsg = ("Stack '{0}'. Invalid Zero sid '{1}' for transaction {2} packet"
-                        " {3}. Dropping...\n".format(self.name, rsid, tk, pk))
-                console.terse(emsg)
-                self.incStat('invalid_sid')
-                return
-
-            if de == 0 or se == 0:
-                emsg = ("Stack '{0}'. Invalid nonjoin from remote '{1}'."
-                        " Zero nuid {2} or fuid {3}. Dropping...\n".format(
-                            self.name, sha, de, se))
-                console.terse(emsg)
-                self.incStat('invalid_uid')
-                return
-
             remote = self.remotes.get(de, None)
 
             if remote:
@@ -599,6 +902,7 @@ class RoadStack(stacking.KeepStack):
                         remote.rsid = rsid
                         remote.removeStaleCorrespondents()
 
+                remote.rxStamp = self.store.stamp  # heard from remote
                 if remote.reaped:
                     remote.unreap() # packet a valid packet so remote is not dead
 
@@ -653,13 +957,128 @@ class RoadStack(stacking.KeepStack):
 
     def process(self):
         '''
-        Call .process or all remotes to allow timer based processing
-        of their transactions
+        Call .process of transactions with due timers and clean up expired
+        done transactions of remotes to allow timer based processing.
+        Only transactions of remotes in .remotes are processed
         '''
-        #for transaction in self.transactions.values():
-            #transaction.process()
-        for remote in self.remotes.values():
-            remote.process()
+        stamp = self.store.stamp
+        for transaction in self.processes.pop(stamp):
+            remote = transaction.remote
+            if self.remotes.get(remote.uid) is not remote:  # rescheduled by addRemote
+                continue
+            transaction.process()
+            for trans in remote.transactions.values():
+                if trans is transaction:  # not removed by process
+                    self.processes.schedule(transaction,
+                                            transaction.nextDeadline(after=stamp))
+                    break
+
+        for remote in self.cleanups.pop(stamp):
+            remote.cleanupDoneTransactions()
+            self.cleanups.schedule(remote, remote.nextDoneDeadline(after=stamp))
+
+        self.flushKeep()
+
+    def serviceRxes(self):
+        '''
+        Process all messages in .rxes deque then dump role data changed
+        by the joins among them
+        With .cryptoPool the messages are verified and decrypted as a batch
+        '''
+        if self.cryptoPool is not None:
+            self.serviceRxBatch()
+        else:
+            super(RoadStack, self).serviceRxes()
+        self.flushKeep()
+
+    def serviceAll(self):
+        '''
+        Service or Process:
+           server receive
+           rxes queue
+           process
+           txMsgs queue
+           txes queue to server send
+        then refill key pool if idle
+        '''
+        super(RoadStack, self).serviceAll()
+        self.idle()
+
+    def serviceAllUntil(self, timeout=None):
+        '''
+        Event driven alternative to polling .serviceAll that refills key pool
+        when idle. See Stack.serviceAllUntil
+        '''
+        ready = super(RoadStack, self).serviceAllUntil(timeout=timeout)
+        self.idle()
+        return ready
+
+    def serviceAllTx(self):
+        '''
+        Service:
+           bursts signed on .cryptoPool
+           txMsgs queue
+           txes queue to server send
+        '''
+        self.serviceSigneds()
+        super(RoadStack, self).serviceAllTx()
+
+    def serviceSigneds(self):
+        '''
+        Deliver completion of burst signing on .cryptoPool back to each
+        messenger to send the burst unless removed meanwhile such as by timeout
+        '''
+        while self.signeds:
+            messenger = self.signeds.popleft()
+            self.signings.discard(messenger)
+            if messenger.remote.transactions.get(messenger.index) is messenger:
+                messenger.signed()
+
+    def idle(self):
+        '''
+        Generate at most .KeyRefill keys into .keyPool when the pool is below
+        its low watermark and no transactions or packets are pending so key
+        generation is off the critical path of allow handshakes
+        Returns number of keys generated
+        '''
+        if (not self.keyPool.wanting() or self.processes or self.signings or
+                self.rxes or self.txes or self.txMsgs):
+            return 0
+        count = self.keyPool.refill(limit=self.KeyRefill)
+        if count:
+            self.incStat('keypool_refill', count)
+        return count
+
+    def flushKeep(self, force=False):
+        '''
+        Dump write behind local, remote and role data staged since last flush
+        in one keep batch. Role data is flushed every time
+        Returns number of local and remote dumps
+        Opens no keep batch, so no empty transaction, when nothing is staged
+        '''
+        if not (self.dirtyLocal or self.dirtyRemotes or self.keep.dirtyRoles):
+            return 0
+        with self.keep.batch():
+            count = super(RoadStack, self).flushKeep(force=force)
+            if self.keep.dirtyRoles:
+                self.incStat('role_flush', self.keep.flushRemoteRoleData())
+        return count
+
+    def nextDeadline(self, after=None):
+        '''
+        Returns earliest store stamp at which .process has timer based work
+        to do that is later than after or None if none
+        Presence keep alive and reap timers are serviced by .manage not .process
+        so are not included
+        While bursts are signing on .cryptoPool includes .SignPoll after
+        so .serviceAllUntil wakes to send them once signed
+        '''
+        stops = [self.processes.peek(after=after), self.cleanups.peek(after=after)]
+        if self.signings:
+            stops.append((after if after is not None else self.store.stamp) +
+                         self.SignPoll)
+        stops = [stop for stop in stops if stop is not None]
+        return min(stops) if stops else None
 
     def parseInner(self, packet):
         '''
@@ -797,6 +1216,30 @@ class RoadStack(stacking.KeepStack):
                                         rxPacket=packet)
         allowent.hello()
 
+    def reserveAlive(self):
+        '''
+        Reserve next keep alive slot so that no more than .AliveRate keep alives
+        start per second after an initial burst of .AliveBurst.
+        Returns delay in seconds from now to the reserved slot, 0.0 means now
+        '''
+        if not self.AliveRate:
+            return 0.0
+        stamp = self.store.stamp
+        interval = 1.0 / self.AliveRate
+        tat = max(self.aliveTat, stamp)
+        self.aliveTat = tat + interval
+        delay = tat - stamp - (max(self.AliveBurst, 1) - 1) * interval
+        return delay if delay > interval * 1e-6 else 0.0  # ignore float rounding
+
+    def countAlive(self):
+        '''
+        Update keep alive stats with alive started by .manage
+        '''
+        self.incStat('alive_start')
+        elapsed = self.statTimer.elapsed
+        if elapsed > 0.0:
+            self.updateStat('alive_rate', self.stats['alive_start'] / elapsed)
+
     def alive(self, uid=None, timeout=None, cascade=False):
         '''
         Initiate alive transaction
@@ -881,7 +1324,8 @@ class RoadStack(stacking.KeepStack):
                                           timeout=timeout,
                                           txData=data,
                                           bcst=self.Bf,
-                                          burst=self.BurstSize)
+                                          burst=self.BurstSize,
+                                          adaptive=self.BurstAdaptive)
         messenger.message(body)
 
     def replyMessage(self, packet, remote):
@@ -34,7 +34,7 @@ else:
 # Import raet libs
 from raet.abiding import *  # import globals
 from raet import raeting, nacling
-from raet.road import estating, stacking
+from raet.road import estating, stacking, transacting
 
 def setUpModule():
     console.reinit(verbosity=console.Wordage.concise)
@@ -76,6 +76,153 @@ class BasicTestCase(unittest.TestCase):
 
         stack.server.close()
 
+    def testBoxer(self):
+        '''
+        Test remote cached shared key boxer invalidation
+        '''
+        console.terse("{0}\n".format(self.testBoxer.__doc__))
+        stack = stacking.RoadStack()
+        remote = estating.RemoteEstate(stack, ha=("127.0.0.1", 7532))
+        self.assertIs(remote.boxer, None)  # no correspondent short term key yet
+
+        priver = nacling.Privateer()
+        remote.publee = nacling.Publican(key=priver.pubraw)
+        boxer = remote.boxer
+        self.assertIsInstance(boxer, nacling.Boxer)
+        self.assertIs(remote.boxer, boxer)  # cached
+        self.assertIs(boxer.privateer, remote.privee)
+
+        msg = b"Cached shared key"
+        cipher, nonce = boxer.encrypt(msg)
+        self.assertEqual(priver.decrypt(cipher, nonce, remote.privee.pubraw), msg)
+
+        remote.privee = nacling.Privateer()
+        self.assertIsNot(remote.boxer, boxer)
+        self.assertIs(remote.boxer.privateer, remote.privee)
+
+        remote.rekey()
+        self.assertIs(remote.boxer, None)
+
+        stack.server.close()
+
+    def testLazyKeys(self):
+        '''
+        Test remote short term keys and key objects are created on first use
+        '''
+        console.terse("{0}\n".format(self.testLazyKeys.__doc__))
+        stack = stacking.RoadStack()
+        signer = nacling.Signer()
+        priver = nacling.Privateer()
+        remote = estating.RemoteEstate(stack,
+                                       ha=("127.0.0.1", 7532),
+                                       verkey=signer.verhex,
+                                       pubkey=priver.pubhex)
+        self.assertIs(remote._privee, None)
+        self.assertIs(remote._publee, None)
+        self.assertIs(remote.verfer._key, None)
+        self.assertIs(remote.pubber._key, None)
+        self.assertEqual(remote.verfer.keyhex, signer.verhex)
+        self.assertEqual(remote.verfer.keyraw, signer.verraw)
+        self.assertEqual(remote.pubber.keyhex, priver.pubhex)
+
+        privee = remote.privee
+        self.assertIsInstance(privee, nacling.Privateer)
+        self.assertIs(remote.privee, privee)
+        self.assertEqual(remote.publee.keyraw, '')
+        self.assertIs(remote.publee.key, None)
+        remote.rekey()
+        self.assertIs(remote._privee, None)
+        self.assertIsNot(remote.privee, privee)
+
+        msg = b"Lazy verify key"
+        self.assertTrue(remote.verfer.verify(signer.signature(msg), msg))
+        self.assertIsInstance(remote.verfer.key, nacling.VerifyKey)
+        self.assertIsInstance(remote.pubber.key, nacling.PublicKey)
+        self.assertEqual(remote.pubber.key.encode(), priver.pubraw)
+        verfer = nacling.Verifier(remote.verfer.key)
+        self.assertIs(verfer.key, remote.verfer.key)
+        self.assertEqual(verfer.keyhex, signer.verhex)
+        self.assertRaises(ValueError, nacling.Verifier, signer.verhex[:-2])
+        self.assertRaises(ValueError, nacling.Publican, priver.pubraw[:-1])
+
+        stack.server.close()
+
+    def testRtt(self):
+        '''
+        Test remote round trip time estimate and derived redo timeouts
+        '''
+        console.terse("{0}\n".format(self.testRtt.__doc__))
+        stack = stacking.RoadStack()
+        remote = estating.RemoteEstate(stack, ha=("127.0.0.1", 7532))
+        stack.addRemote(remote)
+        self.assertIs(remote.rto, None)
+        aliver = transacting.Aliver(stack=stack, remote=remote)
+        self.assertEqual(aliver.redoTimeoutMin, transacting.Aliver.RedoTimeoutMin)
+        self.assertEqual(aliver.redoTimeoutMax, transacting.Aliver.RedoTimeoutMax)
+
+        remote.updateRtt(0.1)  # first sample
+        self.assertAlmostEqual(remote.srtt, 0.1)
+        self.assertAlmostEqual(remote.rttvar, 0.05)
+        self.assertAlmostEqual(remote.rto, 0.3)
+        remote.updateRtt(0.1)
+        self.assertAlmostEqual(remote.rttvar, 0.0375)
+        self.assertAlmostEqual(remote.rto, 0.25)
+        self.assertAlmostEqual(stack.stats["{0}_rtt".format(remote.name)], 0.1)
+
+        self.assertAlmostEqual(aliver.redoTimeoutMin, 0.25)
+        self.assertAlmostEqual(aliver.redoTimeoutMax, 1.0)  # same 4x span
+        messenger = transacting.Messenger(stack=stack, remote=remote)
+        self.assertAlmostEqual(messenger.redoTimeoutMin, 0.25)
+        self.assertAlmostEqual(messenger.redoTimeoutMax, 0.625)  # same 2.5x span
+
+        for i in range(50):
+            remote.updateRtt(0.001)  # fast lan
+        self.assertEqual(remote.rto, remote.RtoMin)
+        for i in range(50):
+            remote.updateRtt(10.0)  # very slow wan
+        self.assertEqual(remote.rto, remote.RtoMax)
+
+        stack.server.close()
+
+    def testBurst(self):
+        '''
+        Test remote adaptive burst size increase and decrease
+        '''
+        console.terse("{0}\n".format(self.testBurst.__doc__))
+        stack = stacking.RoadStack()
+        remote = estating.RemoteEstate(stack, ha=("127.0.0.1", 7532))
+        stack.addRemote(remote)
+        self.assertEqual(remote.burst, remote.BurstInit)
+
+        self.assertEqual(remote.increaseBurst(), 2 * remote.BurstInit)  # doubles
+        self.assertEqual(remote.decreaseBurst(), remote.BurstInit)  # halves
+        self.assertEqual(remote.burstThreshold, remote.BurstInit)
+        self.assertEqual(remote.increaseBurst(), remote.BurstInit + 1)  # then adds
+        for i in range(10):
+            remote.decreaseBurst()
+        self.assertEqual(remote.burst, remote.BurstMin)
+        for i in range(1000):
+            remote.increaseBurst()
+        self.assertEqual(remote.burst, remote.BurstMax)
+
+        messenger = transacting.Messenger(stack=stack, remote=remote, burst=16,
+                                          adaptive=True)
+        self.assertEqual(messenger.window, remote.BurstMax)
+        self.assertEqual(messenger.limit, 16)  # capped by burst
+        messenger.congest(1)  # within loss tolerance
+        self.assertEqual(messenger.window, remote.BurstMax)
+        messenger.congest(remote.BurstMax)
+        self.assertEqual(messenger.window, remote.BurstMax // 2)
+        self.assertEqual(remote.burst, remote.BurstMax // 2)
+        messenger.congest(remote.BurstMax)  # only once per burst
+        self.assertEqual(remote.burst, remote.BurstMax // 2)
+
+        messenger = transacting.Messenger(stack=stack, remote=remote)
+        self.assertEqual(messenger.window, 0)  # not adaptive
+        self.assertEqual(messenger.limit, 0)  # no limit
+
+        stack.server.close()
+
 
 def runOneBasic(test):
     '''
@@ -90,6 +237,10 @@ def runSome():
     tests =  []
     names = [
                 'testNormalizeHost',
+                'testBoxer',
+                'testLazyKeys',
+                'testRtt',
+                'testBurst',
             ]
     tests.extend(map(BasicTestCase, names))
 
@@ -2096,6 +2096,239 @@ class BasicTestCase(unittest.TestCase):
             stack.server.close()
             stack.clearAllKeeps()
 
+    def testRoleTable(self):
+        '''
+        Test role table write behind and pick up of changes by others
+        '''
+        console.terse("{0}\n".format(self.testRoleTable.__doc__))
+        dirpath = os.path.join(self.base, 'road', 'keep', 'main')
+        keep = keeping.RoadKeep(dirpath=dirpath, auto=raeting.AutoMode.once.value)
+        otherKeep = keeping.RoadKeep(dirpath=dirpath, auto=raeting.AutoMode.once.value)
+        verhex = str(nacling.Signer().verhex.decode('ISO-8859-1'))
+        pubhex = str(nacling.Privateer().pubhex.decode('ISO-8859-1'))
+        filepath = keep.remoteRolePath('alpha')
+
+        # first join accepts once and defers dump
+        status = keep.statusRole('alpha', verhex=verhex, pubhex=pubhex)
+        self.assertEqual(status, raeting.Acceptance.accepted.value)
+        self.assertEqual(keep.dirtyRoles, set(['alpha']))
+        self.assertFalse(os.path.exists(filepath))
+        data = keep.loadRemoteRoleData('alpha')
+        self.assertEqual(data['acceptance'], raeting.Acceptance.accepted.value)
+        self.assertEqual(data['verhex'], verhex)
+        status = keep.statusRole('alpha', verhex=verhex, pubhex=pubhex)
+        self.assertEqual(status, raeting.Acceptance.accepted.value)
+        self.assertEqual(keep.flushRemoteRoleData(), 1)
+        self.assertEqual(keep.dirtyRoles, set())
+        self.assertTrue(os.path.exists(filepath))
+        self.assertEqual(otherKeep.loadRemoteRoleData('alpha'), data)
+
+        # other keep rejects role so cached role is reloaded
+        data['acceptance'] = raeting.Acceptance.rejected.value
+        time.sleep(0.01)  # distinct mtime
+        otherKeep.dumpRemoteRoleData(data, 'alpha')
+        status = keep.statusRole('alpha', verhex=verhex, pubhex=pubhex)
+        self.assertEqual(status, raeting.Acceptance.rejected.value)
+        self.assertEqual(keep.dirtyRoles, set())
+
+        # other keep clears role so first time again
+        otherKeep.clearRemoteRoleData('alpha')
+        status = keep.statusRole('alpha', verhex=verhex, pubhex=pubhex)
+        self.assertEqual(status, raeting.Acceptance.accepted.value)
+        roles = keep.loadAllRemoteRoleData()  # keeps role not yet dumped
+        self.assertEqual(roles['alpha']['acceptance'], raeting.Acceptance.accepted.value)
+        keep.clearAllRemoteRoleData()
+        self.assertEqual(keep.dirtyRoles, set())
+        self.assertEqual(keep.loadRemoteRoleData('alpha')['acceptance'], None)
+        keep.clearAllDir()
+
+    def testKeepBatch(self):
+        '''
+        Test file keep batch syncs dumps only when outermost batch exits normally
+        '''
+        console.terse("{0}\n".format(self.testKeepBatch.__doc__))
+        dirpath = os.path.join(self.base, 'road', 'keep', 'main')
+        keep = keeping.RoadKeep(dirpath=dirpath, auto=raeting.AutoMode.once.value)
+        data = odict(name='alpha', acceptance=raeting.Acceptance.accepted.value)
+
+        try:
+            with keep.batch():
+                keep.dumpRemoteRoleData(data, 'alpha')
+                raise ValueError("abort")
+        except ValueError:
+            pass
+        self.assertEqual(keep.depth, 0)
+        self.assertEqual(keep.unsynced, [keep.remoteRolePath('alpha')])  # not synced
+        self.assertEqual(keep.loadRemoteRoleData('alpha')['name'], 'alpha')
+
+        with keep.batch():
+            with keep.batch():
+                keep.dumpRemoteRoleData(data, 'beta')
+                keep.dumpRemoteRoleData(data, 'beta')
+            self.assertEqual(len(keep.unsynced), 3)  # synced by outermost
+        self.assertEqual(keep.depth, 0)
+        self.assertEqual(keep.unsynced, [])
+        self.assertEqual(keep.loadRemoteRoleData('beta')['name'], 'alpha')
+
+        keep.dumpRemoteRoleData(data, 'gamma')  # synced when dumped
+        self.assertEqual(keep.unsynced, [])
+        keep.clearAllDir()
+
+    def testSqliteKeep(self):
+        '''
+        Test migrate of keep files to sqlite keep and restart from it
+        '''
+        console.terse("{0}\n".format(self.testSqliteKeep.__doc__))
+        mainData = self.createRoadData(name='main',
+                                       base=self.base,
+                                       auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(mainData['dirpath'])
+        main = self.createRoadStack(data=mainData, main=True, ha=None)
+        otherData = self.createRoadData(name='other',
+                                        base=self.base,
+                                        auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(otherData['dirpath'])
+        other = self.createRoadStack(data=otherData,
+                                     main=None,
+                                     ha=("", raeting.RAET_TEST_PORT))
+        self.join(other, main)
+        self.assertTrue(other.remotes.values()[0].joined)
+        main.dumpRemotes()
+        main.server.close()
+
+        keep = keeping.migrateKeep(dirpath=main.keep.dirpath)
+        self.assertTrue(os.path.exists(keep.dbpath))
+        self.assertEqual(keep.loadLocalData(), main.keep.loadLocalData())
+        self.assertEqual(keep.loadAllRemoteData(), main.keep.loadAllRemoteData())
+        self.assertEqual(keep.loadRemoteRoleData('other'),
+                         main.keep.loadRemoteRoleData('other'))
+        main.keep.clearAllRemoteData()
+        main.keep.clearAllRemoteRoleData()
+
+        # restart main from sqlite keep and rejoin
+        keep.auto = raeting.AutoMode.once.value
+        main = stacking.RoadStack(store=self.store,
+                                  main=True,
+                                  keep=keep)
+        self.assertEqual(main.local.name, 'main')
+        self.assertEqual(main.local.signer.keyhex, ns2b(mainData['sighex']))
+        self.assertEqual(len(main.remotes), 1)
+        remote = main.remotes.values()[0]
+        self.assertEqual(remote.name, 'other')
+        self.assertEqual(remote.verfer.keyhex, ns2b(otherData['verhex']))
+        self.join(other, main)
+        self.assertTrue(other.remotes.values()[0].joined)
+        self.assertTrue(main.remotes.values()[0].joined)
+
+        # role changes by other connections are seen
+        otherKeep = keeping.SqliteRoadKeep(dirpath=keep.dirpath)
+        data = otherKeep.loadRemoteRoleData('other')
+        self.assertEqual(data['acceptance'], raeting.Acceptance.accepted.value)
+        data['acceptance'] = raeting.Acceptance.rejected.value
+        otherKeep.dumpRemoteRoleData(data, 'other')
+        self.assertEqual(keep.loadRemoteRoleData('other')['acceptance'],
+                         raeting.Acceptance.rejected.value)
+
+        # nothing staged opens no keep batch so no empty transaction
+        main.flush()
+        batches = []
+        batch = main.keep.batch
+        main.keep.batch = lambda: batches.append(main.keep) or batch()
+        main.process()
+        self.assertEqual(main.flushKeep(force=True), 0)
+        self.assertEqual(batches, [])
+        main.stageLocal()
+        self.assertEqual(main.flush(), 1)
+        self.assertTrue(batches)  # nested batches commit as one
+        del main.keep.batch
+
+        # batch is one transaction
+        try:
+            with keep.batch():
+                keep.dumpRemoteData(odict(name='lost', role='other'), 'lost')
+                raise ValueError("abort")
+        except ValueError:
+            pass
+        self.assertIs(keep.loadRemoteData('lost'), None)
+        with keep.batch():
+            with keep.batch():
+                keep.dumpRemoteData(odict(name='kept', role='other'), 'kept')
+        self.assertEqual(otherKeep.loadRemoteData('kept')['name'], 'kept')
+        otherKeep.close()
+
+        for stack in [main, other]:
+            stack.server.close()
+            stack.clearAllKeeps()
+
+    def testWriteBehind(self):
+        '''
+        Test write behind of remote and local dumps staged by joins
+        '''
+        console.terse("{0}\n".format(self.testWriteBehind.__doc__))
+        mainData = self.createRoadData(name='main',
+                                       base=self.base,
+                                       auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(mainData['dirpath'])
+        main = stacking.RoadStack(store=self.store,
+                                  name=mainData['name'],
+                                  sigkey=mainData['sighex'],
+                                  prikey=mainData['prihex'],
+                                  auto=mainData['auto'],
+                                  main=True,
+                                  basedirpath=mainData['basedirpath'],
+                                  dumpInterval=1.0)
+        otherData = self.createRoadData(name='other',
+                                        base=self.base,
+                                        auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(otherData['dirpath'])
+        other = self.createRoadStack(data=otherData,
+                                     main=None,
+                                     ha=("", raeting.RAET_TEST_PORT))
+        self.assertEqual(main.dumpInterval, 1.0)
+        self.assertEqual(main.dumpSize, stacking.RoadStack.DumpSize)
+
+        # join stages dumps until interval
+        self.join(other, main)
+        remote = main.remotes.values()[0]
+        self.assertTrue(remote.joined)
+        self.assertEqual(list(main.dirtyRemotes.keys()), [remote])
+        self.assertTrue(main.dirtyLocal)
+        self.assertIs(main.keep.loadRemoteData('other'), None)
+        self.assertEqual(main.keep.loadRemoteRoleData('other')['acceptance'],
+                         raeting.Acceptance.accepted.value)  # role not deferred
+        main.stageRemote(remote)  # coalesced
+        self.assertEqual(len(main.dirtyRemotes), 1)
+        self.assertEqual(main.flushKeep(), 0)
+        self.store.advanceStamp(1.0)
+        main.process()
+        self.assertEqual(main.dirtyRemotes, {})
+        self.assertFalse(main.dirtyLocal)
+        self.assertEqual(main.stats['keep_flush'], 1)
+        self.assertEqual(main.stats['keep_dump'], 2)
+        data = main.keep.loadRemoteData('other')
+        self.assertEqual(data['fuid'], remote.fuid)
+        self.assertEqual(data['joined'], True)
+
+        # removed remote is not dumped
+        main.stageRemote(remote)
+        main.removeRemote(remote, clear=False)
+        self.assertEqual(main.dirtyRemotes, {})
+        self.assertEqual(main.flush(), 0)
+
+        # size forces flush and flush on shutdown
+        main.addRemote(remote)
+        main.dumpSize = 1
+        main.stageRemote(remote)
+        self.assertEqual(main.dirtyRemotes, {})
+        self.assertEqual(main.stats['keep_flush'], 2)
+        main.stageLocal()
+        self.assertEqual(main.flush(), 1)
+        self.assertEqual(main.stats['keep_dump'], 4)
+
+        for stack in [main, other]:
+            stack.server.close()
+            stack.clearAllKeeps()
+
 def runOne(test):
     '''
     Unittest Runner
@@ -2120,7 +2353,11 @@ def runSome():
              'testLostOtherKeepLocal',
              'testLostMainKeep',
              'testLostMainKeepLocal',
-             'testLostBothKeepLocal',]
+             'testLostBothKeepLocal',
+             'testRoleTable',
+             'testKeepBatch',
+             'testSqliteKeep',
+             'testWriteBehind',]
 
     tests.extend(map(BasicTestCase, names))
 
@@ -827,6 +827,9 @@ class BasicTestCase(unittest.TestCase):
         self.assertEqual(len(beta.rxMsgs), 1)
         receivedMsg, source = beta.rxMsgs.popleft()
         self.assertDictEqual(sentMsg, receivedMsg)
+        # burst wait flags set before signing and resends signed once per flags
+        self.assertGreater(alpha.stats['message_segment_signed'], 0)
+        self.assertGreater(alpha.stats['message_segment_sign_saved'], 0)
 
         console.terse("\nMessage with drops Beta to Alpha *********\n")
         self.assertEqual(len(beta.txMsgs), 0)
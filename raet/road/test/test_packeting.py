@@ -351,6 +351,116 @@ class BasicTestCase(unittest.TestCase):
                                             'fg': '00'})
         self.assertEqual(packet1.body.data, body)
 
+    def testBasicBinaryJson(self):
+        '''
+        Basic pack parse with header binary and body json
+        '''
+        console.terse("{0}\n".format(self.testBasicBinaryJson.__doc__))
+
+        stack = MockStack(store=self.store, veritive=False)
+
+        hk = raeting.HeadKind.binary.value
+        bk = raeting.BodyKind.json.value
+
+        data = odict(hk=hk, bk=bk, se=2, de=3, si=0x12345678, ti=7, wf=True)
+        body = odict([('msg', 'Hello Raet World'), ('extra', 'Goodby Big Moon')])
+        packet0 = packeting.TxPacket(stack=stack, embody=body, data=data, )
+        self.assertDictEqual(packet0.body.data, body)
+        packet0.pack()
+        self.assertEqual(packet0.head.size, raeting.BINARY_HEAD_PACKER.size)
+        self.assertEqual(packet0.packed,
+                b'RAET\x00\x00\x02#\x00\x00\x00W\x00\x00\x00\x02\x00\x00\x00\x03'
+                b'\x124Vx\x00\x00\x00\x07\x00\x01\x00\x00\x00\x04\x00'
+                b'{"msg":"Hello Raet World","extra":"Goodby Big Moon"}')
+
+        packet1 = packeting.RxPacket(stack=stack, packed=packet0.packed)
+        packet1.parse()
+        self.assertDictEqual(packet1.data, {'sh': '',
+                                            'sp': 7530,
+                                            'dh': '127.0.0.1',
+                                            'dp': 7530,
+                                            'ri':'RAET',
+                                            'vn': 0,
+                                            'pk': 0,
+                                            'pl': 87,
+                                            'hk': 2,
+                                            'hl': 35,
+                                            'se': 2,
+                                            'de': 3,
+                                            'cf': False,
+                                            'bf': False,
+                                            'nf': False,
+                                            'df': False,
+                                            'vf': False,
+                                            'si': 0x12345678,
+                                            'ti': 7,
+                                            'tk': 0,
+                                            'dt': 0,
+                                            'oi': 0,
+                                            'wf': True,
+                                            'sn': 0,
+                                            'sc': 1,
+                                            'ml': 0,
+                                            'sf': False,
+                                            'af': False,
+                                            'bk': 1,
+                                            'ck': 0,
+                                            'fk': 0,
+                                            'fl': 0,
+                                            'fg': '04'})
+        self.assertDictEqual(packet1.body.data, body)
+
+        # extensions
+        data.update(sn=5, dt=1.5, oi=9)
+        packet0 = packeting.TxPacket(stack=stack, embody=body, data=data, )
+        packet0.pack()
+        self.assertEqual(packet0.head.size, raeting.BINARY_HEAD_PACKER.size +
+                                            raeting.BINARY_SEGMENT_PACKER.size +
+                                            raeting.BINARY_STAMP_PACKER.size +
+                                            raeting.BINARY_ORDER_PACKER.size)
+        packet1 = packeting.RxPacket(stack=stack, packed=packet0.packed)
+        packet1.parse()
+        self.assertEqual(packet1.data['sn'], 5)
+        self.assertEqual(packet1.data['dt'], 1.5)
+        self.assertEqual(packet1.data['oi'], 9)
+        self.assertEqual(packet1.data['hl'], packet0.head.size)
+        self.assertDictEqual(packet1.body.data, body)
+
+        # truncated
+        packet1 = packeting.RxPacket(stack=stack, packed=packet0.packed[:20])
+        self.assertRaises(raeting.PacketError, packet1.parse)
+
+        # out of range field
+        data.update(si=2 ** 32)
+        packet0 = packeting.TxPacket(stack=stack, embody=body, data=data, )
+        self.assertRaises(raeting.PacketError, packet0.pack)
+
+    def testCompactPacket(self):
+        '''
+        Test packets and parts are slotted and data defaults are independent
+        '''
+        console.terse("{0}\n".format(self.testCompactPacket.__doc__))
+
+        stack = MockStack(store=self.store, veritive=False)
+
+        packet0 = packeting.TxPacket(stack=stack, data=odict(hk=raeting.HeadKind.raet.value))
+        packet1 = packeting.RxPacket(stack=stack)
+        for packet in [packet0, packet1]:
+            self.assertFalse(hasattr(packet, '__dict__'))
+            for part in [packet.head, packet.body, packet.coat, packet.foot]:
+                self.assertFalse(hasattr(part, '__dict__'))
+
+        packet0.data['sn'] = 5
+        self.assertEqual(packet1.data['sn'], 0)
+        self.assertDictEqual(packet1.data, raeting.PACKET_DEFAULTS)
+        self.assertDictEqual(packet0.refresh().data, raeting.PACKET_DEFAULTS)
+
+        self.assertRaises(raeting.PacketError, packeting.TxPacket, stack=stack, kind=99)
+        packet0 = packeting.TxPacket(stack=stack, kind=raeting.PcktKind.ack.value)
+        self.assertEqual(packet0.data['pk'], raeting.PcktKind.ack.value)
+        packet0.data['fk'] = 99
+        self.assertRaises(raeting.PacketError, packet0.foot.pack)
+
     def testSegmentation(self):
         '''
         Test pack unpack segmented
@@ -418,6 +528,235 @@ class BasicTestCase(unittest.TestCase):
                                            'fg': '08'})
         self.assertEquals( tray1.body, stuff)
 
+    def testSegmentationBinary(self):
+        '''
+        Test pack unpack segmented with binary head
+        '''
+        console.terse("{0}\n".format(self.testSegmentationBinary.__doc__))
+
+        stack = MockStack(store=self.store, veritive=False)
+
+        hk = raeting.HeadKind.binary.value
+        bk = raeting.BodyKind.raw.value
+
+        data = odict(hk=hk, bk=bk)
+        stuff = ns2b("".join([str(i).rjust(4, " ") for i in range(600)]))
+        self.assertEqual(len(stuff), 2400)
+
+        tray0 = packeting.TxTray(stack=stack, data=data, body=stuff)
+        tray0.pack()
+        self.assertEqual(tray0.packed, stuff)
+        self.assertEqual(len(tray0.packets), 3)
+        for packet in tray0.packets:
+            self.assertEqual(packet.head.size, raeting.BINARY_HEAD_PACKER.size +
+                                               raeting.BINARY_SEGMENT_PACKER.size)
+            self.assertTrue(packet.size <= raeting.UDP_MAX_PACKET_SIZE)
+        self.assertEqual(tray0.packets[0].size, raeting.UDP_MAX_PACKET_SIZE)
+
+        tray1 = packeting.RxTray(stack=stack)
+        for packet in reversed(tray0.packets):
+            packet = packeting.RxPacket(stack=stack, packed=packet.packed)
+            packet.parseOuter()
+            tray1.parse(packet)
+
+        self.assertTrue(tray1.complete)
+        self.assertEqual(tray1.data['sc'], 3)
+        self.assertEqual(tray1.data['ml'], 2400)
+        self.assertIs(tray1.data['sf'], True)
+        self.assertEqual(tray1.body, stuff)
+
+    def testReassembly(self):
+        '''
+        Test out of order and duplicate segment reassembly
+        '''
+        console.terse("{0}\n".format(self.testReassembly.__doc__))
+
+        stack = MockStack(store=self.store, veritive=False)
+
+        data = odict(hk=raeting.HeadKind.raet.value, bk=raeting.BodyKind.raw.value)
+        stuff = ns2b("".join([str(i).rjust(4, " ") for i in range(1000)]))
+        tray0 = packeting.TxTray(stack=stack, data=data, body=stuff)
+        tray0.pack()
+        self.assertEqual(len(tray0.packets), 5)
+
+        def rx(packet):
+            packet = packeting.RxPacket(stack=stack, packed=packet.packed)
+            packet.parseOuter()
+            return packet
+
+        tray1 = packeting.RxTray(stack=stack)
+        self.assertEqual(tray1.missing(), [])
+        self.assertIs(tray1.parse(rx(tray0.packets[4])), None)  # last first
+        self.assertEqual(len(tray1.buffer), len(stuff))
+        self.assertIs(tray1.parse(rx(tray0.packets[2])), None)
+        self.assertIs(tray1.parse(rx(tray0.packets[2])), None)  # duplicate
+        self.assertEqual(tray1.count, 2)
+        self.assertEqual(tray1.missing(), [0, 1, 3])
+        self.assertEqual(tray1.missing(begin=2), [3])
+        self.assertTrue(tray1.received(4))
+        self.assertFalse(tray1.received(0))
+
+        self.assertIs(tray1.parse(rx(tray0.packets[0])), None)
+        self.assertEqual(tray1.first, 1)
+        self.assertIs(tray1.parse(rx(tray0.packets[1])), None)
+        self.assertEqual(tray1.first, 3)
+        self.assertEqual(tray1.missing(), [3])
+        self.assertFalse(tray1.complete)
+        self.assertEqual(tray1.parse(rx(tray0.packets[3])), stuff)
+        self.assertTrue(tray1.complete)
+        self.assertIs(tray1.buffer, None)
+        self.assertEqual(tray1.body, stuff)
+        self.assertIsInstance(tray1.body, bytes)
+
+        # segment from different message is inconsistent
+        tray2 = packeting.TxTray(stack=stack, data=data, body=stuff + stuff)
+        tray2.pack()
+        tray1 = packeting.RxTray(stack=stack)
+        tray1.parse(rx(tray0.packets[0]))
+        self.assertRaises(raeting.PacketError, tray1.parse, rx(tray2.packets[1]))
+
+    def testLazySegments(self):
+        '''
+        Test segments generated on demand and released when acked
+        '''
+        console.terse("{0}\n".format(self.testLazySegments.__doc__))
+
+        stack = MockStack(store=self.store, veritive=False)
+
+        data = odict(hk=raeting.HeadKind.raet.value, bk=raeting.BodyKind.raw.value)
+        stuff = ns2b("".join([str(i).rjust(4, " ") for i in range(1000)]))
+        tray0 = packeting.TxTray(stack=stack, data=data, body=stuff)
+        tray0.pack()
+        self.assertEqual(tray0.count, 5)
+        self.assertEqual(len(tray0.segments), 0)  # nothing generated yet
+
+        packet = tray0.segment(1)
+        self.assertIs(tray0.segment(1), packet)  # cached
+        self.assertEqual(packet.data['sn'], 1)
+        self.assertEqual(packet.data['sc'], 5)
+        self.assertEqual(len(tray0.segments), 1)
+        tray0.segment(0)
+        tray0.segment(2)
+        tray0.release(2)  # acked 0 and 1
+        self.assertEqual(list(tray0.segments.keys()), [2])
+        regen = tray0.segment(1)  # regenerated with same contents
+        self.assertIsNot(regen, packet)
+        self.assertEqual(regen.packed, packet.packed)
+        self.assertRaises(raeting.PacketError, tray0.segment, 5)
+        self.assertRaises(raeting.PacketError, tray0.segment, -1)
+
+        tray0.release(tray0.count)
+        self.assertEqual(len(tray0.segments), 0)
+        tray1 = packeting.RxTray(stack=stack)
+        for sn in range(tray0.count):
+            rx = packeting.RxPacket(stack=stack, packed=tray0.segment(sn).packed)
+            rx.parseOuter()
+            tray1.parse(rx)
+            tray0.release(sn + 1)
+            self.assertLessEqual(len(tray0.segments), 1)
+        self.assertEqual(tray1.body, stuff)
+
+        # single packet message is kept
+        tray0 = packeting.TxTray(stack=stack, data=data, body=b"Hello")
+        tray0.pack()
+        self.assertEqual(tray0.count, 1)
+        tray0.release(1)
+        self.assertEqual(tray0.segment(0).data['sc'], 1)
+
+    def testSegmentFlags(self):
+        '''
+        Test segments signed once per again and wait flag combination
+        '''
+        console.terse("{0}\n".format(self.testSegmentFlags.__doc__))
+
+        stack = MockStack(store=self.store, veritive=False)
+
+        data = odict(hk=raeting.HeadKind.raet.value, bk=raeting.BodyKind.raw.value)
+        stuff = ns2b("".join([str(i).rjust(4, " ") for i in range(1000)]))
+        tray0 = packeting.TxTray(stack=stack, data=data, body=stuff)
+        tray0.pack()
+
+        plain = tray0.segment(0)
+        wait = tray0.segment(0, wf=True)  # flags chosen before signing
+        self.assertIsNot(wait, plain)
+        self.assertFalse(plain.data['wf'])
+        self.assertTrue(wait.data['wf'])
+        self.assertNotEqual(wait.packed, plain.packed)
+        self.assertEqual(tray0.signed, 2)
+        self.assertEqual(tray0.saved, 0)  # first served (False, False)
+
+        self.assertIs(tray0.segment(0), plain)  # flag change without resigning
+        self.assertIs(tray0.segment(0, wf=True), wait)
+        self.assertIs(tray0.segment(0, wf=True), wait)  # unchanged
+        self.assertEqual(tray0.signed, 2)
+        self.assertEqual(tray0.saved, 2)
+
+        again = tray0.segment(1, af=True, wf=True)
+        self.assertTrue(again.data['af'])
+        self.assertEqual(tray0.signed, 3)
+        self.assertEqual(tray0.saved, 3)  # would have been signed then repacked
+
+        packet = packeting.RxPacket(stack=stack, packed=again.packed)
+        packet.parseOuter()
+        self.assertTrue(packet.data['af'])
+        self.assertTrue(packet.data['wf'])
+        self.assertEqual(packet.data['sn'], 1)
+
+        # unsegmented message is signed with its flags
+        tray0 = packeting.TxTray(stack=stack, data=data, body=b"Hello")
+        tray0.pack()
+        self.assertEqual(tray0.signed, 0)
+        packet = packeting.TxPacket(stack=stack, data=data, embody=b"Hello")
+        packet.data.update(wf=True)
+        packet.pack()
+        self.assertEqual(tray0.segment(0, wf=True).packed, packet.packed)
+        self.assertEqual(tray0.signed, 1)
+
+    def testSack(self):
+        '''
+        Test selective ack of missed segment numbers
+        '''
+        console.terse("{0}\n".format(self.testSack.__doc__))
+
+        misseds = list(range(100, 4000))  # burst loss as runs
+        sack = packeting.sackify(misseds)
+        self.assertEqual(sack, odict(base=100, runs=[3900]))
+        self.assertEqual(packeting.unsackify(sack, end=4000), misseds)
+
+        misseds = [3, 4, 5, 9, 10, 20]  # sparse loss as bitmap
+        sack = packeting.sackify(misseds)
+        self.assertEqual(sack, odict(base=3, bitmap="e30040"))
+        self.assertEqual(packeting.unsackify(sack, end=21), misseds)
+
+        misseds = [3, 4, 5, 900, 901]
+        sack = packeting.sackify(misseds)
+        self.assertEqual(sack, odict(base=3, runs=[3, 894, 2]))
+        self.assertEqual(packeting.unsackify(sack, end=1000), misseds)
+
+        self.assertRaises(raeting.PacketError, packeting.unsackify, sack, end=901)
+        for bad in [odict(base=-1, runs=[1]),
+                    odict(base=0, runs=[1, -1, 2]),
+                    odict(base=0, runs=["1"]),
+                    odict(base=0, bitmap="zz"),
+                    odict(base=0, bitmap="ff"),  # beyond end
+                    odict(runs=[1])]:
+            self.assertRaises(raeting.PacketError, packeting.unsackify, bad, end=4)
+
+        misseds = list(range(0, 20000, 3))  # too many for one packet
+        body, remainders = packeting.packMisseds(misseds)
+        self.assertEqual(body['misseds'], misseds[:raeting.MAX_MISSEDS_COMPAT])
+        count = len(misseds) - len(remainders)
+        self.assertGreater(count, raeting.MAX_MISSEDS_RESEND)
+        self.assertEqual(packeting.unsackify(body['sack'], end=20000), misseds[:count])
+        self.assertEqual(remainders, misseds[count:])
+
+        stack = MockStack(store=self.store, veritive=False)
+        packet = packeting.TxPacket(stack=stack,
+                                    kind=raeting.PcktKind.resend.value,
+                                    embody=body,
+                                    data=odict(hk=raeting.HeadKind.raet.value))
+        packet.pack()  # fits in one packet
+
 class StackTestCase(unittest.TestCase):
     '''
     Pack and Parse with stacks
@@ -527,8 +866,10 @@ class StackTestCase(unittest.TestCase):
 
         tray1 = packeting.RxTray(stack=self.other)
         self.assertFalse(tray1.complete)
+        self.assertFalse(tray1.received(0))
         for packet in tray0.packets:
             tray1.parse(packet)
+            self.assertTrue(tray1.received(packet.data['sn']))
 
         self.assertTrue(tray1.complete)
         self.assertDictEqual(tray1.data, {'sh': '',
@@ -710,7 +1051,14 @@ def runSome():
              'testBasicRaetJson',
              'testBasicRaetMsgpack',
              'testBasicRaetRaw',
-             'testSegmentation']
+             'testBasicBinaryJson',
+             'testCompactPacket',
+             'testSegmentation',
+             'testSegmentationBinary',
+             'testReassembly',
+             'testLazySegments',
+             'testSegmentFlags',
+             'testSack']
     tests.extend(map(BasicTestCase, names))
 
     names = ['testSign',
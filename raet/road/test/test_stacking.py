@@ -27,7 +27,7 @@ console = getConsole()
 # Import raet libs
 from raet.abiding import *  # import globals
 from raet import raeting, nacling
-from raet.road import keeping, estating, stacking, transacting
+from raet.road import keeping, estating, stacking, transacting, packeting
 
 if sys.platform == 'win32':
     TEMPDIR = 'c:/temp'
@@ -94,8 +94,8 @@ class BasicTestCase(unittest.TestCase):
 
 
     def tearDown(self):
-        self.main.server.close()
-        self.other.server.close()
+        self.main.close()
+        self.other.close()
 
         self.main.clearAllDir()
         self.other.clearAllDir()
@@ -515,6 +515,34 @@ class BasicTestCase(unittest.TestCase):
 
         self.bidirectional(bk=raeting.BodyKind.json.value, mains=mains, others=others, duration=20.0)
 
+    def testSegmentedBinaryHead(self):
+        '''
+        Test segmented message transactions with binary head kind
+        '''
+        console.terse("{0}\n".format(self.testSegmentedBinaryHead.__doc__))
+
+        self.main.Hk = raeting.HeadKind.binary.value
+        self.other.Hk = raeting.HeadKind.binary.value
+
+        stuff = []
+        for i in range(300):
+            stuff.append(str(i).rjust(10, " "))
+        stuff = "".join(stuff)
+
+        others = []
+        mains = []
+        others.append(odict(house="Snake eyes", queue="near stuff", stuff=stuff))
+        mains.append(odict(house="Craps", queue="far stuff", stuff=stuff))
+
+        bloat = []
+        for i in range(300):
+            bloat.append(str(i).rjust(100, " "))
+        bloat = "".join(bloat)
+        others.append(odict(house="Other", queue="big stuff", bloat=bloat))
+        mains.append(odict(house="Main", queue="gig stuff", bloat=bloat))
+
+        self.bidirectional(bk=raeting.BodyKind.json.value, mains=mains, others=others, duration=20.0)
+
     def testSegmentedMsgpack(self):
         '''
         Test segmented message transactions
@@ -859,6 +887,660 @@ class BasicTestCase(unittest.TestCase):
         remote = self.other.remotes.values()[0]
         self.assertTrue(remote.alived)
 
+    def testPreVerifyDrop(self):
+        '''
+        Test header only admission checks drop packets before verification
+        '''
+        console.terse("{0}\n".format(self.testPreVerifyDrop.__doc__))
+
+        self.join()
+        self.allow()
+        self.assertEqual(len(self.main.transactions), 0)
+        self.assertEqual(len(self.other.transactions), 0)
+        otherRemote = self.main.remotes.values()[0]
+        mainRemote = self.other.remotes.values()[0]
+        self.assertTrue(otherRemote.allowed)
+        self.assertTrue(mainRemote.allowed)
+        self.main.clearStats()
+
+        def inject(**kwa):
+            '''
+            Put message packet from other with corrupted signature on main rxes
+            '''
+            data = odict(hk=raeting.HeadKind.raet.value,
+                         bk=raeting.BodyKind.json.value,
+                         fk=raeting.FootKind.nacl.value,
+                         tk=raeting.TrnsKind.message.value,
+                         se=mainRemote.nuid,
+                         de=mainRemote.fuid,
+                         si=mainRemote.sid,
+                         ti=7)
+            data.update(kwa)
+            packet = packeting.TxPacket(stack=self.other,
+                                        kind=raeting.PcktKind.message.value,
+                                        embody=odict(msg="Drop me"),
+                                        data=data)
+            packet.pack()
+            packed = packet.packed[:-raeting.FootSize.nacl.value] + b'\x01' * raeting.FootSize.nacl.value
+            self.main.rxes.append((packed, self.other.local.ha))
+            self.main.serviceRxes()
+
+        inject(bf=True)
+        self.assertEqual(self.main.stats.get('predrop_broadcast'), 1)
+        inject(si=0)
+        self.assertEqual(self.main.stats.get('predrop_invalid_sid'), 1)
+        inject(se=0)
+        self.assertEqual(self.main.stats.get('predrop_invalid_uid'), 1)
+        inject(de=99)
+        self.assertEqual(self.main.stats.get('predrop_unknown_destination_uid'), 1)
+        inject(tk=raeting.TrnsKind.join.value)
+        self.assertEqual(self.main.stats.get('predrop_join_invalid_sid'), 1)
+
+        otherRemote.addDoneTransaction(7)
+        inject()
+        self.assertEqual(self.main.stats.get('predrop_done_transaction'), 1)
+        self.assertNotIn('parsing_outer_error', self.main.stats)  # never verified
+
+        inject(wf=True)  # sender waiting so must verify and reply stale
+        self.assertEqual(self.main.stats.get('parsing_outer_error'), 1)
+        self.assertEqual(len(self.main.transactions), 0)
+
+    def testServiceAllUntil(self):
+        '''
+        Test event driven servicing blocks until data or the next timer deadline
+        '''
+        console.terse("{0}\n".format(self.testServiceAllUntil.__doc__))
+
+        self.join()
+        self.allow()
+        self.assertEqual(len(self.main.transactions), 0)
+        self.assertEqual(len(self.other.transactions), 0)
+        self.assertIs(self.main.nextDeadline(), None)  # idle
+
+        # idle so blocks for the full timeout and store keeps pace
+        stamp = self.store.stamp
+        start = time.time()
+        self.assertFalse(self.main.serviceAllUntil(timeout=0.05))
+        self.assertGreaterEqual(time.time() - start, 0.04)
+        self.assertGreaterEqual(self.store.stamp - stamp, 0.04)
+
+        # data wakes the receiver well before its timeout
+        body = odict(what="Wake up main")
+        self.other.transmit(body)
+        self.other.serviceAllUntil(timeout=0.0)
+        self.assertEqual(len(self.other.transactions), 1)
+        deadline = self.other.nextDeadline()
+        self.assertIsNotNone(deadline)
+        self.assertGreater(deadline, self.store.stamp)
+        start = time.time()
+        self.assertTrue(self.main.serviceAllUntil(timeout=5.0))
+        self.assertLess(time.time() - start, 1.0)
+        self.assertEqual(len(self.main.rxMsgs), 1)
+        self.assertDictEqual(self.main.rxMsgs.popleft()[0], body)
+        self.assertTrue(self.other.serviceAllUntil(timeout=5.0))  # ack
+        self.assertEqual(len(self.other.transactions), 0)
+
+        # main not serviced so no ack and wakes at redo deadline instead of timeout
+        self.other.transmit(body)
+        self.other.serviceAllUntil(timeout=0.0)
+        deadline = self.other.nextDeadline()
+        redos = self.other.stats.get('redo_segment', 0)
+        start = time.time()
+        self.assertFalse(self.other.serviceAllUntil(timeout=5.0))
+        self.assertLess(time.time() - start, 2.0)
+        self.assertGreaterEqual(self.store.stamp, deadline)
+        self.assertEqual(self.other.stats.get('redo_segment'), redos + 1)
+        self.service()
+        self.assertEqual(len(self.other.transactions), 0)
+        self.assertEqual(len(self.main.rxMsgs), 1)
+
+    def testDeadlineSchedulers(self):
+        '''
+        Test process and manage only touch transactions and remotes that are due
+        '''
+        console.terse("{0}\n".format(self.testDeadlineSchedulers.__doc__))
+
+        self.join()
+        self.allow()
+        self.assertEqual(len(self.main.processes), 0)  # no transactions
+        self.assertEqual(len(self.other.processes), 0)
+        mainRemote = self.other.remotes.values()[0]
+        self.assertIn(mainRemote, self.other.manages)
+
+        # in flight message is scheduled at its redo deadline
+        self.other.transmit(odict(what="Scheduled"))
+        self.other.serviceAllTx()
+        messenger = self.other.transactions[0]
+        self.assertIn(messenger, self.other.processes)
+        self.assertEqual(self.other.nextDeadline(), messenger.redoTimer.stop)
+        redos = self.other.stats.get('redo_segment', 0)
+        self.other.process()  # not yet due
+        self.assertEqual(self.other.stats.get('redo_segment', 0), redos)
+        self.store.advanceStamp(messenger.redoTimer.duration)
+        self.other.process()  # due
+        self.assertEqual(self.other.stats.get('redo_segment', 0), redos + 1)
+        self.assertIn(messenger, self.other.processes)  # rescheduled
+        self.assertEqual(self.other.nextDeadline(), messenger.redoTimer.stop)
+
+        self.service()
+        self.assertEqual(len(self.other.transactions), 0)
+        self.assertNotIn(messenger, self.other.processes)  # removed on done
+        otherRemote = self.main.remotes.values()[0]
+        self.assertIn(otherRemote, self.main.cleanups)  # done transaction expiry
+        self.assertEqual(self.main.nextDeadline(), otherRemote.nextDoneDeadline())
+
+        # keep alive only when remote keep alive timer is due
+        self.other.manage()
+        self.assertEqual(len(self.other.transactions), 0)
+        self.store.advanceStamp(mainRemote.timer.remaining)
+        self.other.manage()
+        self.assertEqual(len(self.other.transactions), 1)  # aliver
+        self.assertGreater(mainRemote.nextManageDeadline(), self.store.stamp)
+        self.service()
+        self.assertEqual(len(self.other.transactions), 0)
+
+        self.main.removeRemote(otherRemote)
+        self.assertNotIn(otherRemote, self.main.manages)
+        self.assertNotIn(otherRemote, self.main.cleanups)
+
+    def testKeepAliveBudget(self):
+        '''
+        Test keep alives are jittered, rate budgeted and skipped when heard from
+        '''
+        console.terse("{0}\n".format(self.testKeepAliveBudget.__doc__))
+
+        self.join()
+        self.allow()
+        self.alive(self.other, self.main)
+        mainRemote = self.other.remotes.values()[0]
+        self.assertIs(mainRemote.alived, True)
+        period = self.other.period
+        jitter = self.other.AliveJitter
+        self.assertGreaterEqual(mainRemote.timer.duration, period * (1.0 - jitter))
+        self.assertLessEqual(mainRemote.timer.duration, period * (1.0 + jitter))
+
+        # valid traffic since refresh skips the keep alive
+        self.store.advanceStamp(0.125)
+        mainRemote.rxStamp = self.store.stamp
+        self.store.advanceStamp(mainRemote.timer.remaining)
+        self.other.clearStats()
+        self.other.manage()
+        self.assertEqual(len(self.other.transactions), 0)
+        self.assertEqual(self.other.stats['alive_skip'], 1)
+        self.assertFalse(mainRemote.timer.expired)
+
+        # not heard since so keep alive is sent
+        self.store.advanceStamp(mainRemote.timer.remaining)
+        self.other.manage()
+        self.assertEqual(len(self.other.transactions), 1)
+        self.assertEqual(self.other.stats['alive_start'], 1)
+        self.assertIn('alive_rate', self.other.stats)
+        self.service()
+
+        # rate budget defers keep alives beyond burst to reserved slots
+        for i in range(4):
+            remote = estating.RemoteEstate(stack=self.main,
+                                           name="remote{0}".format(i),
+                                           ha=('127.0.0.1', 7540 + i),
+                                           joined=True)
+            remote.allowed = True
+            self.main.addRemote(remote)
+        self.main.AliveRate = 10.0
+        self.main.AliveBurst = 2
+        self.main.clearStats()
+        self.main.manage(immediate=True)
+        self.assertEqual(self.main.stats['alive_start'], 2)
+        self.assertEqual(self.main.stats['alive_defer'], 3)
+        slotted = [remote for remote in self.main.remotes.values() if remote.slotted]
+        self.assertEqual(len(slotted), 3)
+        self.assertEqual(sorted(round(remote.timer.duration, 3) for remote in slotted),
+                         [0.1, 0.2, 0.3])
+        self.store.advanceStamp(0.15)
+        self.main.manage()
+        self.assertEqual(self.main.stats['alive_start'], 3)
+        self.store.advanceStamp(0.2)
+        self.main.manage()
+        self.assertEqual(self.main.stats['alive_start'], 5)
+        self.assertEqual(self.main.stats['alive_defer'], 3)  # slots are not rebudgeted
+        for remote in self.main.remotes.values():
+            self.assertFalse(remote.slotted)
+
+    def testAvailability(self):
+        '''
+        Test availability is updated as remote status changes and reported by manage
+        '''
+        console.terse("{0}\n".format(self.testAvailability.__doc__))
+        changes = []
+        self.other.availabilityCallback = lambda name, plus: changes.append((name, plus))
+
+        self.join()
+        mainRemote = self.other.remotes.values()[0]
+        self.assertEqual(len(self.other.alloweds), 0)
+        self.assertEqual(len(self.other.availables), 0)
+        self.allow()  # fast alived when allowed
+        self.assertIs(self.other.alloweds['main'], mainRemote)
+        self.assertIs(self.other.aliveds['main'], mainRemote)
+        self.assertEqual(self.other.availables, set(['main']))
+        self.assertEqual(changes, [('main', True)])
+        self.assertEqual(self.other.changeds['plus'], set())  # not until manage
+
+        self.other.manage()
+        self.assertEqual(self.other.changeds, odict(plus=set(['main']), minus=set()))
+        self.other.manage()
+        self.assertEqual(self.other.changeds, odict(plus=set(), minus=set()))
+
+        # changes that cancel out between manages are not reported
+        mainRemote.alived = False
+        self.assertEqual(self.other.availables, set())
+        self.assertEqual(self.other.changings['minus'], set(['main']))
+        mainRemote.alived = True
+        self.other.manage()
+        self.assertEqual(self.other.changeds, odict(plus=set(), minus=set()))
+        self.assertEqual(changes, [('main', True), ('main', False), ('main', True)])
+
+        # unadded remotes are not tracked
+        remote = estating.RemoteEstate(stack=self.other,
+                                       name='stray',
+                                       ha=('127.0.0.1', 7540))
+        remote.alived = True
+        self.assertNotIn('stray', self.other.aliveds)
+        self.other.addRemote(remote)
+        self.assertIn('stray', self.other.aliveds)
+
+        self.other.renameRemote(remote, 'renamed')
+        self.assertNotIn('stray', self.other.availables)
+        self.assertIs(self.other.aliveds['renamed'], remote)
+        self.other.removeRemote(remote)
+        self.assertNotIn('renamed', self.other.aliveds)
+        self.other.manage()
+        self.assertEqual(self.other.changeds, odict(plus=set(), minus=set()))
+        self.assertEqual(self.other.availables, set(['main']))
+
+        mainRemote.reaped = True
+        self.assertIs(self.other.reapeds['main'], mainRemote)
+        self.other.removeRemote(mainRemote)
+        self.assertEqual(len(self.other.reapeds), 0)
+        self.assertEqual(len(self.other.alloweds), 0)
+        self.other.manage()
+        self.assertEqual(self.other.changeds, odict(plus=set(), minus=set(['main'])))
+
+    def testRemoteIndexes(self):
+        '''
+        Test secondary remote indexes by keys, host address and role
+        '''
+        console.terse("{0}\n".format(self.testRemoteIndexes.__doc__))
+
+        self.join()
+        otherRemote = self.main.remotes.values()[0]
+        verhex = self.other.local.signer.verhex
+        pubhex = self.other.local.priver.pubhex
+        self.assertIs(self.main.fetchRemoteByKeys(verhex, ''), otherRemote)
+        self.assertIs(self.main.fetchRemoteByKeys('', pubhex), otherRemote)
+        self.assertIs(self.main.fetchRemoteByKeys(verhex.decode('ISO-8859-1'), ''),
+                      otherRemote)  # str hex
+        self.assertIs(self.main.fetchRemoteByKeys('', ''), None)
+        self.assertEqual(self.main.fetchRemotesByRole('other'), [otherRemote])
+        self.assertIs(self.main.fetchRemoteByHa(otherRemote.ha), otherRemote)
+
+        # join sets acceptance of remotes sharing role and keys by role index
+        twin = estating.RemoteEstate(stack=self.main,
+                                     name='twin',
+                                     ha=('127.0.0.1', 7543),
+                                     role='other',
+                                     verkey=verhex,
+                                     pubkey=pubhex,
+                                     acceptance=raeting.Acceptance.pending.value)
+        self.main.addRemote(twin)
+        stranger = estating.RemoteEstate(stack=self.main,
+                                         name='stranger',
+                                         ha=('127.0.0.1', 7544),
+                                         role='other',
+                                         verkey=nacling.Signer().verhex,
+                                         pubkey=pubhex,
+                                         acceptance=raeting.Acceptance.pending.value)
+        self.main.addRemote(stranger)
+        self.join()
+        self.assertEqual(twin.acceptance, raeting.Acceptance.accepted.value)
+        self.assertEqual(stranger.acceptance, raeting.Acceptance.pending.value)
+        self.main.removeRemote(twin)
+        self.main.removeRemote(stranger)
+
+        # keyed attribute changes are reindexed
+        otherRemote.role = 'renamed'
+        self.assertEqual(self.main.fetchRemotesByRole('other'), [])
+        self.assertEqual(self.main.fetchRemotesByRole('renamed'), [otherRemote])
+        signer = nacling.Signer()
+        otherRemote.verfer = nacling.Verifier(signer.verhex)
+        self.assertIs(self.main.fetchRemoteByKeys(verhex, ''), None)
+        self.assertIs(self.main.fetchRemoteByKeys(signer.verhex, ''), otherRemote)
+        ha = otherRemote.ha
+        otherRemote.ha = ('127.0.0.1', 7540)
+        self.assertIs(self.main.fetchRemoteByHa(('127.0.0.1', 7540)), otherRemote)
+        self.assertNotIn(ha, self.main.haRemotes)
+
+        # shared role indexes both, move and rename keep index
+        remote = estating.RemoteEstate(stack=self.main,
+                                       name='shared',
+                                       ha=('127.0.0.1', 7541),
+                                       role='renamed')
+        self.assertEqual(self.main.fetchRemotesByRole('renamed'), [otherRemote])
+        self.main.addRemote(remote)
+        self.assertEqual(set(self.main.fetchRemotesByRole('renamed')),
+                         set([otherRemote, remote]))
+        self.assertIs(self.main.fetchRemoteByHa(('127.0.0.1', 7541)), remote)
+        self.main.moveRemote(remote, new=10)
+        self.main.renameRemote(remote, new='moved')
+        self.assertEqual(set(self.main.fetchRemotesByRole('renamed')),
+                         set([otherRemote, remote]))
+        remote.ha = ('127.0.0.1', 7542)
+        self.assertIs(self.main.fetchRemoteByHa(('127.0.0.1', 7542)), remote)
+        self.main.removeRemote(remote)
+        self.assertEqual(self.main.fetchRemotesByRole('renamed'), [otherRemote])
+        self.assertIs(self.main.fetchRemoteByHa(('127.0.0.1', 7542)), None)
+
+        self.main.removeRemote(otherRemote)
+        for index in (self.main.verRemotes, self.main.pubRemotes,
+                      self.main.haRemotes, self.main.roleRemotes):
+            self.assertEqual(len(index), 0)
+
+    def testKeyPool(self):
+        '''
+        Test allow draws short term keys from key pool refilled when idle
+        '''
+        console.terse("{0}\n".format(self.testKeyPool.__doc__))
+        pool = nacling.KeyPool(low=2, high=4)
+        self.main.keyPool = self.other.keyPool = pool
+
+        self.join()
+        pool.keys.clear()
+        self.main.clearStats()
+        self.other.clearStats()
+        self.allow()  # empty pool so keys generated
+        self.assertTrue(self.other.remotes.values()[0].allowed)
+        self.assertEqual(self.other.stats['keypool_miss'], 1)
+        self.assertEqual(self.main.stats['keypool_miss'], 1)
+
+        pool.refill()  # if not already refilled when idle
+        self.assertEqual(len(pool), 4)
+        self.allow()
+        self.assertTrue(self.other.remotes.values()[0].allowed)
+        self.assertTrue(self.main.remotes.values()[0].allowed)
+        self.assertEqual(self.other.stats['keypool_hit'], 1)
+        self.assertEqual(self.main.stats['keypool_hit'], 1)
+        self.assertEqual(len(pool), 2)
+
+        # no refill until idle then refilled to high
+        self.main.clearStats()
+        self.other.clearStats()
+        self.other.allow()
+        self.assertEqual(self.other.idle(), 0)
+        self.service()
+        for i in range(10):
+            if not self.main.processes:
+                break
+            self.store.advanceStamp(1.0)
+            self.main.serviceAll()
+        self.assertEqual(self.main.idle(), 0)  # refilled by serviceAll
+        self.assertEqual(len(pool), 4)
+        self.assertEqual(self.main.stats.get('keypool_refill', 0) +
+                         self.other.stats.get('keypool_refill', 0), 4)
+
+    def testCryptoPool(self):
+        '''
+        Test rx batch verified and decrypted by crypto pool delivers in order
+        '''
+        console.terse("{0}\n".format(self.testCryptoPool.__doc__))
+        self.main.cryptoPool = stacking.futures.ThreadPoolExecutor(max_workers=2)
+        try:
+            self.join()
+            self.allow()
+            self.assertTrue(self.main.remotes.values()[0].allowed)
+            self.assertTrue(self.main.stats['crypto_batch'] > 0)
+
+            others = [odict(house="Mama mia{0}".format(i), queue="fix me")
+                      for i in range(8)]
+            others.append(odict(house="Mama mia big", queue="x" * 4096))  # segmented
+            for msg in others:
+                self.other.transmit(msg)
+            self.other.serviceAllTx()
+            self.main.serviceReceives()
+            self.assertTrue(len(self.main.rxes) > len(others))
+            raw, sa = self.main.rxes[0]  # tamper signed part so verify fails
+            raw = bytearray(raw)
+            raw[-80] ^= 0xff
+            self.main.rxes[0] = (bytes(raw), sa)
+            self.main.serviceRxes()
+            self.assertEqual(self.main.stats['parsing_outer_error'], 1)
+            self.service(duration=3.0)  # resend of tampered
+
+            self.assertEqual(len(self.main.transactions), 0)
+            self.assertEqual(len(self.main.rxMsgs), len(others))
+            others.append(others.pop(0))  # tampered delivered when resent
+            for i, duple in enumerate(self.main.rxMsgs):
+                self.assertDictEqual(others[i], duple[0])
+        finally:
+            self.main.cryptoPool.shutdown()
+
+    def testCryptoJobErrors(self):
+        '''
+        Test crypto pool job failures drop only their packet
+        '''
+        console.terse("{0}\n".format(self.testCryptoJobErrors.__doc__))
+        self.main.cryptoPool = stacking.futures.ThreadPoolExecutor(max_workers=2)
+        try:
+            self.join()
+            self.allow()
+            self.assertTrue(self.main.remotes.values()[0].allowed)
+
+            others = [odict(house="Mama mia{0}".format(i), queue="fix me")
+                      for i in range(4)]
+            for msg in others:
+                self.other.transmit(msg)
+            self.other.serviceAllTx()
+            self.main.serviceReceives()
+            self.assertEqual(len(self.main.rxes), len(others))
+
+            # remote gone by the time worker looks it up is a packet error
+            packet = self.main.receiveRx(*self.main.rxes[0])
+            packet.data['de'] = 999
+            self.assertRaises(raeting.PacketError, packet.parseCrypto)
+            self.assertRaises(raeting.PacketError, packet.decrypt, b'', b'')
+
+            parseCrypto = packeting.RxPacket.parseCrypto
+            faileds = []
+            def failCrypto(packet, boxer=None):
+                if not faileds:
+                    faileds.append(packet)
+                    raise RuntimeError("worker failed")
+                return parseCrypto(packet, boxer)
+            packeting.RxPacket.parseCrypto = failCrypto
+            try:
+                self.main.serviceRxes()
+            finally:
+                packeting.RxPacket.parseCrypto = parseCrypto
+            self.assertEqual(len(faileds), 1)
+            self.assertEqual(self.main.stats['crypto_job_error'], 1)
+            self.assertEqual(len(self.main.rxMsgs), len(others) - 1)
+
+            self.service(duration=3.0)  # resend of dropped
+            self.assertEqual(len(self.main.transactions), 0)
+            self.assertEqual(len(self.main.rxMsgs), len(others))
+        finally:
+            self.main.cryptoPool.shutdown()
+
+    def testCryptoWorkers(self):
+        '''
+        Test stack created with crypto workers uses and closes its crypto pool
+        '''
+        console.terse("{0}\n".format(self.testCryptoWorkers.__doc__))
+        self.assertIs(self.main.cryptoPool, None)
+        self.main.close()
+        mainDirpath = os.path.join(self.baseDirpath, 'road', 'keep', 'pooled')
+        self.main = stacking.RoadStack(store=self.store,
+                                       name="main",
+                                       main=True,
+                                       auto=raeting.AutoMode.once.value,
+                                       dirpath=mainDirpath,
+                                       cryptoWorkers=2)
+        self.assertEqual(self.main.cryptoWorkers, 2)
+        pool = self.main.cryptoPool
+        self.assertIsInstance(pool, stacking.futures.ThreadPoolExecutor)
+
+        self.join()
+        self.allow()
+        self.assertTrue(self.main.remotes.values()[0].allowed)
+        others = [odict(house="Mama mia{0}".format(i), queue="fix me")
+                  for i in range(4)]
+        for msg in others:
+            self.other.transmit(msg)
+        self.service()
+        self.assertTrue(self.main.stats['crypto_batch'] > 0)
+        self.assertEqual(len(self.main.rxMsgs), len(others))
+        for i, duple in enumerate(self.main.rxMsgs):
+            self.assertDictEqual(others[i], duple[0])
+
+        self.main.close()
+        self.assertIs(self.main.cryptoPool, None)
+        self.assertRaises(RuntimeError, pool.submit, len, '')  # shutdown
+
+    def testCryptoBatchJoin(self):
+        '''
+        Test packets after a join in one crypto pool rx batch are admitted
+        against remotes as changed by the join as when inline
+        '''
+        console.terse("{0}\n".format(self.testCryptoBatchJoin.__doc__))
+        rxes = []
+        self.other.addRemote(estating.RemoteEstate(stack=self.other,
+                                                   fuid=0,
+                                                   sid=0,
+                                                   ha=self.main.local.ha))
+        self.other.join(cascade=True)  # allow follows join
+        for i in range(40):
+            self.other.serviceAll()
+            time.sleep(0.01)
+            self.main.serviceReceives()
+            rxes.extend(self.main.rxes)
+            self.main.serviceAll()
+            time.sleep(0.01)
+            if self.main.stats.get('allow_correspond_complete'):
+                break
+        self.assertTrue(self.main.remotes.values()[0].joined)
+        self.assertEqual(self.main.stats['allow_correspond_complete'], 1)
+
+        # replay all received at once into fresh stacks inline then pooled
+        # so allow packets follow join packets in the same batch
+        stats = []
+        for workers in (0, 2):
+            self.main.close()
+            mainDirpath = os.path.join(self.baseDirpath, 'road', 'keep',
+                                       'replay{0}'.format(workers))
+            self.main = stacking.RoadStack(store=self.store,
+                                           name="main",
+                                           main=True,
+                                           auto=raeting.AutoMode.once.value,
+                                           sigkey=self.main.local.signer.keyhex,
+                                           prikey=self.main.local.priver.keyhex,
+                                           dirpath=mainDirpath,
+                                           cryptoWorkers=workers)
+            self.main.rxes.extend(rxes)
+            self.main.serviceRxes()
+            self.assertEqual(len(self.main.remotes), 1)
+            self.assertNotIn('predrop_unknown_destination_uid', self.main.stats)
+            stats.append(dict((key, value) for key, value in self.main.stats.items()
+                              if key not in ('crypto_batch', 'keypool_hit', 'keypool_miss')))
+        self.assertTrue(self.main.stats['crypto_batch'] > 1)  # split at join
+        self.assertEqual(stats[0], stats[1])
+
+    def testPooledSigning(self):
+        '''
+        Test large message bursts signed in shards on crypto pool
+        '''
+        console.terse("{0}\n".format(self.testPooledSigning.__doc__))
+        self.main.cryptoPool = stacking.futures.ThreadPoolExecutor(max_workers=2)
+        self.main.BurstAdaptive = False  # whole message in one burst
+        try:
+            self.join()
+            self.allow()
+            self.assertTrue(self.other.remotes.values()[0].allowed)
+
+            mains = [odict(house="Papa pia big", queue="x" * 100000),
+                     odict(house="Papa pia small", queue="y" * 4000),
+                     odict(house="Papa pia bigger", queue="z" * 200000)]
+            for msg in mains:
+                self.main.transmit(msg)
+            self.main.serviceAll()
+            self.assertEqual(len(self.main.signings), 2)  # until sent
+            self.service(duration=3.0)
+
+            self.assertEqual(len(self.main.transactions), 0)
+            self.assertEqual(len(self.main.signings), 0)
+            pooled = self.main.stats['message_burst_pooled']
+            self.assertTrue(pooled >= 2)  # resends of big bursts may be pooled
+            self.assertEqual(len(self.other.rxMsgs), len(mains))
+            # small message signed inline is not held behind pooled ones
+            self.assertEqual(self.other.rxMsgs[0][0]['house'], "Papa pia small")
+            rxeds = dict((msg['house'], msg) for msg, name in self.other.rxMsgs)
+            for msg in mains:
+                self.assertDictEqual(msg, rxeds[msg['house']])
+
+            # burst signing done while main serviced by serviceAllUntil
+            self.other.rxMsgs.clear()
+            self.main.transmit(mains[0])
+            self.main.serviceAllUntil(timeout=0.5)
+            for i in range(40):
+                self.main.serviceAllUntil(timeout=0.5)
+                self.other.serviceAll()
+                if not self.main.transactions:
+                    break
+            self.assertEqual(len(self.main.transactions), 0)
+            self.assertTrue(self.main.stats['message_burst_pooled'] > pooled)
+            self.assertEqual(len(self.other.rxMsgs), 1)
+            self.assertDictEqual(mains[0], self.other.rxMsgs[0][0])
+        finally:
+            self.main.cryptoPool.shutdown()
+
+    def testPooledResend(self):
+        '''
+        Test resend requested while burst is signed on crypto pool is sent
+        once the signed burst is sent
+        '''
+        console.terse("{0}\n".format(self.testPooledResend.__doc__))
+        self.main.cryptoPool = stacking.futures.ThreadPoolExecutor(max_workers=2)
+        self.main.BurstAdaptive = False  # whole message in one burst
+        try:
+            self.join()
+            self.allow()
+            self.assertTrue(self.other.remotes.values()[0].allowed)
+
+            msg = odict(house="Papa pia big", queue="x" * 100000)
+            self.main.transmit(msg)
+            self.main.serviceAll()
+            self.assertEqual(len(self.main.signings), 1)
+            messenger = list(self.main.signings)[0]
+            self.assertIsInstance(messenger, transacting.Messenger)
+
+            # resend request arrives during signing
+            messenger.misseds.add(0)
+            messenger.sendMisseds()
+            self.assertTrue(messenger.deferred)
+            self.assertEqual(list(messenger.misseds), [0])
+
+            for i in range(300):
+                if not self.main.signings:
+                    break
+                time.sleep(0.01)
+                self.main.serviceAll()
+            self.assertEqual(len(self.main.signings), 0)
+            self.assertFalse(messenger.deferred)
+            self.assertEqual(len(messenger.misseds), 0)  # resent after burst
+
+            self.service(duration=3.0)
+            self.assertEqual(len(self.main.transactions), 0)
+            self.assertEqual(len(self.other.rxMsgs), 1)
+            self.assertDictEqual(msg, self.other.rxMsgs[0][0])
+        finally:
+            self.main.cryptoPool.shutdown()
+
 def runOne(test):
     '''
     Unittest Runner
@@ -878,11 +1560,25 @@ def runSome():
              'testMsgVeritive',
              'testSegmentedJson',
              'testSegmentedMsgpack',
+             'testSegmentedBinaryHead',
              'testSegmentedJsonBurst',
              'testSegmentedMsgpackBurst',
              'testBasicAlive',
              'testStaleNack',
              'testJoinForever',
+             'testPreVerifyDrop',
+             'testServiceAllUntil',
+             'testDeadlineSchedulers',
+             'testKeepAliveBudget',
+             'testAvailability',
+             'testRemoteIndexes',
+             'testKeyPool',
+             'testCryptoPool',
+             'testCryptoJobErrors',
+             'testCryptoWorkers',
+             'testCryptoBatchJoin',
+             'testPooledSigning',
+             'testPooledResend',
             ]
     tests.extend(map(BasicTestCase, names))
 
@@ -37,6 +37,8 @@ class Transaction(object):
     RAET protocol transaction class
     '''
     Timeout =  5.0 # default timeout
+    RedoTimeoutMin = 0.25 # initial timeout
+    RedoTimeoutMax = 1.0 # max timeout
 
     def __init__(self, stack=None, remote=None, kind=None, timeout=None,
                  rmt=False, bcst=False, sid=None, tid=None,
@@ -63,6 +65,10 @@ class Transaction(object):
         self.txData = txData or odict() # data used to prepare last txPacket
         self.txPacket = txPacket  # last tx packet needed for retries
         self.rxPacket = rxPacket  # last rx packet needed for index
+        self.txStamp = None  # stamp of last unambiguous transmit for rtt
+
+        self._redoTimeoutMin = self.RedoTimeoutMin
+        self._redoTimeoutMax = self.RedoTimeoutMax
 
     @property
     def index(self):
@@ -75,6 +81,60 @@ class Transaction(object):
         re = self.remote.fuid
         return ((self.rmt, le, re, self.sid, self.tid, self.bcst,))
 
+    @property
+    def redoTimeoutMin(self):
+        '''
+        Property is initial redo timeout. Once round trip times to .remote
+        have been measured this is the remote's retransmission timeout
+        otherwise the configured value
+        '''
+        rto = self.remote.rto if self.remote is not None else None
+        if rto is None:
+            return self._redoTimeoutMin
+        return rto
+
+    @redoTimeoutMin.setter
+    def redoTimeoutMin(self, value):
+        '''
+        setter for configured initial redo timeout
+        '''
+        self._redoTimeoutMin = value
+
+    @property
+    def redoTimeoutMax(self):
+        '''
+        Property is max redo timeout. Once round trip times to .remote
+        have been measured this is the remote's retransmission timeout scaled
+        by the configured ratio of max to initial redo timeout
+        otherwise the configured value
+        '''
+        rto = self.remote.rto if self.remote is not None else None
+        if rto is None:
+            return self._redoTimeoutMax
+        return rto * self._redoTimeoutMax / self._redoTimeoutMin
+
+    @redoTimeoutMax.setter
+    def redoTimeoutMax(self, value):
+        '''
+        setter for configured max redo timeout
+        '''
+        self._redoTimeoutMax = value
+
+    def nextDeadline(self, after=None):
+        '''
+        Returns earliest store stamp at which .process has timer based work
+        to do, the sooner of the timeout and the redo timer stops, that is
+        later than after or None if none
+        '''
+        stops = []
+        if self.timeout > 0.0:
+            stops.append(self.timer.stop)
+        redoTimer = getattr(self, 'redoTimer', None)  # not all kinds redo
+        if redoTimer is not None:
+            stops.append(redoTimer.stop)
+        stops = [stop for stop in stops if after is None or stop > after]
+        return min(stops) if stops else None
+
     def process(self):
         '''
         Process time based handling of transaction like timeout or retries
@@ -87,6 +147,14 @@ class Transaction(object):
         '''
         self.rxPacket = packet
 
+    def duplicate(self, packet):
+        '''
+        Returns True if packet, whose head only has been parsed, is a redundant
+        duplicate that may be dropped before signature verification
+        Subclasses override
+        '''
+        return False
+
     def transmit(self, packet):
         '''
         Queue tx duple on stack transmit queue
@@ -98,8 +166,22 @@ class Transaction(object):
             self.stack.incStat(self.statKey())
             self.remove(remote=self.remote, index=packet.index)
             return
+        # redo or again packets are ambiguous for rtt (Karn's algorithm)
+        if packet is self.txPacket or packet.data['af']:
+            self.txStamp = None
+        else:
+            self.txStamp = self.stack.store.stamp
         self.txPacket = packet
 
+    def sampleRtt(self):
+        '''
+        Update .remote round trip time estimate with time since last
+        unambiguous transmit. Call when response to it is received
+        '''
+        if self.txStamp is not None and self.remote is not None:
+            self.remote.updateRtt(self.stack.store.stamp - self.txStamp)
+            self.txStamp = None
+
     def add(self, remote=None, index=None):
         '''
         Add self to remote transactions
@@ -584,7 +666,7 @@ class Joiner(Initiator):
         self.remove(index=self.txPacket.index)
         if self.remote:
             self.remote.fuid = 0 # forces vacuous join
-            self.stack.dumpRemote(self.remote) # since change fuid
+            self.stack.stageRemote(self.remote) # since change fuid
         self.stack.join(uid=self.remote.uid, timeout=self.timeout, renewal=True)
 
     def pend(self):
@@ -763,6 +845,8 @@ class Joiner(Initiator):
                 self.remote.pubber = nacling.Publican(pubhex) # long term crypt key manager
             # don't dump until complete
 
+        self.stack.acceptRemotesByRole(role, verhex, pubhex, status)
+
         if status == Acceptance.accepted: # accepted
             self.completify()
             return
@@ -774,7 +858,7 @@ class Joiner(Initiator):
         '''
         Perform pending on remote
         '''
-        self.stack.dumpRemote(self.remote)
+        self.stack.stageRemote(self.remote)
         self.ackPend()
 
     def ackPend(self):
@@ -809,8 +893,8 @@ class Joiner(Initiator):
         if self.vacuous:
             self.remote.rsid = 0 # reset .rsid on vacuous join so allow will work
         self.remote.joined = True #accepted
-        self.stack.dumpRemote(self.remote)
-        self.stack.dumpLocal() #persist puid
+        self.stack.stageRemote(self.remote)
+        self.stack.stageLocal() #persist puid
         self.ackAccept()
 
     def ackAccept(self):
@@ -1309,6 +1393,8 @@ class Joinent(Correspondent):
             if ns2b(pubhex) != self.remote.pubber.keyhex:
                 self.remote.pubber = nacling.Publican(pubhex) # long term crypt key manager
 
+        self.stack.acceptRemotesByRole(role, verhex, pubhex, status)
+
         # add transaction
         self.add(remote=self.remote, index=self.rxPacket.index)
         self.remote.joined = None
@@ -1329,7 +1415,7 @@ class Joinent(Correspondent):
         '''
         Performing pending operation on remote
         '''
-        self.stack.dumpRemote(self.remote)
+        self.stack.stageRemote(self.remote)
         self.ackPend()
 
     def ackPend(self):
@@ -1421,8 +1507,8 @@ class Joinent(Correspondent):
         if self.vacuous:
             self.remote.rsid = 0 # reset .rsid on vacuous join so allow will work
         self.remote.joined = True # accepted
-        self.stack.dumpRemote(self.remote)
-        self.stack.dumpLocal() # persist puid
+        self.stack.stageRemote(self.remote)
+        self.stack.stageLocal() # persist puid
         self.remove(index=self.rxPacket.index)
 
     def reject(self):
@@ -1737,7 +1823,7 @@ class Allower(Initiator):
                                                   vnonce,
                                                   fqdn)
 
-        cipher, nonce = self.remote.privee.encrypt(stuff, self.remote.publee.key)
+        cipher, nonce = self.remote.boxer.encrypt(stuff)
 
         oreo = binascii.unhexlify(self.oreo)
         body = raeting.INITIATE_PACKER.pack(self.remote.privee.pubraw,
@@ -1802,7 +1888,7 @@ class Allower(Initiator):
 
         self.remote.nextSid() # start new session always on successful allow
         self.remote.replaceStaleInitiators()
-        self.stack.dumpRemote(self.remote)
+        self.stack.stageRemote(self.remote)
         self.remote.sendSavedMessages() # could include messages saved on rejoin
         if self.cascade:
             self.stack.alive(uid=self.remote.uid, cascade=self.cascade, timeout=self.timeout)
@@ -2153,7 +2239,7 @@ class Allowent(Correspondent):
             self.nack(kind=PcktKind.reject.value)
             return
 
-        msg = self.remote.privee.decrypt(cipher, nonce, self.remote.publee.key)
+        msg = self.remote.boxer.decrypt(cipher, nonce)
         if len(msg) != raeting.INITIATESTUFF_PACKER.size:
             emsg = "Invalid length of initiate stuff\n"
             console.terse(emsg)
@@ -2228,7 +2314,7 @@ class Allowent(Correspondent):
         self.remote.alived = True  # Fast alived as soon as allowed
         self.remote.nextSid() # start new session always on successful allow
         self.remote.replaceStaleInitiators()
-        self.stack.dumpRemote(self.remote)
+        self.stack.stageRemote(self.remote)
 
     def final(self):
         '''
@@ -2361,6 +2447,7 @@ class Aliver(Initiator):
 
         if packet.data['tk'] == TrnsKind.alive:
             if packet.data['pk'] == PcktKind.ack:
+                self.sampleRtt()
                 self.complete()
             elif packet.data['pk'] == PcktKind.nack: # refused
                 self.refuse()
@@ -2681,9 +2768,13 @@ class Messenger(Initiator):
     RedoTimeoutMin = 0.2 # initial timeout
     RedoTimeoutMax = 0.5 # max timeout
 
-    def __init__(self, redoTimeoutMin=None, redoTimeoutMax=None, burst=0, **kwa):
+    def __init__(self, redoTimeoutMin=None, redoTimeoutMax=None, burst=0,
+                 adaptive=False, **kwa):
         '''
         Setup instance
+        burst is max segments per burst, 0 means no limit
+        adaptive True means adapt segments per burst .window to acks and
+            missed segments starting from remote's learned burst size
         '''
         kwa['kind'] = TrnsKind.message.value
         super(Messenger, self).__init__(**kwa)
@@ -2694,13 +2785,30 @@ class Messenger(Initiator):
                                            duration=self.redoTimeoutMin)
 
         self.burst = max(0, int(burst)) # BurstSize
-        self.misseds = oset()  # ordered set of currently missed segments
+        self.adaptive = True if adaptive else False
+        self.window = self.remote.burst if self.adaptive else 0  # 0 = no limit
+        self.congested = False  # window already decreased for current burst
+        self.misseds = oset()  # ordered set of currently missed segment numbers
         self.acked = False  # Have received at least one ack
 
         self.sid = self.remote.sid
         self.tid = self.remote.nextTid()
         self.prep() # prepare .txData
         self.tray = packeting.TxTray(stack=self.stack)
+        self.signing = None  # send method of burst being signed on crypto pool
+        self.deferred = False  # misseds to send once signing burst is sent
+
+    @property
+    def limit(self):
+        '''
+        Property is max number of segments to send in next burst
+        the lesser of .burst and .window where 0 means no limit
+        '''
+        if not self.window:
+            return self.burst
+        if not self.burst:
+            return self.window
+        return min(self.burst, self.window)
 
     def transmit(self, packet):
         '''
@@ -2709,6 +2817,19 @@ class Messenger(Initiator):
         super(Messenger, self).transmit(packet)
         self.redoTimer.restart()
 
+    def congest(self, missed):
+        '''
+        Decrease adaptive burst window once per burst on congestion
+        when number of missed segments exceeds the remote's loss tolerance
+        so sparse random loss does not collapse the window
+        '''
+        if self.adaptive and not self.congested:
+            if missed <= self.window * self.remote.BurstLossTolerance:
+                return
+            self.window = self.remote.decreaseBurst()
+            self.congested = True
+            self.stack.incStat('message_burst_decrease')
+
     def receive(self, packet):
         """
         Process received packet belonging to this transaction
@@ -2716,6 +2837,8 @@ class Messenger(Initiator):
         super(Messenger, self).receive(packet)
 
         if packet.data['tk'] == TrnsKind.message:
+            if packet.data['pk'] in (PcktKind.ack, PcktKind.resend, PcktKind.done):
+                self.sampleRtt()
             if packet.data['pk'] == PcktKind.ack: # more
                 self.acked = True
                 self.another()  # continue message
@@ -2748,8 +2871,10 @@ class Messenger(Initiator):
             if self.txPacket:
                 if self.txPacket.data['pk'] in [PcktKind.message]:
                     if self.acked and not self.txPacket.data['af']:  # turn on AgnFlag if not set
-                        self.txPacket.data.update(af=True)
-                        self.txPacket.repack()
+                        # signed variant with again flag
+                        self.txPacket = self.tray.segment(self.txPacket.data['sn'],
+                                                          af=True,
+                                                          wf=self.txPacket.data['wf'])
                     self.transmit(self.txPacket) # redo
                     console.concise("Messenger {0}. Redo Segment {1} with "
                                     "{2} in {3} at {4}\n".format(
@@ -2789,7 +2914,10 @@ class Messenger(Initiator):
             self.remove()
             return
 
-        if not self.tray.packets:
+        if self.signing is not None:  # burst still being signed on pool
+            return
+
+        if not self.tray.count:
             try:
                 self.tray.pack(data=self.txData, body=body)
             except raeting.PacketError as ex:
@@ -2798,9 +2926,9 @@ class Messenger(Initiator):
                 self.remove()
                 return
 
-        if self.tray.current >= len(self.tray.packets):
+        if self.tray.current >= self.tray.count:
             emsg = "Messenger {0}. Current packet {1} greater than num packets {2}\n".format(
-                                self.stack.name, self.tray.current, len(self.tray.packets))
+                                self.stack.name, self.tray.current, self.tray.count)
             console.terse(emsg)
             self.remove()
             return
@@ -2819,19 +2947,72 @@ class Messenger(Initiator):
             self.remove()
             return
 
-        burst = (min(self.burst, (len(self.tray.packets) - self.tray.current))
-                    if self.burst else (len(self.tray.packets) - self.tray.current))
+        limit = self.limit
+        burst = (min(limit, (self.tray.count - self.tray.current))
+                    if limit else (self.tray.count - self.tray.current))
 
-        packets = self.tray.packets[self.tray.current:self.tray.current + burst]
+        last = self.tray.current + burst - 1
+        # segments are generated and signed lazily one burst at a time
+        # set wait flag on last packet in burst before signing
+        specs = [(sn, False, sn == last) for sn in range(self.tray.current, last + 1)]
+        packets = self.sign(specs, self.sendBurst)
         if packets:
-            last = packets[-1]
-            last.data.update(wf=True)  # set wait flag on last packet in burst
-            last.repack()
+            self.sendBurst(packets)
 
+    def sign(self, specs, send):
+        '''
+        Return list of signed segment packets for specs, a list of triples
+        (sn, af, wf), signed inline.
+        When the stack has a crypto pool and specs are more than one shard
+        starts signing them on the pool and returns None. The stack delivers
+        completion to .signed which sends them with send so other remotes are
+        serviced meanwhile
+        Returns None after removing on packing error
+        '''
+        pool = self.stack.cryptoPool
+        try:
+            if pool is None or len(specs) <= self.tray.Shard:
+                return [self.tray.segment(sn, af=af, wf=wf) for sn, af, wf in specs]
+            future = self.tray.sign(specs, pool)
+        except raeting.PacketError as ex:
+            console.terse(str(ex) + '\n')
+            self.stack.incStat("packing_error")
+            self.remove()
+            return None
+
+        self.signing = send
+        self.stack.signings.add(self)
+        self.stack.incStat("message_burst_pooled")
+        future.add_done_callback(lambda future: self.stack.signeds.append(self))
+        return None
+
+    def signed(self):
+        '''
+        Send burst whose signing on the crypto pool is done
+        Called by stack
+        '''
+        send = self.signing
+        self.signing = None
+        try:
+            packets = self.tray.collect()
+        except raeting.PacketError as ex:
+            console.terse(str(ex) + '\n')
+            self.stack.incStat("packing_error")
+            self.remove()
+            return
+        send(packets)
+        if self.deferred:  # resend requested while signing
+            self.sendMisseds()
+
+    def sendBurst(self, packets):
+        '''
+        Send burst of signed message segment packets
+        '''
+        self.congested = False  # new burst
         for packet in packets:
             self.transmit(packet)
-            self.tray.last = self.tray.current
-            self.tray.current += 1
+            self.tray.last = packet.data['sn']
+            self.tray.current = self.tray.last + 1
             self.stack.incStat("message_segment_tx")
             console.concise("Messenger {0}. Do Message Segment {1} with {2} in {3} at {4}\n".format(
                     self.stack.name, self.tray.last, self.remote.name, self.tid, self.stack.store.stamp))
@@ -2845,16 +3026,20 @@ class Messenger(Initiator):
         self.remote.refresh(alived=True)
         self.stack.incStat("message_ack_rx")
 
+        self.tray.release(self.rxPacket.data['sn'] + 1)  # acked so drop
+
         if self.misseds:
             self.sendMisseds()
         else:
+            if self.adaptive and not self.congested:  # clean ack of burst
+                self.window = self.remote.increaseBurst()
             current = self.rxPacket.data['sn'] + 1
             if self.tray.current > current:
                 console.concise("Messenger {0}. Current {1} is ahead of requested {2}. Adjust.\n".format(
                     self.stack.name, self.tray.current, current))
                 self.tray.current = current
                 self.tray.last = current - 1
-            if self.tray.current < len(self.tray.packets):
+            if self.tray.current < self.tray.count:
                 self.message()  # continue message
 
     def resend(self):
@@ -2872,8 +3057,16 @@ class Messenger(Initiator):
         body = self.rxPacket.body.data
 
         misseds = body.get('misseds')  # indexes of missed segments
+        sack = body.get('sack')  # selective ack supersedes misseds list
+        if sack:
+            try:
+                misseds = packeting.unsackify(sack, end=self.tray.count)
+            except raeting.PacketError as ex:
+                console.terse(str(ex) + '\n')
+                self.stack.incStat('invalid_resend')
+                return
         if misseds:
-            if not self.tray.packets:
+            if not self.tray.count:
                 emsg = "Invalid resend request '{0}'\n".format(misseds)
                 console.terse(emsg)
                 self.stack.incStat('invalid_resend')
@@ -2881,56 +3074,53 @@ class Messenger(Initiator):
 
             for m in misseds:
                 try:
-                    packet = self.tray.packets[m]
-                except IndexError as ex:
-                    #console.terse(str(ex) + '\n')
+                    valid = 0 <= m < self.tray.count
+                except TypeError as ex:
+                    valid = False
+                if not valid:
                     console.terse("Invalid misseds segment number {0}\n".format(m))
                     self.stack.incStat("invalid_misseds")
                     return
-                self.misseds.add(packet)  # add segment, set only adds if unique
+                self.misseds.add(m)  # add segment, set only adds if unique
+            self.congest(len(misseds))
             self.sendMisseds()
 
     def sendMisseds(self):
         '''
         Send a burst of missed packets
-        '''
-        if self.misseds:
-            burst = (min(self.burst, (len(self.misseds))) if
-                     self.burst else len(self.misseds))
-            # make list of first burst number of packets
+        Again flag is set on all and wait flag on only the last so each
+        segment is signed at most once per flag combination
+        Deferred until .signed while a burst is being signed on crypto pool
+        '''
+        if self.misseds and self.signing is not None:
+            self.deferred = True
+        elif self.misseds:
+            self.deferred = False
+            limit = self.limit
+            burst = (min(limit, (len(self.misseds))) if
+                     limit else len(self.misseds))
+            # make list of first burst number of segments
             misseds = [missed for missed in self.misseds][:burst]
-            for packet in misseds[:-1]:
-                repack = False
-                if not packet.data['af']:  # turn on again flag if not set
-                    packet.data.update(af=True)
-                    repack = True
-                if packet.data['wf']:  # turn off wait flag if set
-                    packet.data.update(wf=False)
-                    repack = True
-                if repack:
-                    packet.repack()
-            for packet in misseds[-1:]:  # last packet
-                repack = False
-                if not packet.data['af']:  # turn on again flag is not set
-                    packet.data.update(af=True)
-                    repack = True
-                if not packet.data['wf']:  # turn on wait flag if not set
-                    packet.data.update(wf=True)
-                    repack = True
-                if repack:
-                    packet.repack()
-
-            for packet in misseds:
-                self.transmit(packet)
-                self.stack.incStat("message_segment_tx")
-                console.concise("Messenger {0}. Do Resend Message Segment "
-                                "{1} with {2} in {3} at {4}\n".format(
-                    self.stack.name,
-                    packet.data['sn'],
-                    self.remote.name,
-                    self.tid,
-                    self.stack.store.stamp))
-                self.misseds.discard(packet)  # remove from self.misseds
+            specs = [(sn, True, sn == misseds[-1]) for sn in misseds]
+            packets = self.sign(specs, self.sendResends)
+            if packets:
+                self.sendResends(packets)
+
+    def sendResends(self, packets):
+        '''
+        Send burst of signed missed message segment packets
+        '''
+        for packet in packets:
+            self.transmit(packet)
+            self.stack.incStat("message_segment_tx")
+            console.concise("Messenger {0}. Do Resend Message Segment "
+                            "{1} with {2} in {3} at {4}\n".format(
+                self.stack.name,
+                packet.data['sn'],
+                self.remote.name,
+                self.tid,
+                self.stack.store.stamp))
+            self.misseds.discard(packet.data['sn'])  # remove from self.misseds
 
     def complete(self):
         '''
@@ -2988,6 +3178,19 @@ class Messenger(Initiator):
                 self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
         self.stack.incStat(self.statKey())
 
+    def remove(self, remote=None, index=None):
+        '''
+        Augment remove to report segment signatures computed and saved
+        by signing each flag combination of a segment once
+        '''
+        if self.tray.signed:
+            self.stack.incStat("message_segment_signed", self.tray.signed)
+            self.tray.signed = 0
+        if self.tray.saved:
+            self.stack.incStat("message_segment_sign_saved", self.tray.saved)
+            self.tray.saved = 0
+        super(Messenger, self).remove(remote, index)
+
 class Messengent(Correspondent):
     '''
     RAET protocol Messengent Correspondent class Dual of Messenger
@@ -3034,6 +3237,16 @@ class Messengent(Correspondent):
             elif packet.data['pk'] == PcktKind.nack: # rejected
                 self.reject()
 
+    def duplicate(self, packet):
+        '''
+        Returns True if packet is a message segment already received that
+        the sender is not waiting on for an ack
+        '''
+        return (packet.data['tk'] == TrnsKind.message and
+                packet.data['pk'] == PcktKind.message and
+                not packet.data['wf'] and
+                self.tray.received(packet.data['sn']))
+
     def process(self):
         '''
         Perform time based processing of transaction
@@ -3163,13 +3376,8 @@ class Messengent(Correspondent):
         Send resend request(s) for missing packets
         '''
         while misseds:
-            if len(misseds) > raeting.MAX_MISSEDS_RESEND:  # was 64
-                remainders = misseds[raeting.MAX_MISSEDS_RESEND:] # only do at most 64 at a time
-                misseds = misseds[:raeting.MAX_MISSEDS_RESEND]
-            else:
-                remainders = []
-
-            body = odict(misseds=misseds)
+            # selective ack of as many as fit plus leading list for compatibility
+            body, remainders = packeting.packMisseds(misseds)
             packet = packeting.TxPacket(stack=self.stack,
                                         kind=PcktKind.resend.value,
                                         embody=body,
@@ -3185,7 +3393,7 @@ class Messengent(Correspondent):
             self.stack.incStat("message_resend_tx")
             console.concise("Messengent {0}. Do Resend Segments {1} with {2} in {3} at {4}\n".format(
                     self.stack.name,
-                    misseds,
+                    misseds[:len(misseds) - len(remainders)],
                     self.remote.name,
                     self.tid,
                     self.stack.store.stamp))
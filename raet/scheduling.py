@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+'''
+scheduling.py raet protocol deadline scheduling classes
+'''
+# pylint: skip-file
+# pylint: disable=W0611
+
+# Import python libs
+import heapq
+
+# Import raet libs
+from .abiding import *  # import globals
+
+from ioflo.base.consoling import getConsole
+console = getConsole()
+
+
+class Scheduler(object):
+    '''
+    Heap of deadlines in store stamp time for keys, such as transactions or
+    remotes, that have timer based processing so that each service only
+    touches the keys that are due instead of walking all of them.
+
+    Each key has at most one live entry at its earliest scheduled deadline.
+    Scheduling a key later than its live entry does nothing since the key's
+    owner reschedules once serviced at the earlier one. Cancelled and
+    superseded entries are discarded lazily when they reach the top.
+
+    Attributes:
+        .heap is heapq list of triples (deadline, count, key)
+        .lives is dict of live duple (deadline, count) keyed by key
+        .count is entry counter that breaks ties so keys are never compared
+    '''
+    Slack = 64  # superseded entries tolerated before compacting .heap
+
+    def __init__(self):
+        '''
+        Setup instance
+        '''
+        self.heap = []
+        self.lives = dict()
+        self.count = 0
+
+    def __len__(self):
+        return len(self.lives)
+
+    def __contains__(self, key):
+        return key in self.lives
+
+    def schedule(self, key, deadline):
+        '''
+        Schedule key at deadline unless deadline is None or key is already
+        scheduled no later than deadline
+        '''
+        if deadline is None:
+            return
+        live = self.lives.get(key)
+        if live is not None and live[0] <= deadline:
+            return
+        self.count += 1
+        self.lives[key] = (deadline, self.count)
+        heapq.heappush(self.heap, (deadline, self.count, key))
+        if len(self.heap) > 2 * len(self.lives) + self.Slack:
+            self.compact()
+
+    def cancel(self, key):
+        '''
+        Unschedule key if scheduled
+        '''
+        self.lives.pop(key, None)
+
+    def clear(self):
+        '''
+        Unschedule all keys
+        '''
+        self.heap = []
+        self.lives = dict()
+
+    def compact(self):
+        '''
+        Rebuild .heap from live entries only
+        '''
+        self.heap = [(deadline, count, key)
+                     for key, (deadline, count) in self.lives.items()]
+        heapq.heapify(self.heap)
+
+    def peek(self, after=None):
+        '''
+        Returns earliest scheduled deadline that is later than after
+        or None if none
+        '''
+        heap = self.heap
+        while heap and self.lives.get(heap[0][2]) != heap[0][:2]:
+            heapq.heappop(heap)  # superseded or cancelled
+        if not heap:
+            return None
+        if after is None or heap[0][0] > after:
+            return heap[0][0]
+        laters = [deadline for deadline, count in self.lives.values()
+                  if deadline > after]  # due keys not yet popped
+        return min(laters) if laters else None
+
+    def pop(self, stamp):
+        '''
+        Returns list of keys due at stamp, earliest first, and unschedules them
+        '''
+        dues = []
+        heap = self.heap
+        while heap and heap[0][0] <= stamp:
+            deadline, count, key = heapq.heappop(heap)
+            if self.lives.get(key) == (deadline, count):
+                del self.lives[key]
+                dues.append(key)
+        return dues
@@ -7,13 +7,15 @@ stacking.py raet protocol stacking classes
 
 # Import python libs
 import socket
+import select
 import os
 import errno
 import sys
+import time
 if sys.version_info > (3,):
     long = int
 
-from collections import deque,  Mapping
+from collections import deque,  Mapping, OrderedDict
 try:
     import simplejson as json
 except ImportError:
@@ -80,8 +82,8 @@ class Stack(object):
                                           ha=ha,)
         self.local.stack = self
 
-        self.remotes = self.uidRemotes = odict() # remotes indexed by uid
-        self.nameRemotes = odict() # remotes indexed by name
+        self.remotes = self.uidRemotes = raeting.Roster() # remotes indexed by uid
+        self.nameRemotes = raeting.Roster() # remotes indexed by name
 
         self.bufcnt = bufcnt
         if not server:
@@ -514,6 +516,80 @@ class Stack(object):
         '''
         pass
 
+    def nextDeadline(self, after=None):
+        '''
+        Returns earliest store stamp at which .process has timer based work
+        to do that is later than after or None if none
+        '''
+        return None
+
+    def waitServer(self, timeout=None, writable=False):
+        '''
+        Block until server socket is readable, or also writable when writable,
+        or timeout seconds have elapsed whichever comes first.
+        timeout of None means wait indefinitely.
+        Returns True if server is ready or the server has no socket to wait on
+        False otherwise
+        '''
+        ss = getattr(self.server, 'ss', None) if self.server else None
+        if ss is None:  # nothing to select on so sleep and let caller poll
+            if timeout:
+                time.sleep(timeout)
+            return True
+        try:
+            rxs, txs, exs = select.select([ss], [ss] if writable else [], [], timeout)
+        except (select.error, socket.error) as ex:
+            err = raeting.get_exception_error(ex)
+            if err == errno.EINTR:
+                return False
+            raise
+        return bool(rxs or txs)
+
+    def serviceAllUntil(self, timeout=None):
+        '''
+        Event driven alternative to polling .serviceAll
+        Block until the server socket has received data, the next timer
+        deadline is due, or timeout seconds have elapsed whichever comes first
+        then service only what is ready:
+           server receive and rxes queue when received data
+           process when a timer deadline is due
+           txMsgs queue
+           txes queue to server send
+
+        timeout of None means wait until data or the next deadline
+
+        Advances .store.stamp by the real time spent blocked so store timers
+        keep pace. Not for use when something else such as an ioflo skedder
+        advances the store.
+
+        Returns True if the server was ready False otherwise
+        '''
+        self.serviceAllTx()  # flush pending before blocking
+        stamp = self.store.stamp
+        due = self.nextDeadline()
+        if due is not None and due <= stamp:  # caller advanced stamp
+            self.process()
+            self.serviceAllTx()
+        deadline = self.nextDeadline(after=stamp)  # ignore due but idle timers
+
+        wait = timeout
+        if deadline is not None:
+            wait = deadline - stamp if wait is None else min(wait, deadline - stamp)
+        if self.rxes or self.txMsgs:
+            wait = 0.0
+
+        start = time.time()
+        ready = self.waitServer(timeout=wait, writable=bool(self.txes))
+        self.store.advanceStamp(time.time() - start)
+
+        if ready:
+            self.serviceReceives()
+        self.serviceRxes()
+        if deadline is not None and self.store.stamp >= deadline:
+            self.process()
+        self.serviceAllTx()
+        return ready
+
 class KeepStack(Stack):
     '''
     RAET protocol base stack object with persistance via Keep attribute.
@@ -521,6 +597,8 @@ class KeepStack(Stack):
     '''
     Count = 0
     Uid =  0
+    DumpInterval = 0.0  # max secs staged dumps wait for flush, 0.0 each service
+    DumpSize = 1000  # flush when this many remotes are staged
 
     def __init__(self,
                  puid=None,
@@ -534,6 +612,8 @@ class KeepStack(Stack):
                  name='',
                  uid=None,
                  ha=None,
+                 dumpInterval=None,
+                 dumpSize=None,
                  **kwa
                  ):
         '''
@@ -542,6 +622,12 @@ class KeepStack(Stack):
         if getattr(self, 'puid', None) is None:
             self.puid = puid if puid is not None else self.Uid
 
+        # write behind of remotes and local staged by transactions
+        self.dumpInterval = dumpInterval if dumpInterval is not None else self.DumpInterval
+        self.dumpSize = dumpSize if dumpSize is not None else self.DumpSize
+        self.dirtyRemotes = OrderedDict()  # remotes staged for dump by flushKeep
+        self.dirtyLocal = False  # local staged for dump by flushKeep
+
         self.keep = keep or keeping.LotKeep(dirpath=dirpath,
                                             basedirpath=basedirpath,
                                             stackname=name)
@@ -559,6 +645,7 @@ class KeepStack(Stack):
         super(KeepStack, self).__init__(puid=puid,
                                         local=local,
                                         **kwa)
+        self.dumpTimer = StoreTimer(self.store, duration=self.dumpInterval)
 
         if clean or cleanremote:
             self.clearRemoteKeeps()
@@ -610,6 +697,7 @@ class KeepStack(Stack):
         If clear then also remove from disk
         '''
         super(KeepStack, self).removeRemote(remote=remote)
+        self.dirtyRemotes.pop(remote, None)
         if clear:
             self.clearRemote(remote)
 
@@ -634,6 +722,7 @@ class KeepStack(Stack):
         '''
         Dump keeps of local
         '''
+        self.dirtyLocal = False
         self.keep.dumpLocal(self.local)
 
     def restoreLocal(self):
@@ -665,17 +754,76 @@ class KeepStack(Stack):
         '''
         Dump keeps of remote
         '''
+        self.dirtyRemotes.pop(remote, None)
         self.keep.dumpRemote(remote)
 
+    def stageLocal(self):
+        '''
+        Stage local for write behind dump by .flushKeep
+        '''
+        if not (self.dirtyLocal or self.dirtyRemotes):
+            self.dumpTimer.restart()
+        self.dirtyLocal = True
+
+    def stageRemote(self, remote):
+        '''
+        Stage remote for write behind dump by .flushKeep
+        Repeated stages of the same remote before the flush coalesce into one dump
+        Flush at once when .dumpSize remotes are staged
+        '''
+        if not (self.dirtyLocal or self.dirtyRemotes):
+            self.dumpTimer.restart()
+        self.dirtyRemotes[remote] = True
+        if len(self.dirtyRemotes) >= self.dumpSize:
+            self.flushKeep(force=True)
+
+    def flushKeep(self, force=False):
+        '''
+        Dump local and remotes staged since last flush in one keep batch
+        when force or staged for at least .dumpInterval
+        Returns number of dumps
+        '''
+        if not (self.dirtyLocal or self.dirtyRemotes):
+            return 0
+        if not (force or self.dumpTimer.expired):
+            return 0
+        count = 0
+        with self.keep.batch():
+            if self.dirtyLocal:
+                self.dirtyLocal = False
+                self.keep.dumpLocal(self.local)
+                count += 1
+            remotes, self.dirtyRemotes = self.dirtyRemotes, OrderedDict()
+            for remote in remotes:
+                self.keep.dumpRemote(remote)
+                count += 1
+        self.incStat('keep_flush')
+        self.incStat('keep_dump', count)
+        return count
+
+    def flush(self):
+        '''
+        Dump everything staged for write behind now such as on shutdown
+        '''
+        return self.flushKeep(force=True)
+
+    def process(self):
+        '''
+        Allow timer based processing then flush staged dumps when due
+        '''
+        super(KeepStack, self).process()
+        self.flushKeep()
+
     def dumpRemotes(self, clear=True):
         '''
         Dump all remotes data to keep files
         If clear then clear all files first
         '''
-        if clear:
-            self.clearRemotes()
-        for remote in self.remotes.values():
-            self.dumpRemote(remote)
+        with self.keep.batch():
+            if clear:
+                self.clearRemotes()
+            for remote in self.remotes.values():
+                self.dumpRemote(remote)
 
     def restoreRemote(self, name):
         '''
@@ -717,6 +865,7 @@ class KeepStack(Stack):
         '''
         Clear remote keep of remote
         '''
+        self.dirtyRemotes.pop(remote, None)
         self.keep.clearRemoteData(remote.name)
 
     def clearRemotes(self):
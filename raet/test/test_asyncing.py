@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+'''
+Tests of asyncio driven stacks
+
+'''
+# pylint: skip-file
+import sys
+if sys.version_info < (2, 7):
+    import unittest2 as unittest
+else:
+    import unittest
+
+if sys.version_info < (3, 5):
+    raise unittest.SkipTest("asyncio driver requires python 3.5 or later")
+
+import os
+import time
+import tempfile
+import shutil
+import asyncio
+
+from ioflo.aid.odicting import odict
+from ioflo.base.storing import Store
+
+from ioflo.base.consoling import getConsole
+console = getConsole()
+
+# Import raet libs
+from raet.abiding import *  # import globals
+from raet import raeting, nacling, asyncing
+from raet.road import estating, stacking
+
+if sys.platform == 'win32':
+    TEMPDIR = 'c:/temp'
+    if not os.path.exists(TEMPDIR):
+        os.mkdir(TEMPDIR)
+else:
+    TEMPDIR = '/tmp'
+
+def setUpModule():
+    console.reinit(verbosity=console.Wordage.concise)
+
+def tearDownModule():
+    pass
+
+
+class BasicTestCase(unittest.TestCase):
+    '''
+    Test RoadStacks driven by asyncio event loop
+    '''
+
+    def setUp(self):
+        self.store = Store(stamp=0.0)
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.baseDirpath = tempfile.mkdtemp(prefix="raet", suffix="base", dir=TEMPDIR)
+
+        self.main = stacking.RoadStack(store=self.store,
+                                       name='main',
+                                       main=True,
+                                       auto=raeting.AutoMode.once.value,
+                                       sigkey=nacling.Signer().keyhex,
+                                       prikey=nacling.Privateer().keyhex,
+                                       dirpath=os.path.join(self.baseDirpath, 'main'))
+        self.other = stacking.RoadStack(store=self.store,
+                                        name='other',
+                                        auto=raeting.AutoMode.once.value,
+                                        ha=("", raeting.RAET_TEST_PORT),
+                                        sigkey=nacling.Signer().keyhex,
+                                        prikey=nacling.Privateer().keyhex,
+                                        dirpath=os.path.join(self.baseDirpath, 'other'))
+        self.mainAsync = asyncing.AsyncStack(self.main, loop=self.loop)
+        self.otherAsync = asyncing.AsyncStack(self.other, loop=self.loop)
+
+    def tearDown(self):
+        self.mainAsync.stop()
+        self.otherAsync.stop()
+        self.loop.close()
+        asyncio.set_event_loop(None)
+        for stack in [self.main, self.other]:
+            stack.server.close()
+            stack.clearAllKeeps()
+        if os.path.exists(self.baseDirpath):
+            shutil.rmtree(self.baseDirpath)
+
+    def runUntil(self, condition, timeout=2.0):
+        '''
+        Run loop until condition() is True or timeout seconds
+        Returns condition()
+        '''
+        start = time.time()
+        while not condition() and (time.time() - start) < timeout:
+            self.loop.run_until_complete(asyncio.sleep(0.01))
+        return condition()
+
+    def bootstrap(self):
+        '''
+        Join and allow other with main driven by loop
+        '''
+        self.mainAsync.start()
+        self.otherAsync.start()
+        self.other.addRemote(estating.RemoteEstate(stack=self.other,
+                                                   fuid=0,  # vacuous join
+                                                   sid=0,  # always 0 for join
+                                                   ha=self.main.local.ha))
+        self.other.join()
+        self.otherAsync.service()
+        self.assertTrue(self.runUntil(lambda: not (self.main.transactions or
+                                                   self.other.transactions)))
+        self.other.allow()
+        self.otherAsync.service()
+        self.assertTrue(self.runUntil(lambda: not (self.main.transactions or
+                                                   self.other.transactions)))
+        for stack in [self.main, self.other]:
+            self.assertTrue(stack.remotes.values()[0].allowed)
+
+    def testSendReceive(self):
+        '''
+        Test async send and receive delivered on socket readiness
+        '''
+        console.terse("{0}\n".format(self.testSendReceive.__doc__))
+        self.bootstrap()
+
+        body = odict(what="Hello main", extra="From other")
+        self.loop.run_until_complete(self.otherAsync.send(body))
+        start = time.time()
+        msg, name = self.loop.run_until_complete(
+                asyncio.wait_for(self.mainAsync.receive(), 2.0))
+        self.assertLess(time.time() - start, 1.0)
+        self.assertDictEqual(msg, body)
+        self.assertEqual(name, 'other')
+        self.assertTrue(self.runUntil(lambda: not self.other.transactions))  # acked
+
+        # receive awaited before the message is sent
+        body = odict(what="Hello other")
+        receiving = self.loop.create_task(self.otherAsync.receive())
+        self.loop.run_until_complete(self.mainAsync.send(body))
+        msg, name = self.loop.run_until_complete(
+                asyncio.wait_for(receiving, 2.0))
+        self.assertDictEqual(msg, body)
+        self.assertEqual(name, 'main')
+
+    def testTimers(self):
+        '''
+        Test transaction timers scheduled on the loop
+        '''
+        console.terse("{0}\n".format(self.testTimers.__doc__))
+        self.bootstrap()
+        self.assertIs(self.otherAsync.timer, None)  # idle
+
+        self.mainAsync.stop()  # main not driven so no ack
+        redos = self.other.stats.get('redo_segment', 0)
+        self.loop.run_until_complete(self.otherAsync.send(odict(what="Redo me")))
+        self.assertIsNotNone(self.otherAsync.timer)
+        self.assertEqual(self.otherAsync.deadline, self.other.nextDeadline())
+        self.assertTrue(self.runUntil(
+                lambda: self.other.stats.get('redo_segment', 0) > redos))
+
+        self.mainAsync.start()
+        msg, name = self.loop.run_until_complete(
+                asyncio.wait_for(self.mainAsync.receive(), 2.0))
+        self.assertEqual(msg['what'], "Redo me")
+        self.assertTrue(self.runUntil(lambda: not self.other.transactions))
+        self.assertIs(self.otherAsync.timer, None)
+
+
+def runOne(test):
+    '''
+    Unittest Runner
+    '''
+    test = BasicTestCase(test)
+    suite = unittest.TestSuite([test])
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+def runSome():
+    """ Unittest runner """
+    tests = []
+    names = ['testSendReceive',
+             'testTimers', ]
+    tests.extend(map(BasicTestCase, names))
+
+    suite = unittest.TestSuite(tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+def runAll():
+    """ Unittest runner """
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.TestLoader().loadTestsFromTestCase(BasicTestCase))
+
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+if __name__ == '__main__' and __package__ is None:
+
+    #console.reinit(verbosity=console.Wordage.concise)
+
+    #runAll() #run all unittests
+
+    runSome()#only run some
+
+    #runOne('testSendReceive')
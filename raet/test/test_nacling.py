@@ -4,9 +4,11 @@ Tests to try out nacling. Potentially ephemeral
 
 '''
 # pylint: skip-file
+import os
 import sys
 import inspect
 import struct
+import time
 
 if sys.version_info < (2, 7):
     import unittest2 as unittest
@@ -222,6 +224,215 @@ class BasicTestCase(unittest.TestCase):
         self.assertEqual(len(demsg), 50)
         self.assertEqual(demsg, enmsg)
 
+    def testBoxer(self):
+        '''
+        Test encryption decryption with cached shared key boxers
+        '''
+        console.terse("{0}\n".format(self.testBoxer.__doc__))
+        priverBob = nacling.Privateer()
+        pubberBob = nacling.Publican(priverBob.pubhex)
+        priverPam = nacling.Privateer()
+        pubberPam = nacling.Publican(priverPam.pubhex)
+
+        boxerBob = nacling.Boxer(priverBob, pubberPam.key)
+        boxerPam = nacling.Boxer(priverPam, pubberBob.keyhex)
+        self.assertEqual(boxerBob.key.encode(), pubberPam.keyraw)
+        self.assertEqual(boxerPam.key.encode(), pubberBob.keyraw)
+        self.assertEqual(bytes(boxerBob.box), bytes(boxerPam.box))
+
+        enmsg = b"Hello its me Bob, Did you get my last message?"
+        cipher, nonce = boxerBob.encrypt(enmsg)
+        self.assertEqual(len(nonce), 24)
+        self.assertEqual(boxerPam.decrypt(cipher, nonce), enmsg)
+        # interoperates with uncached Privateer
+        self.assertEqual(priverPam.decrypt(cipher, nonce, pubberBob.key), enmsg)
+        cipher, nonce = priverPam.encrypt(enmsg, pubberBob.key)
+        self.assertEqual(boxerBob.decrypt(cipher, nonce), enmsg)
+
+        cipher, nonce = boxerPam.encrypt(enmsg, enhex=True)
+        self.assertEqual(len(nonce), 48)
+        self.assertEqual(boxerBob.decrypt(cipher, nonce, dehex=True), enmsg)
+
+        # nonces are never reused
+        self.assertNotEqual(boxerBob.encrypt(enmsg)[1], boxerBob.encrypt(enmsg)[1])
+
+    def testDetached(self):
+        '''
+        Test detached signatures on bytes and buffers without combining
+        '''
+        console.terse("{0}\n".format(self.testDetached.__doc__))
+        signer = nacling.Signer()
+        verfer = nacling.Verifier(signer.verhex)
+        msg = b"Blank footed packet" + b''.rjust(64, b'\x00')
+
+        signature = signer.signature(msg)
+        self.assertEqual(len(signature), 64)
+        self.assertEqual(signature, signer.sign(msg).signature)
+        self.assertEqual(signer.key.signDetached(msg), signature)
+        buf = bytearray(msg)
+        for data in [msg, buf, memoryview(buf), memoryview(msg)[:], memoryview(buf)[:19]]:
+            self.assertEqual(signer.signature(data), signer.signature(bytes(data)))
+
+        self.assertTrue(verfer.verify(signature, msg))
+        self.assertTrue(verfer.verify(signature, buf))
+        self.assertTrue(verfer.verify(signature, memoryview(buf)))
+        self.assertTrue(verfer.verify(signature, memoryview(msg)))  # read only copied
+        self.assertTrue(verfer.key.verifyDetached(signature, msg))
+        buf[0:1] = b'b'
+        self.assertFalse(verfer.verify(signature, buf))
+        self.assertFalse(verfer.key.verifyDetached(signature, buf))
+        self.assertFalse(verfer.verify(signature[:-1], msg))
+        self.assertFalse(nacling.Verifier().verify(signature, msg))
+
+        self.assertIs(nacling.cbuffer(msg), msg)
+        cbuf = nacling.cbuffer(buf)
+        buf[0:1] = b'B'
+        self.assertEqual(cbuf.raw, msg)  # same memory
+
+    def testKeyPool(self):
+        '''
+        Test key pool draw, refill watermarks and refill thread
+        '''
+        console.terse("{0}\n".format(self.testKeyPool.__doc__))
+        pool = nacling.KeyPool(low=2, high=4)
+        self.assertEqual(len(pool), 0)
+        self.assertTrue(pool.wanting())
+        key, hit = pool.draw()  # empty so generated
+        self.assertIsInstance(key, nacling.PrivateKey)
+        self.assertFalse(hit)
+        self.assertEqual((pool.hits, pool.misses), (0, 1))
+
+        self.assertEqual(pool.refill(limit=1), 1)
+        self.assertEqual(pool.refill(), 3)  # up to high
+        self.assertEqual(pool.refill(), 0)
+        self.assertFalse(pool.wanting())
+        keys = list(pool.keys)
+        drawn = [pool.draw() for i in range(3)]
+        self.assertEqual([k for k, hit in drawn], keys[:3])  # oldest first
+        self.assertEqual((pool.hits, pool.misses), (3, 1))
+        self.assertTrue(pool.wanting())
+        self.assertEqual(len(set(bytes(k) for k in keys)), 4)
+
+        # long term Privateer keys are generated never drawn from the pool
+        pooled = len(nacling.keyPool)
+        privateer = nacling.Privateer()
+        self.assertEqual(len(privateer.pubraw), 32)
+        self.assertEqual(len(nacling.keyPool), pooled)
+        self.assertNotIn(bytes(privateer.key), [bytes(k) for k in keys])
+
+        pool.start()
+        for i in range(100):
+            if len(pool) == pool.high:
+                break
+            time.sleep(0.01)
+        self.assertEqual(len(pool), pool.high)
+        while not pool.wanting():
+            pool.draw()
+        for i in range(100):
+            if len(pool) == pool.high:
+                break
+            time.sleep(0.01)
+        self.assertEqual(len(pool), pool.high)  # refilled by thread
+        pool.stop()
+        self.assertIs(pool.thread, None)
+
+    def testKeyPoolFork(self):
+        '''
+        Test key pool discards pooled keys in child of fork
+        '''
+        console.terse("{0}\n".format(self.testKeyPoolFork.__doc__))
+        pool = nacling.KeyPool(low=2, high=4)
+        pool.refill()
+        keys = [bytes(key) for key in pool.keys]
+
+        nacling.forks[0] += 1  # as if in child of fork
+        self.assertEqual(len(pool), 0)
+        key, hit = pool.draw()
+        self.assertFalse(hit)
+        self.assertNotIn(bytes(key), keys)
+        self.assertFalse(pool.reforked())
+
+        if not hasattr(os, 'fork'):
+            return
+        pool.refill()
+        keys = [bytes(key) for key in pool.keys]
+        rfd, wfd = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # child
+            try:
+                os.close(rfd)
+                key, hit = pool.draw()
+                os.write(wfd, (b'1' if hit else b'0') + bytes(key))
+            finally:
+                os._exit(0)
+        os.close(wfd)
+        data = b''
+        while True:
+            chunk = os.read(rfd, 64)
+            if not chunk:
+                break
+            data += chunk
+        os.close(rfd)
+        os.waitpid(pid, 0)
+        self.assertEqual(len(data), 33)
+        self.assertEqual(data[:1], b'0')  # child pool was emptied
+        self.assertNotIn(data[1:], keys)
+        key, hit = pool.draw()  # parent pool untouched
+        self.assertTrue(hit)
+        self.assertEqual(bytes(key), keys[0])
+        self.assertNotEqual(bytes(key), data[1:])
+
+    def testNoncers(self):
+        '''
+        Test random, bulk and counter nonce sources
+        '''
+        console.terse("{0}\n".format(self.testNoncers.__doc__))
+        size = nacling.Box.NONCE_SIZE
+        priver = nacling.Privateer()
+        self.assertIs(priver.noncer, nacling.defaultNoncer)
+        self.assertIs(type(priver.noncer), nacling.Noncer)
+
+        bulk = nacling.BulkNoncer(block=4)
+        self.assertIs(bulk.spawn(), bulk)  # shared buffer
+        nonces = [bulk.nonce() for i in range(10)]
+        self.assertEqual(set(len(nonce) for nonce in nonces), set([size]))
+        self.assertEqual(len(set(nonces)), 10)
+        self.assertEqual(bulk.index, 2 * size)  # third block
+        buf = bulk.buf
+        nacling.forks[0] += 1  # as if in child of fork
+        bulk.nonce()
+        self.assertIsNot(bulk.buf, buf)  # parent buffer discarded
+        self.assertEqual(bulk.index, size)
+
+        counter = nacling.CounterNoncer()
+        spawned = counter.spawn()
+        self.assertIsInstance(spawned, nacling.CounterNoncer)
+        self.assertIsNot(spawned, counter)
+        first = spawned.nonce()
+        second = spawned.nonce()
+        prefix = spawned.prefix
+        self.assertEqual(len(prefix), spawned.PrefixSize)
+        self.assertEqual(first, prefix + b'\x00' * 7 + b'\x01')
+        self.assertEqual(second, prefix + b'\x00' * 7 + b'\x02')
+        self.assertNotEqual(counter.nonce()[:spawned.PrefixSize], prefix)
+        spawned.counter = 0xffffffffffffffff  # wrap takes new prefix
+        self.assertEqual(spawned.nonce()[spawned.PrefixSize:], b'\x00' * 7 + b'\x01')
+        self.assertNotEqual(spawned.prefix, prefix)
+        prefix = spawned.prefix
+        nacling.forks[0] += 1
+        spawned.nonce()
+        self.assertNotEqual(spawned.prefix, prefix)
+
+        msg = b"Hello its me Bob"
+        for noncer in [bulk, counter]:
+            bob = nacling.Privateer(noncer=noncer.spawn())
+            pam = nacling.Privateer()
+            boxer = nacling.Boxer(bob, pam.pubraw)
+            cipher, nonce = boxer.encrypt(msg)
+            self.assertEqual(pam.decrypt(cipher, nonce, bob.pubraw), msg)
+            cipher, nonce = bob.encrypt(msg, pam.pubraw)
+            self.assertEqual(pam.decrypt(cipher, nonce, bob.pubraw), msg)
+
     def testUuid(self):
         '''
         Test uuid generation
@@ -318,7 +529,12 @@ def runSome():
     """ Unittest runner """
     tests = []
     names = ['testSign',
-             'testEncrypt'
+             'testEncrypt',
+             'testBoxer',
+             'testDetached',
+             'testKeyPool',
+             'testKeyPoolFork',
+             'testNoncers',
              'testUuid', ]
     tests.extend(map(BasicTestCase, names))
 
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+'''
+Tests of deadline scheduling
+
+'''
+# pylint: skip-file
+import sys
+if sys.version_info < (2, 7):
+    import unittest2 as unittest
+else:
+    import unittest
+
+from ioflo.base.consoling import getConsole
+console = getConsole()
+
+# Import raet libs
+from raet.abiding import *  # import globals
+from raet import scheduling
+
+def setUpModule():
+    console.reinit(verbosity=console.Wordage.concise)
+
+def tearDownModule():
+    pass
+
+
+class Key(object):
+    '''
+    Hashable by identity key
+    '''
+    def __init__(self, name):
+        self.name = name
+
+
+class BasicTestCase(unittest.TestCase):
+    '''
+    Test Scheduler heap of deadlines
+    '''
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def testSchedule(self):
+        '''
+        Test schedule peek and pop in deadline order
+        '''
+        console.terse("{0}\n".format(self.testSchedule.__doc__))
+        scheduler = scheduling.Scheduler()
+        alpha, beta, gamma = Key('alpha'), Key('beta'), Key('gamma')
+        self.assertIs(scheduler.peek(), None)
+        self.assertEqual(scheduler.pop(100.0), [])
+
+        scheduler.schedule(alpha, 3.0)
+        scheduler.schedule(beta, 1.0)
+        scheduler.schedule(gamma, 2.0)
+        scheduler.schedule(gamma, None)  # ignored
+        self.assertEqual(len(scheduler), 3)
+        self.assertIn(alpha, scheduler)
+        self.assertEqual(scheduler.peek(), 1.0)
+        self.assertEqual(scheduler.peek(after=1.0), 2.0)  # beta due but not popped
+        self.assertEqual(scheduler.peek(after=3.0), None)
+
+        self.assertEqual(scheduler.pop(0.5), [])
+        self.assertEqual(scheduler.pop(2.0), [beta, gamma])
+        self.assertEqual(len(scheduler), 1)
+        self.assertNotIn(beta, scheduler)
+        self.assertEqual(scheduler.pop(5.0), [alpha])
+        self.assertEqual(len(scheduler), 0)
+        self.assertIs(scheduler.peek(), None)
+
+    def testReschedule(self):
+        '''
+        Test earlier reschedule supersedes, later reschedule defers and cancel
+        '''
+        console.terse("{0}\n".format(self.testReschedule.__doc__))
+        scheduler = scheduling.Scheduler()
+        alpha, beta = Key('alpha'), Key('beta')
+
+        scheduler.schedule(alpha, 5.0)
+        scheduler.schedule(alpha, 2.0)  # earlier supersedes
+        self.assertEqual(scheduler.peek(), 2.0)
+        scheduler.schedule(alpha, 4.0)  # later is deferred to owner at 2.0
+        self.assertEqual(scheduler.peek(), 2.0)
+        self.assertEqual(scheduler.pop(10.0), [alpha])  # only once
+        self.assertEqual(len(scheduler.heap), 0)
+
+        scheduler.schedule(alpha, 1.0)
+        scheduler.schedule(beta, 3.0)
+        scheduler.cancel(alpha)
+        scheduler.cancel(alpha)  # not scheduled so no op
+        self.assertEqual(scheduler.peek(), 3.0)
+        self.assertEqual(scheduler.pop(10.0), [beta])
+
+        keys = [Key(i) for i in range(10)]
+        for i in range(scheduling.Scheduler.Slack * 4):  # superseded pile up
+            scheduler.schedule(keys[i % 10], 1000.0 - i)
+        self.assertEqual(len(scheduler), 10)
+        self.assertLessEqual(len(scheduler.heap), 2 * 10 + scheduling.Scheduler.Slack)
+        self.assertEqual(len(scheduler.pop(1000.0)), 10)
+        scheduler.schedule(alpha, 1.0)
+        scheduler.clear()
+        self.assertEqual(len(scheduler), 0)
+        self.assertIs(scheduler.peek(), None)
+
+
+def runOne(test):
+    '''
+    Unittest Runner
+    '''
+    test = BasicTestCase(test)
+    suite = unittest.TestSuite([test])
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+def runSome():
+    """ Unittest runner """
+    tests = []
+    names = ['testSchedule',
+             'testReschedule', ]
+    tests.extend(map(BasicTestCase, names))
+
+    suite = unittest.TestSuite(tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+def runAll():
+    """ Unittest runner """
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.TestLoader().loadTestsFromTestCase(BasicTestCase))
+
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+if __name__ == '__main__' and __package__ is None:
+
+    #console.reinit(verbosity=console.Wordage.concise)
+
+    #runAll() #run all unittests
+
+    runSome()#only run some
+
+    #runOne('testSchedule')
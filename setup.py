@@ -77,5 +77,5 @@ setup(
     install_requires=REQUIREMENTS,
     setup_requires=["setuptools_git >= 1.1", ],
     extras_require={},
-    scripts=['scripts/raetflo'],)
+    scripts=['scripts/raetflo', 'scripts/raetkeep'],)
 
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+'''
+Benchmark of Raet nacl crypto paths
+
+Compares per packet encrypt/decrypt throughput with the crypto_box shared key
+computed on every call (Privateer) versus the shared key cached per remote
+(RemoteEstate.boxer) and encrypt throughput with a random nonce read per
+packet against bulk buffered random nonces and counter nonces and packet
+signature sign and verify with combined signed messages against detached
+signatures for throughput and peak bytes allocated. Also scales rx verify and
+decrypt across crypto pool worker threads, both the crypto alone and the whole
+RoadStack.serviceRxes batch, against inline with no pool. Pool speedup needs
+as many free cores as workers since libnacl releases the GIL
+
+    python systest/bench/bench_crypto.py
+'''
+from __future__ import print_function
+import sys
+import time
+import tracemalloc
+from concurrent import futures
+
+from ioflo.aid.odicting import odict
+
+# Import raet libs
+from raet.abiding import *  # import globals
+from raet import raeting, nacling
+from raet.road import estating, packeting, stacking
+
+import benching
+
+COUNT = 5000
+
+
+def packetRoundTrip(pair, body):
+    '''
+    Pack an encrypted signed packet on main and parse it on other
+    '''
+    packet = packeting.TxPacket(stack=pair.main, embody=body, data=pair.data())
+    packet.pack()
+    rx = packeting.RxPacket(stack=pair.other, packed=packet.packed)
+    rx.parse()
+    return rx
+
+
+def benchBoxes(count=COUNT):
+    '''
+    Raw encrypt+decrypt of a small message with and without cached shared key
+    '''
+    bob = nacling.Privateer()
+    pam = nacling.Privateer()
+    msg = b"x" * 512
+
+    def uncached():
+        cipher, nonce = bob.encrypt(msg, pam.pubraw)
+        pam.decrypt(cipher, nonce, bob.pubraw)
+
+    bobBoxer = nacling.Boxer(bob, pam.pubraw)
+    pamBoxer = nacling.Boxer(pam, bob.pubraw)
+
+    def cached():
+        cipher, nonce = bobBoxer.encrypt(msg)
+        pamBoxer.decrypt(cipher, nonce)
+
+    benching.report("box encrypt+decrypt 512B uncached", benching.rate(uncached, count))
+    benching.report("box encrypt+decrypt 512B cached", benching.rate(cached, count))
+
+
+def benchPackets(count=COUNT):
+    '''
+    Full packet pack+parse with nacl coat and foot with and without cached
+    shared key
+    '''
+    pair = benching.StackPair()
+    body = odict(msg="x" * 512)
+    boxer = estating.RemoteEstate.boxer
+    try:
+        estating.RemoteEstate.boxer = property(lambda self: None)  # force uncached path
+        before = benching.rate(packetRoundTrip, count, pair, body)
+        estating.RemoteEstate.boxer = boxer
+        after = benching.rate(packetRoundTrip, count, pair, body)
+    finally:
+        estating.RemoteEstate.boxer = boxer
+        pair.close()
+    benching.report("packet pack+parse uncached shared key", before, "packets/sec")
+    benching.report("packet pack+parse cached shared key", after, "packets/sec")
+    benching.report("speedup", after / before, "x")
+
+
+def benchNonces(count=COUNT * 4):
+    '''
+    Cached shared key encrypt of a small message with each nonce source
+    '''
+    pam = nacling.Privateer()
+    msg = b"x" * 64
+    for label, noncer in [("random", nacling.Noncer()),
+                          ("bulk", nacling.BulkNoncer()),
+                          ("counter", nacling.CounterNoncer())]:
+        bob = nacling.Privateer(noncer=noncer.spawn())
+        boxer = nacling.Boxer(bob, pam.pubraw)
+        benching.report("nonce {0}".format(label),
+                        benching.rate(bob.nonce, count))
+        benching.report("box encrypt 64B {0} nonce".format(label),
+                        benching.rate(boxer.encrypt, count, msg))
+
+
+SIZES = [512, 1400, 65536]  # packet sizes for sign and verify
+
+
+def combinedVerify(verfer, packed, size):
+    '''
+    Verify as RxFoot did with copies for the blank foot and signed message
+    '''
+    signature = packed[size:]
+    front = packed[:size]
+    msg = front + b''.rjust(64, b'\x00')
+    try:
+        verfer.key.verify(signature + msg)
+    except ValueError:
+        return False
+    return True
+
+
+def detachedVerify(verfer, packed, size):
+    '''
+    Verify as RxFoot does with one copy of packed whose foot is blanked in
+    place and passed to libnacl without further copy
+    '''
+    signature = packed[size:]
+    msg = bytearray(packed)
+    msg[size:] = b''.rjust(64, b'\x00')
+    return verfer.verify(signature, msg)
+
+
+def peak(func, *pa):
+    '''
+    Returns peak bytes allocated while calling func(*pa)
+    '''
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    func(*pa)
+    top = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return top - base
+
+
+def benchSignatures(sizes=SIZES, count=COUNT):
+    '''
+    Sign and verify of packets of each size with combined signed messages
+    against detached signatures
+    '''
+    signer = nacling.Signer()
+    verfer = nacling.Verifier(signer.verhex)
+    for size in sizes:
+        msg = b"x" * (size - 64) + b''.rjust(64, b'\x00')
+        packed = msg[:size - 64] + signer.signature(msg)
+        assert combinedVerify(verfer, packed, size - 64)
+        assert detachedVerify(verfer, packed, size - 64)
+        for label, sign in [("combined", lambda msg: signer.key.sign(msg).signature),
+                            ("detached", signer.signature)]:
+            benching.report("sign {0}B {1}".format(size, label),
+                            benching.rate(sign, count, msg))
+            benching.report("sign {0}B {1} peak".format(size, label),
+                            peak(sign, msg), unit="bytes")
+        for label, verify in [("combined", combinedVerify),
+                              ("detached", detachedVerify)]:
+            benching.report("verify {0}B {1}".format(size, label),
+                            benching.rate(verify, count, verfer, packed, size - 64))
+            benching.report("verify {0}B {1} peak".format(size, label),
+                            peak(verify, verfer, packed, size - 64), unit="bytes")
+
+
+WORKERS = [0, 1, 2, 4, 8]  # crypto pool sizes, 0 = inline
+BATCH = 2000  # rx packets per batch for crypto pool
+
+
+def rxRaws(pair, count, size, start=1):
+    '''
+    Returns list of count (raw, sa) encrypted signed message packets from
+    main to other each of size bytes with transaction ids from start
+    '''
+    body = odict(msg="x" * size)
+    sa = ('127.0.0.1', raeting.RAET_PORT)
+    raws = []
+    for ti in range(start, start + count):
+        data = pair.data(tk=raeting.TrnsKind.message.value,
+                         pk=raeting.PcktKind.message.value,
+                         si=1,
+                         ti=ti)
+        packet = packeting.TxPacket(stack=pair.main, embody=body, data=data)
+        packet.pack()
+        raws.append((packet.packed, sa))
+    return raws
+
+
+def cryptoBatch(stack, raws):
+    '''
+    Verify and decrypt raws as the rx batch does. Returns seconds taken
+    '''
+    boxer = stack.remotes[3].boxer
+    packets = []
+    for raw, sa in raws:
+        packet = packeting.RxPacket(stack=stack, packed=raw)
+        packet.parseHead()
+        packets.append(packet)
+    start = time.perf_counter()
+    if stack.cryptoPool is None:
+        for packet in packets:
+            packet.parseCrypto(boxer)
+    else:
+        futures.wait([stack.cryptoPool.submit(packet.parseCrypto, boxer)
+                      for packet in packets])
+    elapsed = time.perf_counter() - start
+    assert all(packet.opened for packet in packets)
+    return elapsed
+
+
+def benchCryptoPool(workers=WORKERS, count=BATCH, size=800, rounds=3):
+    '''
+    Rx verify and decrypt throughput of a batch of packets for each crypto
+    pool size, of the crypto alone and of the whole .serviceRxes
+    '''
+    for worker in workers:
+        pair = benching.StackPair(cryptoWorkers=worker, dumpInterval=1e9)
+        try:
+            raws = rxRaws(pair, count, size)
+            best = min(cryptoBatch(pair.other, raws) for i in range(rounds))
+            benching.report("rx crypto {0} workers".format(worker),
+                            count / best, "packets/sec")
+
+            elapsed = []
+            for i in range(rounds):
+                pair.other.rxes.extend(rxRaws(pair, count, size, start=1 + count * (i + 1)))
+                start = time.perf_counter()
+                pair.other.serviceRxes()
+                elapsed.append(time.perf_counter() - start)
+                assert len(pair.other.rxMsgs) == count
+                pair.other.rxMsgs.clear()
+            benching.report("rx serviceRxes {0} workers".format(worker),
+                            count / min(elapsed), "packets/sec")
+        finally:
+            if pair.other.cryptoPool is not None:
+                pair.other.cryptoPool.shutdown()
+            pair.close()
+
+
+def main():
+    benching.console.reinit(verbosity=benching.console.Wordage.terse)
+    benchBoxes()
+    benchPackets()
+    benchNonces()
+    benchSignatures()
+    benchCryptoPool()
+
+
+if __name__ == '__main__':
+    main()
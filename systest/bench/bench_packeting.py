@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+'''
+Benchmark of Raet packet head codecs
+
+Compares head size and head pack/parse rates of the raet, json and binary
+head kinds for a typical message packet header
+Measures memory allocations per packet with tracemalloc
+
+    python systest/bench/bench_packeting.py
+'''
+from __future__ import print_function
+import sys
+import gc
+import tracemalloc
+
+from ioflo.aid.odicting import odict
+
+# Import raet libs
+from raet.abiding import *  # import globals
+from raet import raeting
+from raet.road import packeting
+
+import benching
+
+COUNT = 20000
+
+
+def headData(hk):
+    '''
+    Return typical segmented message packet head data for head kind hk
+    '''
+    return odict(hk=hk,
+                 bk=raeting.BodyKind.msgpack.value,
+                 ck=raeting.CoatKind.nacl.value,
+                 fk=raeting.FootKind.nacl.value,
+                 tk=raeting.TrnsKind.message.value,
+                 se=2,
+                 de=3,
+                 si=0x1234,
+                 ti=0x56,
+                 sn=3,
+                 sc=10,
+                 ml=9000,
+                 sf=True,
+                 wf=True,)
+
+
+def benchHeads(count=COUNT):
+    '''
+    Head pack and parse for each head kind
+    '''
+    stack = benching.MockStack()
+    body = b"x" * 512
+    for hk in [raeting.HeadKind.raet, raeting.HeadKind.json, raeting.HeadKind.binary]:
+        data = headData(hk.value)
+        data.update(ck=raeting.CoatKind.nada.value, fk=raeting.FootKind.nada.value,
+                    bk=raeting.BodyKind.raw.value)
+        packet = packeting.TxPacket(stack=stack, embody=body, data=data)
+        packet.pack()
+        packed = packet.packed
+
+        rx = packeting.RxPacket(stack=stack, packed=packed)
+
+        benching.report("{0} head size".format(hk.name), packet.head.size, "bytes")
+        benching.report("{0} head pack".format(hk.name),
+                        benching.rate(packet.head.pack, count))
+        benching.report("{0} head parse".format(hk.name),
+                        benching.rate(rx.head.parse, count))
+
+
+def allocations(func, count):
+    '''
+    Return duple of (blocks, bytes) allocated per call of func as measured
+    by tracemalloc while keeping all results alive
+    '''
+    results = []
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for i in range(count):
+        results.append(func())
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    blocks = sum(stat.count_diff for stat in stats)
+    size = sum(stat.size_diff for stat in stats)
+    return (blocks / float(count), size / float(count))
+
+
+def benchAllocations(count=2000):
+    '''
+    Allocations per tx packet pack and per rx packet parse
+    '''
+    stack = benching.MockStack()
+    data = headData(raeting.HeadKind.raet.value)
+    data.update(ck=raeting.CoatKind.nada.value, fk=raeting.FootKind.nada.value,
+                bk=raeting.BodyKind.raw.value)
+    body = b"x" * 512
+    packet = packeting.TxPacket(stack=stack, embody=body, data=data)
+    packet.pack()
+    packed = packet.packed
+
+    def tx():
+        packet = packeting.TxPacket(stack=stack, embody=body, data=data)
+        packet.pack()
+        return packet
+
+    def rx():
+        packet = packeting.RxPacket(stack=stack, packed=packed)
+        packet.parseOuter()
+        return packet
+
+    for label, func in [("tx packet pack", tx), ("rx packet parse outer", rx)]:
+        blocks, size = allocations(func, count)
+        benching.report("{0} allocated blocks".format(label), blocks, "blocks/packet")
+        benching.report("{0} allocated bytes".format(label), size, "bytes/packet")
+        benching.report("{0}".format(label), benching.rate(func, count * 10), "packets/sec")
+
+
+def main():
+    benchHeads()
+    benchAllocations()
+
+
+if __name__ == '__main__':
+    main()
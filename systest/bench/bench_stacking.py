@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+'''
+Benchmark of Raet RoadStack service loops
+
+Compares a fixed period polling loop around .serviceAll with the event
+driven .serviceAllUntil loop and with an asyncio driven stack for CPU used
+while idle and for latency of small messages delivered to the serviced stack.
+Also compares the cost of an idle process and manage tick of a stack with
+many remotes using the deadline schedulers against walking every remote
+and the cost of a manage tick with incremental availability against
+rebuilding availability from every remote. Also times master startup
+against the number of persisted remotes for the file and sqlite keeps and
+the latency of allow handshakes with and without pooled short term keys
+
+    python systest/bench/bench_stacking.py [seconds idle]
+'''
+from __future__ import print_function
+import sys
+import os
+import threading
+import time
+import asyncio
+
+from ioflo.aid.odicting import odict
+
+# Import raet libs
+from raet.abiding import *  # import globals
+from raet import asyncing, nacling
+from raet.road import estating, keeping, stacking
+
+import benching
+
+PERIODS = [0.0, 0.001, 0.01]  # poll loop sleep periods in seconds
+IDLE = 2.0  # seconds idle
+COUNT = 50  # messages for latency
+TIMEOUT = 1.0  # serviceAllUntil timeout
+REMOTES = [100, 1000, 10000]  # remote counts for tick cost
+TICKS = 200  # ticks for tick cost
+MANAGES = [1000, 10000, 50000]  # remote counts for manage availability cost
+REBUILDS = 3  # ticks for rebuild availability cost which is slow with many remotes
+RESTORES = [1000, 10000]  # persisted remote counts for startup time
+ALLOWS = 500  # allow handshakes for handshake latency
+
+
+def now():
+    return time.perf_counter() if hasattr(time, 'perf_counter') else time.time()
+
+
+def cpu():
+    return time.process_time() if hasattr(time, 'process_time') else time.clock()
+
+
+class Loop(threading.Thread):
+    '''
+    Thread servicing stack either by polling every period seconds or when
+    period is None by blocking in .serviceAllUntil. Records arrival time of
+    each received message
+    '''
+    def __init__(self, stack, period=None):
+        super(Loop, self).__init__()
+        self.daemon = True
+        self.stack = stack
+        self.period = period
+        self.running = True
+        self.arrivals = []
+        self.arrived = threading.Event()
+
+    def run(self):
+        stack = self.stack
+        while self.running:
+            if self.period is None:
+                stack.serviceAllUntil(timeout=TIMEOUT)
+            else:
+                stack.serviceAll()
+                if self.period:
+                    time.sleep(self.period)
+                stack.store.advanceStamp(self.period or 0.0)
+            while stack.rxMsgs:
+                stack.rxMsgs.popleft()
+                self.arrivals.append(now())
+                self.arrived.set()
+
+    def stop(self, waker):
+        '''
+        Stop and join loop using waker stack to send a message that wakes it
+        '''
+        self.running = False
+        waker.transmit(odict(what="stop"), uid=2)
+        waker.serviceAllTx()
+        self.join()
+
+
+def benchLoop(label, period, idle=IDLE, count=COUNT):
+    '''
+    Idle CPU percent and mean message latency of other serviced by a Loop
+    with period while main sends count messages one at a time
+    '''
+    pair = benching.StackPair()
+    try:
+        loop = Loop(pair.other, period=period)
+        loop.start()
+        start = now()
+        begin = cpu()
+        time.sleep(idle)
+        busy = cpu() - begin  # includes sleeping main thread which is free
+        elapsed = now() - start
+
+        latencies = []
+        for i in range(count):
+            loop.arrived.clear()
+            sent = now()
+            pair.main.transmit(odict(index=i), uid=2)
+            pair.main.serviceAllTx()
+            loop.arrived.wait(TIMEOUT)
+            latencies.append(loop.arrivals[-1] - sent)
+            time.sleep(0.01)  # let ack arrive
+            pair.main.serviceAll()
+        loop.stop(pair.main)
+
+        benching.report(label + " idle cpu", 100.0 * busy / elapsed, "%")
+        benching.report(label + " mean latency",
+                        1e3 * sum(latencies) / len(latencies), "ms")
+    finally:
+        pair.close()
+
+
+def benchAsync(label, idle=IDLE, count=COUNT):
+    '''
+    Idle CPU percent and mean message latency of other driven by asyncio
+    while main also driven on the same loop sends count messages one at a time
+    '''
+    pair = benching.StackPair()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    mainAsync = asyncing.AsyncStack(pair.main, loop=loop)
+    otherAsync = asyncing.AsyncStack(pair.other, loop=loop)
+
+    async def latencies():
+        results = []
+        for i in range(count):
+            sent = now()
+            await mainAsync.send(odict(index=i), uid=2)
+            await otherAsync.receive()
+            results.append(now() - sent)
+            await asyncio.sleep(0.01)  # let ack arrive
+        return results
+
+    try:
+        mainAsync.start()
+        otherAsync.start()
+        start = now()
+        begin = cpu()
+        loop.run_until_complete(asyncio.sleep(idle))
+        busy = cpu() - begin
+        elapsed = now() - start
+        results = loop.run_until_complete(latencies())
+
+        benching.report(label + " idle cpu", 100.0 * busy / elapsed, "%")
+        benching.report(label + " mean latency",
+                        1e3 * sum(results) / len(results), "ms")
+    finally:
+        mainAsync.stop()
+        otherAsync.stop()
+        loop.close()
+        asyncio.set_event_loop(None)
+        pair.close()
+
+
+def walkProcess(stack):
+    '''
+    Idle process tick that walks every remote and its transactions
+    '''
+    for remote in stack.remotes.values():
+        remote.process()
+
+
+def walkManage(stack):
+    '''
+    Idle manage tick that walks every remote timer
+    '''
+    for remote in stack.remotes.values():
+        remote.manage()
+
+
+def rebuildManage(stack):
+    '''
+    Idle manage tick that also rebuilds availability from every remote
+    '''
+    stack.manage()
+    alloweds = odict()
+    aliveds = odict()
+    reapeds = odict()
+    for remote in stack.remotes.values():
+        if remote.allowed:
+            alloweds[remote.name] = remote
+        if remote.alived:
+            aliveds[remote.name] = remote
+        if remote.reaped:
+            reapeds[remote.name] = remote
+    old = set(stack.aliveds.keys())
+    current = set(aliveds.keys())
+    changeds = odict(plus=current.difference(old), minus=old.difference(current))
+    return (alloweds, aliveds, reapeds, changeds)
+
+
+def benchTicks(counts=REMOTES, ticks=TICKS):
+    '''
+    Idle process and manage ticks per second with count remotes
+    '''
+    pair = benching.StackPair()
+    stack = pair.main
+    try:
+        added = 0
+        for count in counts:
+            while added < count:
+                stack.addRemote(estating.RemoteEstate(stack=stack,
+                                                      ha=('127.0.0.1', 20000 + added)))
+                added += 1
+            benching.report("{0} remotes walk process".format(count),
+                            benching.rate(walkProcess, ticks, stack))
+            benching.report("{0} remotes scheduled process".format(count),
+                            benching.rate(stack.process, ticks))
+            benching.report("{0} remotes walk manage timers".format(count),
+                            benching.rate(walkManage, ticks, stack))
+            benching.report("{0} remotes scheduled manage".format(count),
+                            benching.rate(stack.manage, ticks))
+    finally:
+        pair.close()
+
+
+def benchManage(counts=MANAGES, ticks=TICKS, rebuilds=REBUILDS):
+    '''
+    Idle manage ticks per second with count remotes half of them alived
+    '''
+    pair = benching.StackPair()
+    stack = pair.main
+    try:
+        added = 0
+        for count in counts:
+            while added < count:
+                remote = estating.RemoteEstate(stack=stack,
+                                               ha=('127.0.0.1', 20000 + added % 40000))
+                stack.addRemote(remote)
+                remote.allowed = True
+                remote.alived = bool(added % 2)
+                added += 1
+            benching.report("{0} remotes rebuild availability manage".format(count),
+                            benching.rate(rebuildManage, rebuilds, stack))
+            benching.report("{0} remotes incremental availability manage".format(count),
+                            benching.rate(stack.manage, ticks))
+    finally:
+        pair.close()
+
+
+def restart(dirpath, keep=None):
+    '''
+    Return seconds to start master stack from keep at dirpath and stack
+    '''
+    start = now()
+    stack = stacking.RoadStack(name='main', main=True, dirpath=dirpath, keep=keep)
+    return (now() - start, stack)
+
+
+def benchRestore(counts=RESTORES):
+    '''
+    Master startup seconds and remotes restored per second with count
+    persisted remotes for file keep and sqlite keep
+    '''
+    signer = nacling.Signer()
+    priver = nacling.Privateer()
+    for count in counts:
+        pair = benching.StackPair()
+        stack = pair.main
+        dirpath = stack.keep.dirpath
+        try:
+            for i in range(count):
+                remote = estating.RemoteEstate(stack=stack,
+                                               name="remote{0}".format(i),
+                                               ha=('127.0.0.1', 20000 + i % 40000),
+                                               verkey=signer.verhex,
+                                               pubkey=priver.pubhex,
+                                               role="role{0}".format(i))
+                stack.addRemote(remote)
+            stack.dumpRemotes()
+            stack.server.close()
+            count = len(stack.remotes)
+
+            elapsed, stack = restart(dirpath)
+            stack.server.close()
+            benching.report("{0} remotes file keep startup".format(count),
+                            elapsed, unit="sec")
+            stack.removeAllRemotes(clear=False)
+            benching.report("{0} remotes file keep restore".format(count),
+                            benching.rate(stack.restoreRemotes, 1) * count)
+
+            keep = keeping.migrateKeep(dirpath=dirpath, clear=True)
+            elapsed, stack = restart(dirpath, keep=keep)
+            stack.server.close()
+            benching.report("{0} remotes sqlite keep startup".format(count),
+                            elapsed, unit="sec")
+            stack.removeAllRemotes(clear=False)
+            benching.report("{0} remotes sqlite keep restore".format(count),
+                            benching.rate(stack.restoreRemotes, 1) * count)
+            keep.close()
+        finally:
+            pair.close()
+
+
+def handshake(pair):
+    '''
+    Run one allow handshake from other to main and return seconds taken
+    '''
+    start = now()
+    pair.other.allow(uid=pair.otherRemote.uid)
+    while pair.other.transactions or pair.main.transactions:
+        pair.other.serviceAll()
+        pair.main.serviceAll()
+    return now() - start
+
+
+def benchAllow(count=ALLOWS):
+    '''
+    Allow handshake latency with keys generated in the handshake against
+    keys drawn from a pool refilled by a background thread
+    '''
+    for label, pool in [("generated keys", nacling.KeyPool(low=0, high=0)),
+                        ("pooled keys", nacling.KeyPool(low=64, high=256))]:
+        pair = benching.StackPair(keyPool=pool, dumpInterval=1e9)  # no keep writes
+        pool.start()
+        try:
+            latencies = sorted(handshake(pair) for i in range(count))
+            assert pair.otherRemote.allowed
+            benching.report("allow {0} median latency".format(label),
+                            latencies[count // 2] * 1e6, unit="usec")
+            benching.report("allow {0} p99 latency".format(label),
+                            latencies[int(count * 0.99)] * 1e6, unit="usec")
+            benching.report("allow {0} pool hits".format(label),
+                            pool.hits, unit="")
+        finally:
+            pool.stop()
+            pair.close()
+
+
+def main():
+    benching.console.reinit(verbosity=benching.console.Wordage.terse)
+    idle = float(sys.argv[1]) if len(sys.argv) > 1 else IDLE
+    for period in PERIODS:
+        benchLoop("poll {0} ms".format(period * 1e3), period, idle=idle)
+    benchLoop("serviceAllUntil", None, idle=idle)
+    benchAsync("asyncio", idle=idle)
+    benchTicks()
+    benchManage()
+    benchRestore()
+    benchAllow()
+
+
+if __name__ == '__main__':
+    main()
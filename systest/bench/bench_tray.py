@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+'''
+Benchmark of Raet segmented message trays
+
+Measures RxTray reassembly of large segmented messages delivered in order
+and in shuffled order and TxTray time to first signed segment and peak
+memory when segments are generated one burst window at a time. Also compares
+signing throughput of bursts inline against signing them in shards on a
+crypto pool of threads and the longest the stack thread is held per burst.
+Pool speedup needs as many free cores as threads since libnacl releases the GIL
+
+    python systest/bench/bench_tray.py [sizes in MB ...]
+'''
+from __future__ import print_function
+import sys
+import random
+import time
+import gc
+import tracemalloc
+from concurrent import futures
+
+from ioflo.aid.odicting import odict
+
+# Import raet libs
+from raet.abiding import *  # import globals
+from raet import raeting
+from raet.road import packeting
+
+import benching
+
+SIZES = [1, 16, 64]  # message sizes in MB
+BURST = 64  # segments per burst window
+THREADS = [0, 1, 4, 8]  # crypto pool threads for pooled signing, 0 = inline
+POOLED = 16  # message size in MB for pooled signing
+
+
+def rxPackets(stack, size):
+    '''
+    Return list of outer parsed rx packets of a raw message of size bytes
+    '''
+    data = odict(hk=raeting.HeadKind.raet.value,
+                 bk=raeting.BodyKind.raw.value,
+                 ck=raeting.CoatKind.nada.value,
+                 fk=raeting.FootKind.nada.value)
+    body = b"x" * size
+    tray = packeting.TxTray(stack=stack, data=data, body=body)
+    tray.pack()
+    packets = []
+    for tx in tray.packets:
+        packet = packeting.RxPacket(stack=stack, packed=tx.packed)
+        packet.parseOuter()
+        packets.append(packet)
+    return packets
+
+
+def reassemble(stack, packets):
+    '''
+    Reassemble packets into message and return elapsed seconds
+    '''
+    tray = packeting.RxTray(stack=stack)
+    start = time.time()
+    for packet in packets:
+        tray.parse(packet)
+    elapsed = time.time() - start
+    assert tray.complete
+    return elapsed
+
+
+def benchReassembly(sizes=SIZES):
+    '''
+    Reassembly time and throughput for each message size
+    '''
+    stack = benching.MockStack()
+    for mb in sizes:
+        size = min(mb * 1000 * 1000, raeting.MAX_MESSAGE_SIZE)
+        packets = rxPackets(stack, size)
+        elapsed = reassemble(stack, packets)
+        benching.report("{0} MB {1} segments in order".format(mb, len(packets)),
+                        size / elapsed / 1e6, "MB/sec")
+        random.shuffle(packets)
+        elapsed = reassemble(stack, packets)
+        benching.report("{0} MB {1} segments shuffled".format(mb, len(packets)),
+                        size / elapsed / 1e6, "MB/sec")
+
+
+def send(tray, burst=BURST):
+    '''
+    Generate and sign every segment of packed tray one burst window at a time
+    releasing each window as if acked. Returns seconds to first segment
+    '''
+    start = time.time()
+    first = None
+    for begin in range(0, tray.count, burst):
+        for sn in range(begin, min(begin + burst, tray.count)):
+            tray.segment(sn)
+            if first is None:
+                first = time.time() - start
+        tray.release(begin + burst)
+    return first
+
+
+def benchSending(sizes=SIZES, burst=BURST):
+    '''
+    Time to first signed segment and peak traced memory of windowed send
+    for each message size
+    '''
+    pair = benching.StackPair()
+    try:
+        for mb in sizes:
+            size = min(mb * 1000 * 1000, raeting.MAX_MESSAGE_SIZE)
+            data = pair.data(bk=raeting.BodyKind.raw.value,
+                             ck=raeting.CoatKind.nada.value)
+            body = b"x" * size
+            tray = packeting.TxTray(stack=pair.main, data=data, body=body)
+            tray.pack()
+            start = time.time()
+            first = send(tray, burst=burst)
+            elapsed = time.time() - start
+            gc.collect()
+            tracemalloc.start()
+            send(tray, burst=burst)
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            label = "{0} MB {1} segments".format(mb, tray.count)
+            benching.report(label + " first segment", first * 1e3, "ms")
+            benching.report(label + " window peak", peak / 1e6, "MB")
+            benching.report(label + " signed", size / elapsed / 1e6, "MB/sec")
+    finally:
+        pair.close()
+
+
+def signBursts(tray, pool, burst):
+    '''
+    Sign every segment of packed tray one burst at a time inline when pool
+    is None otherwise on pool, releasing each burst as if acked
+    Returns duple (seconds elapsed, max seconds stack thread held per burst)
+    '''
+    held = 0.0
+    start = time.time()
+    for begin in range(0, tray.count, burst):
+        specs = [(sn, False, False) for sn in range(begin, min(begin + burst, tray.count))]
+        mark = time.time()
+        if pool is None:
+            packets = [tray.segment(sn, af=af, wf=wf) for sn, af, wf in specs]
+            held = max(held, time.time() - mark)
+        else:
+            done = tray.sign(specs, pool)
+            held = max(held, time.time() - mark)
+            done.result()
+            packets = tray.collect()
+        assert len(packets) == len(specs)
+        tray.release(begin + burst)
+    return (time.time() - start, held)
+
+
+def benchPooledSigning(threads=THREADS, mb=POOLED, burst=packeting.TxTray.Shard * 16):
+    '''
+    Signing throughput of a large message in bursts of burst segments for
+    each number of crypto pool threads against inline
+    '''
+    pair = benching.StackPair()
+    try:
+        size = min(mb * 1000 * 1000, raeting.MAX_MESSAGE_SIZE)
+        data = pair.data(bk=raeting.BodyKind.raw.value,
+                         ck=raeting.CoatKind.nada.value)
+        tray = packeting.TxTray(stack=pair.main, data=data, body=b"x" * size)
+        tray.pack()
+        for count in threads:
+            pool = futures.ThreadPoolExecutor(max_workers=count) if count else None
+            try:
+                elapsed, held = signBursts(tray, pool, burst)
+            finally:
+                if pool is not None:
+                    pool.shutdown()
+            label = "{0} MB signed {1} threads".format(mb, count)
+            benching.report(label, size / elapsed / 1e6, "MB/sec")
+            benching.report(label + " max held", held * 1e3, "ms")
+    finally:
+        pair.close()
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    benchSending(sizes)
+    benchReassembly(sizes)
+    benchPooledSigning()
+
+
+if __name__ == '__main__':
+    main()
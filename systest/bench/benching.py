@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+'''
+Shared helpers for Raet micro benchmarks
+
+Benchmarks are plain scripts, run them directly from the repo root, e.g.
+    python systest/bench/bench_crypto.py
+'''
+from __future__ import print_function
+import sys
+import os
+import shutil
+import tempfile
+import time
+
+from ioflo.aid.odicting import odict
+from ioflo.base.storing import Store
+
+from ioflo.base.consoling import getConsole
+console = getConsole()
+
+# Import raet libs
+from raet.abiding import *  # import globals
+from raet import raeting, nacling
+from raet.road import keeping, estating, stacking
+
+if sys.platform == 'win32':
+    TEMPDIR = 'c:/temp'
+    if not os.path.exists(TEMPDIR):
+        os.mkdir(TEMPDIR)
+else:
+    TEMPDIR = '/tmp'
+
+
+class MockStack(object):
+    '''
+    Mock stack with attributes to enable Packet benchmarks without sockets
+    '''
+    def __init__(self, store=None, veritive=False):
+        self.store = store if store is not None else Store(stamp=0.0)
+        self.veritive = True if veritive else False
+
+
+class StackPair(object):
+    '''
+    Pair of RoadStacks, main and other, with remotes for each other already
+    joined and allowed so packets can be signed, encrypted, verified and
+    decrypted between them without running the handshakes.
+
+    main sends with se=2, de=3 which other receives
+    '''
+    def __init__(self, store=None, **kwa):
+        self.store = store if store is not None else Store(stamp=0.0)
+        self.dirpathBase = tempfile.mkdtemp(prefix="raet", suffix="bench", dir=TEMPDIR)
+
+        mainDirpath = os.path.join(self.dirpathBase, 'road', 'keep', 'main')
+        otherDirpath = os.path.join(self.dirpathBase, 'road', 'keep', 'other')
+        mainSigner = nacling.Signer()
+        mainPriver = nacling.Privateer()
+        otherSigner = nacling.Signer()
+        otherPriver = nacling.Privateer()
+
+        self.main = stacking.RoadStack(name='main',
+                                       uid=1,
+                                       sigkey=mainSigner.keyhex,
+                                       prikey=mainPriver.keyhex,
+                                       main=True,
+                                       dirpath=mainDirpath,
+                                       store=self.store,
+                                       **kwa)
+        self.mainRemote = estating.RemoteEstate(stack=self.main,
+                                                uid=2,
+                                                name='other',
+                                                ha=("127.0.0.1", raeting.RAET_TEST_PORT),
+                                                verkey=otherSigner.verhex,
+                                                pubkey=otherPriver.pubhex,)
+        self.main.addRemote(self.mainRemote)
+
+        self.other = stacking.RoadStack(name='other',
+                                        uid=2,
+                                        ha=("", raeting.RAET_TEST_PORT),
+                                        sigkey=otherSigner.keyhex,
+                                        prikey=otherPriver.keyhex,
+                                        dirpath=otherDirpath,
+                                        store=self.store,
+                                        **kwa)
+        self.otherRemote = estating.RemoteEstate(stack=self.other,
+                                                 uid=3,
+                                                 name='main',
+                                                 ha=('127.0.0.1', raeting.RAET_PORT),
+                                                 verkey=mainSigner.verhex,
+                                                 pubkey=mainPriver.pubhex,)
+        self.other.addRemote(self.otherRemote)
+
+        self.otherRemote.publee = nacling.Publican(key=self.mainRemote.privee.pubhex)
+        self.mainRemote.publee = nacling.Publican(key=self.otherRemote.privee.pubhex)
+        self.mainRemote.fuid = self.otherRemote.uid
+        self.otherRemote.fuid = self.mainRemote.uid
+        for remote in [self.mainRemote, self.otherRemote]:
+            remote.sid = 1
+            remote.joined = True
+            remote.allowed = True
+
+    def data(self, **kwa):
+        '''
+        Return packet header data for main to other packets updated with kwa
+        '''
+        data = odict(hk=raeting.HeadKind.raet.value,
+                     se=2,
+                     de=3,
+                     bk=raeting.BodyKind.json.value,
+                     ck=raeting.CoatKind.nacl.value,
+                     fk=raeting.FootKind.nacl.value)
+        data.update(kwa)
+        return data
+
+    def close(self):
+        '''
+        Close stacks and remove keeps
+        '''
+        for stack in [self.main, self.other]:
+            stack.close()
+            stack.clearAllKeeps()
+        if os.path.exists(self.dirpathBase):
+            shutil.rmtree(self.dirpathBase)
+
+
+def rate(func, count, *pa, **kwa):
+    '''
+    Call func(*pa, **kwa) count times and return calls per second
+    '''
+    start = time.perf_counter() if hasattr(time, 'perf_counter') else time.time()
+    for i in range(count):
+        func(*pa, **kwa)
+    stop = time.perf_counter() if hasattr(time, 'perf_counter') else time.time()
+    elapsed = stop - start
+    return (count / elapsed) if elapsed > 0 else float('inf')
+
+
+def report(label, value, unit="/sec"):
+    '''
+    Print one benchmark result line
+    '''
+    print("{0:<48} {1:>14,.1f} {2}".format(label, value, unit))
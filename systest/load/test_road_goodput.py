@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+'''
+Load test of Raet Road Stack message goodput under packet loss
+
+Compares a fixed burst size with the adaptive AIMD burst size when
+segments are randomly lost in transit and a bottleneck with a bounded
+receive buffer drops what it cannot queue
+'''
+from __future__ import print_function
+# pylint: skip-file
+import sys
+if sys.version_info < (2, 7):
+    import unittest2 as unittest
+else:
+    import unittest
+
+import os
+import random
+import time
+
+from ioflo.aid.odicting import odict
+from ioflo.base.consoling import getConsole
+console = getConsole()
+
+from raet.road import estating, stacking
+
+import testing
+
+if sys.platform == 'win32':
+    TEMPDIR = 'c:/temp'
+    if not os.path.exists(TEMPDIR):
+        os.mkdir(TEMPDIR)
+else:
+    TEMPDIR = '/tmp'
+
+
+def setUpModule():
+    console.reinit(verbosity=console.Wordage.terse)
+    # console.reinit(verbosity=console.Wordage.concise)
+
+
+def tearDownModule():
+    pass
+
+MSG_SIZE = 1024 * 256  # about 260 segments
+RX_RATE = 32  # rx packets processed per service step (bottleneck)
+RX_BUFFER = 128  # rx packets queued before tail drop
+LOSSES = [0.0, 0.01, 0.05]  # random loss rates
+STEP = 0.01  # service step in seconds
+TOLERANCE = 0.1  # fraction adaptive goodput may fall below fixed window
+PORT = 7581
+
+
+class GoodputLoadTestCase(testing.BasicLoadTestCase):
+    '''
+    Message goodput of fixed and adaptive burst sizes under loss
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super(GoodputLoadTestCase, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        super(GoodputLoadTestCase, self).setUp()
+        self.burstSize = stacking.RoadStack.BurstSize
+        self.burstAdaptive = stacking.RoadStack.BurstAdaptive
+        self.alpha = self.createStack('alpha', PORT)
+        self.beta = self.createStack('beta', PORT + 1)
+        self.alpha.addRemote(estating.RemoteEstate(stack=self.alpha,
+                                                   fuid=0,  # vacuous join
+                                                   sid=0,  # always 0 for join
+                                                   ha=self.beta.ha))
+        self.alpha.join(uid=self.alpha.remotes.values()[0].uid)
+        self.serviceAll([self.alpha, self.beta], duration=5.0)
+        self.alpha.allow(uid=self.alpha.remotes.values()[0].uid)
+        self.serviceAll([self.alpha, self.beta], duration=5.0)
+        for stack in [self.alpha, self.beta]:
+            self.assertTrue(stack.remotes.values()[0].allowed)
+
+    def tearDown(self):
+        stacking.RoadStack.BurstSize = self.burstSize
+        stacking.RoadStack.BurstAdaptive = self.burstAdaptive
+        for stack in [self.alpha, self.beta]:
+            stack.server.close()
+            stack.clearAllKeeps()
+        super(GoodputLoadTestCase, self).tearDown()
+
+    def serviceLossy(self, stacks, loss=0.0, rate=None, buffer=None,
+                     duration=100.0, seed=0):
+        '''
+        Service stacks dropping each tx with probability loss. Each service
+        step processes at most rate rx packets and queues up to buffer more
+        dropping the rest. Returns number of tx packets
+        '''
+        rand = random.Random(seed)
+        count = 0
+        self.timer.restart(duration=duration)
+        while not self.timer.expired:
+            for stack in stacks:
+                stack.serviceTxMsgs()
+                while stack.txes:
+                    count += 1
+                    if rand.random() < loss:
+                        stack.txes.popleft()  # pop and drop
+                    else:
+                        stack.serviceTxOnce()
+
+            time.sleep(STEP)
+            for stack in stacks:
+                stack.serviceReceives()
+                while buffer and len(stack.rxes) > buffer:  # tail drop
+                    stack.rxes.pop()
+                k = 0
+                while stack.rxes and (not rate or k < rate):  # process upto rate
+                    stack.serviceRxOnce()
+                    k += 1
+                stack.process()
+
+            if all([not stack.transactions for stack in stacks]):
+                break
+            self.store.advanceStamp(STEP)
+        return count
+
+    def goodput(self, loss, burst=0, adaptive=False):
+        '''
+        Send one message alpha to beta and return duple of
+        (goodput in bytes per stamp second, tx packet count)
+        '''
+        stacking.RoadStack.BurstSize = burst
+        stacking.RoadStack.BurstAdaptive = adaptive
+        for remote in self.alpha.remotes.values():
+            remote.burst = remote.BurstInit  # forget window of prior transfer
+            remote.burstThreshold = remote.BurstMax
+
+        msg = odict(data="x" * MSG_SIZE)
+        start = self.store.stamp
+        self.alpha.transmit(msg)
+        count = self.serviceLossy([self.alpha, self.beta],
+                                  loss=loss,
+                                  rate=RX_RATE,
+                                  buffer=RX_BUFFER,
+                                  seed=int(loss * 1000))
+        elapsed = self.store.stamp - start
+        self.assertEqual(len(self.beta.rxMsgs), 1)
+        received, source = self.beta.rxMsgs.popleft()
+        self.assertEqual(received, msg)
+        return (MSG_SIZE / max(elapsed, STEP), count)
+
+    def testGoodputUnderLoss(self):
+        '''
+        Goodput of fixed and adaptive burst sizes under random loss
+        '''
+        console.terse("{0}\n".format(self.testGoodputUnderLoss.__doc__))
+        modes = [("fixed unlimited", 0, False),
+                 ("fixed 100", 100, False),
+                 ("adaptive", 0, True)]
+        for loss in LOSSES:
+            results = odict()
+            for label, burst, adaptive in modes:
+                goodput, count = self.goodput(loss, burst=burst, adaptive=adaptive)
+                results[label] = (goodput, count)
+                console.terse("loss {0:>4.0%} {1:<16} goodput {2:>10,.0f} B/s "
+                              "tx packets {3}\n".format(loss, label, goodput, count))
+            # adaptive at least matches a fixed window within TOLERANCE
+            # while sending fewer packets than an unlimited blast
+            self.assertGreaterEqual(results["adaptive"][0],
+                                    results["fixed 100"][0] * (1.0 - TOLERANCE))
+            self.assertLess(results["adaptive"][1], results["fixed unlimited"][1])
+
+
+def runOne(test):
+    '''
+    Unittest Runner
+    '''
+    test = GoodputLoadTestCase(test)
+    suite = unittest.TestSuite([test])
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+
+def runSome():
+    '''
+    Unittest runner
+    '''
+    tests = []
+    names = [
+        'testGoodputUnderLoss',
+    ]
+    tests.extend(map(GoodputLoadTestCase, names))
+    suite = unittest.TestSuite(tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+
+def runAll():
+    '''
+    Unittest runner
+    '''
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.TestLoader().loadTestsFromTestCase(GoodputLoadTestCase))
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+
+if __name__ == '__main__' and __package__ is None:
+    # console.reinit(verbosity=console.Wordage.concise)
+    # runAll()  # run all unittests
+    runSome()  # only run some
+    # runOne('testGoodputUnderLoss')
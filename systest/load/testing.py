@@ -339,7 +339,9 @@ class BasicLoadTestCase(unittest.TestCase):
                       .format(stack.name, stack.local.uid, stack.transactions, received, expected, stack.stats))
         for t in stack.transactions:
             if isinstance(t, transacting.Messengent):
-                print("Tray lost segments: {0}\n".format([i for i, x in enumerate(t.tray.segments) if x is None]))
+                marks = t.tray.marks
+                print("Tray lost segments: {0}\n".format(
+                        t.tray.missing(end=len(marks)) if marks is not None else []))
         rcvErrors = verifier.checkAllDone()
         if rcvErrors:
             console.terse("{0} received message with the following errors:\n".format(stack.name))